@@ -2,23 +2,64 @@ from oss2 import set_file_logger as oss_set_file_logger, set_stream_logger as os
 from oss2.auth import Auth
 
 from .api import Service, Bucket
+from .http import Session, SessionConfig
+from .client import Client
 from .iterators import (
     BucketIterator,
     ObjectIterator,
     ObjectIteratorV2,
+    StreamingObjectIterator,
     MultipartUploadIterator,
     ObjectUploadIterator,
     PartIterator, LiveChannelIterator)
+from .resumable import resumable_upload, resumable_download, ResumableStore, ResumableDownloadStore, determine_part_size
+from .resumable import make_upload_store, make_download_store
+from .retry import RetryPolicy, NoRetryPolicy
+from .crc import crc64, crc64_combine
+from .url_cache import SignedUrlCache
+from .meta_cache import ObjectMetaCache
+from .tracing import RequestTracer, TraceSink, HistogramSink
+from .metrics import MetricsRegistry
+from .bulk import bulk_delete_objects, BulkDeleteResult
+from .listing import ParallelObjectIterator, ResumableListStore, make_list_store
+from .parallel_select import ParallelSelectIterator
+from .timeouts import timeout_scope, remaining_time
 
 import logging
 
 __all__ = [
-    'Auth', 'Service', 'Bucket', 'BucketIterator',
+    'Auth', 'Service', 'Bucket', 'Client', 'Session', 'SessionConfig', 'BucketIterator',
     'ObjectIterator',
+    'StreamingObjectIterator',
     'MultipartUploadIterator',
     'ObjectUploadIterator',
     'PartIterator',
-    'LiveChannelIterator'
+    'LiveChannelIterator',
+    'resumable_upload',
+    'resumable_download',
+    'ResumableStore',
+    'ResumableDownloadStore',
+    'determine_part_size',
+    'make_upload_store',
+    'make_download_store',
+    'RetryPolicy',
+    'NoRetryPolicy',
+    'bulk_delete_objects',
+    'BulkDeleteResult',
+    'ParallelObjectIterator',
+    'ResumableListStore',
+    'make_list_store',
+    'ParallelSelectIterator',
+    'timeout_scope',
+    'remaining_time',
+    'crc64',
+    'crc64_combine',
+    'SignedUrlCache',
+    'ObjectMetaCache',
+    'RequestTracer',
+    'TraceSink',
+    'HistogramSink',
+    'MetricsRegistry'
 ]
 
 
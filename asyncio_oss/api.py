@@ -180,31 +180,56 @@ datetime.date之间相互转换。如 ::
     - OverwriteIfExists: true|false. true表示重新获得csv meta，并覆盖原有的meta。一般情况下不需要使用
 
 """
-from . import http, exceptions
+from . import http, exceptions, file_io, list_parser
 # GetObjectResult needs to calculate crc, but the data stream is asynchronous and cannot be read directly,
 # so the GetObjectResult object in asyncio-oss is used to satisfy the crc check calculation.
-from .models import GetObjectResult as AsyncGetObjectResult
-from .utils import copyfileobj, copyfileobj_and_verify
+from .models import GetObjectResult as AsyncGetObjectResult, ListObjectsV2StreamResult
+from .models import SelectObjectResult as AsyncSelectObjectResult
+from .models import GetSelectObjectMetaResult as AsyncGetSelectObjectMetaResult
+from .crc import calc_obj_crc_from_parts
+from .utils import copyfileobj, copyfileobj_and_verify, make_upload_crc_adapter
+from .retry import RetryPolicy
+from .log import LazyFormat, log_request
+from .tracing import get_operation_name
+from .signer import make_signer
+from .timeouts import make_client_timeout, remaining_time
+from .url_cache import make_cache_key
+from .meta_cache import make_cache_key as make_meta_cache_key
 
 from oss2 import xml_utils, defaults, models, utils
-from oss2.compat import urlquote, urlparse, to_unicode, to_string
+from oss2.compat import urlquote, urlparse, to_string
 from oss2.models import *
 from oss2.headers import *
 from oss2.select_params import *
+import asyncio
+import functools
 import logging
+import time
 
 
 logger = logging.getLogger(__name__)
 
+# number of URLs signed by `Bucket.sign_urls` between two yields to the event loop
+_SIGN_URLS_BATCH_SIZE = 1000
+
+# bytes of a listing body read at a time by _parse_stream_result
+_PARSE_CHUNK_SIZE = 64 * 1024
+
 
 class _Base(object):
     def __init__(self, auth, endpoint, is_cname, session, connect_timeout,
-                 app_name='', enable_crc=True, proxies=None, region=None, cloudbox_id=None):
+                 app_name='', enable_crc=True, proxies=None, region=None, cloudbox_id=None, retry_policy=None,
+                 session_config=None, metrics=None):
         self.auth = auth
         self.endpoint = _normalize_endpoint(endpoint.strip())
         if utils.is_valid_endpoint(self.endpoint) is not True:
             raise exceptions.ClientError('The endpoint you has specified is not valid, endpoint: {0}'.format(endpoint))
-        self.session = session or http.Session()
+        if session is not None and session_config is not None:
+            raise exceptions.ClientError('session and session_config can not be both specified, '
+                                         'the config of a session is given when creating it')
+        self.session = session or http.Session(session_config)
+        self.session.acquire()
+        self._closed = False
         self.timeout = defaults.get(connect_timeout, defaults.connect_timeout)
         self.app_name = app_name
         self.enable_crc = enable_crc
@@ -214,9 +239,24 @@ class _Base(object):
         self.cloudbox_id = cloudbox_id
         if self.cloudbox_id is not None:
             self.product = 'oss-cloudbox'
+        self.is_cname = is_cname
         self._make_url = _UrlMaker(self.endpoint, is_cname)
-
-    async def _do(self, method, bucket_name, key, **kwargs):
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.add_session(self.session)
+
+    @property
+    def auth(self):
+        return self._auth
+
+    @auth.setter
+    def auth(self, auth):
+        # e.g. a new StsAuth once the previous token expired, the cached signing material goes with the old one
+        self._auth = auth
+        self._signer = make_signer(auth)
+
+    async def _do(self, method, bucket_name, key, operation=None, **kwargs):
         key = to_string(key)
         req = http.Request(method, self._make_url(bucket_name, key),
                            app_name=self.app_name,
@@ -225,31 +265,84 @@ class _Base(object):
                            product=self.product,
                            cloudbox_id=self.cloudbox_id,
                            **kwargs)
-        self.auth._sign_request(req, bucket_name, key)
-
-        resp = await self.session.do_request(req, timeout=self.timeout)
-
-        if resp.status // 100 != 2:
-            e = await exceptions.make_exception(resp)
-            logger.info("Exception: {0}".format(e))
-            raise e
-
-        # Note that connections are only released back to the pool for reuse once all body data has been read;
-        # be sure to either set stream to False or read the content property of the Response object.
-        # For more details, please refer to http://docs.python-requests.org/en/master/user/advanced/#keep-alive.
-        content_length = models._hget(resp.headers, 'content-length', int)
-        if content_length is not None and content_length == 0:
-            await resp.read()
-
-        return resp
+        return await self._send(req, lambda: self._signer.sign_request(req, bucket_name, key), bucket_name, key,
+                                operation)
 
     async def _do_url(self, method, sign_url, **kwargs):
         req = http.Request(method, sign_url, app_name=self.app_name, proxies=self.proxies, **kwargs)
-        resp = await self.session.do_request(req, timeout=self.timeout)
-        if resp.status // 100 != 2:
-            e = await exceptions.make_exception(resp)
-            logger.info("Exception: {0}".format(e))
-            raise e
+        return await self._send(req)
+
+    async def _send(self, req, sign=None, bucket_name=None, key=None, operation=None):
+        """Send `req` until it succeeds or `self.retry_policy` gives up. The request is signed again before each
+        attempt, and its body rewound to where it was before the first one. The outcome is reported to
+        `asyncio_oss.log.request_logger` and to `self.metrics`, and each attempt to the tracer of the session, under
+        `operation`, by default the name of the public method sending the request."""
+        rewind = None
+        if self.retry_policy.max_attempts > 1:
+            rewind = http._make_body_rewinder(req.data)
+
+        tracer = getattr(self.session.config, 'tracer', None)
+        metrics = self.metrics
+        if operation is None and (tracer is not None or metrics is not None):
+            operation = get_operation_name(default=req.method)
+        if metrics is not None:
+            body_size = http._get_body_size(req.data) or 0
+            metrics.start_request(operation)
+
+        start = time.time()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                if sign is not None:
+                    sign()
+                if tracer is not None:
+                    req.trace = tracer.start_request(operation, req, bucket_name, key, attempt)
+
+                try:
+                    resp = await self.session.do_request(req, timeout=make_client_timeout(self.timeout))
+                    if resp.status // 100 != 2:
+                        e = await exceptions.make_exception(resp)
+                        resp.response.release()
+                        raise e
+                except exceptions.OssError as e:
+                    if req.trace is not None:
+                        req.trace.set_response(e.status, e.request_id)
+                        req.trace.finish(e.code or e.__class__.__name__)
+
+                    delay = self.retry_policy.next_delay(attempt, e, time.time() - start, req.method)
+                    if delay is not None:
+                        remaining = remaining_time()
+                        if remaining is not None and delay >= remaining:
+                            delay = None
+                    if delay is not None and rewind is None:
+                        logger.info("Request body of {0} {1} can't be replayed, not retrying".format(req.method,
+                                                                                                     req.url))
+                        delay = None
+                    if delay is None:
+                        logger.info("Exception: {0}".format(e))
+                        log_request(req, bucket_name, key, e.status, e.request_id, e.code or e.__class__.__name__,
+                                    attempt, time.time() - start)
+                        if metrics is not None:
+                            metrics.observe_request(operation, e.status, time.time() - start, attempt,
+                                                    body_size * attempt, 0)
+                        raise
+
+                    logger.info("Retry {0} {1} in {2:.3f}s, attempt {3} failed: {4}".format(
+                        req.method, req.url, delay, attempt, e))
+                    await asyncio.sleep(delay)
+                    rewind()
+                    continue
+
+                break
+        finally:
+            if metrics is not None:
+                metrics.end_request(operation)
+
+        log_request(req, bucket_name, key, resp.status, resp.request_id, '', attempt, time.time() - start)
+        if metrics is not None:
+            received = 0 if req.method == 'HEAD' else models._hget(resp.headers, 'content-length', int) or 0
+            metrics.observe_request(operation, resp.status, time.time() - start, attempt, body_size * attempt, received)
 
         # Note that connections are only released back to the pool for reuse once all body data has been read;
         # be sure to either set stream to False or read the content property of the Response object.
@@ -257,6 +350,8 @@ class _Base(object):
         content_length = models._hget(resp.headers, 'content-length', int)
         if content_length is not None and content_length == 0:
             await resp.read()
+        elif req.method == 'HEAD' and resp.trace is not None:
+            resp.trace.body_read(0, True)
 
         return resp
 
@@ -266,17 +361,29 @@ class _Base(object):
         parse_func(result, await resp.read())
         return result
 
+    @staticmethod
+    async def _parse_stream_result(resp, parser_class, klass):
+        # the body is parsed chunk by chunk while it is received, see asyncio_oss.list_parser
+        parser = parser_class(klass(resp))
+        while True:
+            chunk = await resp.read(_PARSE_CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+        return parser.close()
+
     async def __aenter__(self):
-        await self.session.__aenter__()
+        await self.session._create_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session.resp:
-            self.session.resp.release()
-        await self.session.__aexit__(exc_type, exc_val, exc_tb)
+        await self.close()
 
     async def close(self):
-        await self.session.close()
+        """Give back the reference held on the session, its pool is closed once no object uses it anymore."""
+        if not self._closed:
+            self._closed = True
+            await self.session.release()
     
 class Service(_Base):
     """用于Service操作的类，如罗列用户所有的Bucket。
@@ -297,9 +404,20 @@ class Service(_Base):
     :param session: 会话。如果是None表示新开会话，非None则复用传入的会话
     :type session: oss2.Session
 
-    :param float connect_timeout: 连接超时时间，以秒为单位。
+    :param float connect_timeout: 连接超时时间，以秒为单位。Also the max time between two reads of a response, the
+        transfer of a body is not bounded as a whole. :func:`timeout_scope <asyncio_oss.timeout_scope>` overrides it
+        for the calls made inside the scope.
     :param str app_name: 应用名。该参数不为空，则在User Agent中加入其值。
         注意到，最终这个字符串是要作为HTTP Header的值传输的，所以必须要遵循HTTP标准。
+
+    :param retry_policy: 重试策略。如果是None表示使用默认的 `RetryPolicy` ，不重试则传入 `NoRetryPolicy()`
+    :type retry_policy: asyncio_oss.RetryPolicy
+
+    :param session_config: 新开会话时连接池的配置，不能和session同时指定
+    :type session_config: asyncio_oss.SessionConfig
+
+    :param metrics: 请求的统计指标，None表示不统计
+    :type metrics: asyncio_oss.MetricsRegistry
     """
 
     QOS_INFO = 'qosInfo'
@@ -311,12 +429,16 @@ class Service(_Base):
                  app_name='',
                  proxies=None,
                  region=None,
-                 cloudbox_id=None):
-        logger.debug("Init oss service, endpoint: {0}, connect_timeout: {1}, app_name: {2}, proxies: {3}".format(
-            endpoint, connect_timeout, app_name, proxies))
+                 cloudbox_id=None,
+                 retry_policy=None,
+                 session_config=None,
+                 metrics=None):
+        logger.debug(LazyFormat("Init oss service, endpoint: {0}, connect_timeout: {1}, app_name: {2}, proxies: {3}",
+                                endpoint, connect_timeout, app_name, proxies))
         super(Service, self).__init__(auth, endpoint, False, session, connect_timeout,
                                       app_name=app_name, proxies=proxies,
-                                      region=region, cloudbox_id=cloudbox_id)
+                                      region=region, cloudbox_id=cloudbox_id, retry_policy=retry_policy,
+                                      session_config=session_config, metrics=metrics)
 
     async def list_buckets(self, prefix='', marker='', max_keys=100, params=None, headers=None):
         """根据前缀罗列用户的Bucket。
@@ -390,10 +512,27 @@ class Bucket(_Base):
     :param session: 会话。如果是None表示新开会话，非None则复用传入的会话
     :type session: oss2.Session
 
-    :param float connect_timeout: 连接超时时间，以秒为单位。
+    :param float connect_timeout: 连接超时时间，以秒为单位。Also the max time between two reads of a response, the
+        transfer of a body is not bounded as a whole. :func:`timeout_scope <asyncio_oss.timeout_scope>` overrides it
+        for the calls made inside the scope.
 
     :param str app_name: 应用名。该参数不为空，则在User Agent中加入其值。
         注意到，最终这个字符串是要作为HTTP Header的值传输的，所以必须要遵循HTTP标准。
+
+    :param retry_policy: 重试策略。如果是None表示使用默认的 `RetryPolicy` ，不重试则传入 `NoRetryPolicy()`
+    :type retry_policy: asyncio_oss.RetryPolicy
+
+    :param session_config: 新开会话时连接池的配置，不能和session同时指定
+    :type session_config: asyncio_oss.SessionConfig
+
+    :param url_cache: :func:`sign_url` 的签名URL缓存，None表示不缓存
+    :type url_cache: asyncio_oss.SignedUrlCache
+
+    :param meta_cache: :func:`head_object` 、 :func:`get_object_meta` 和 :func:`object_exists` 的文件元信息缓存，None表示不缓存
+    :type meta_cache: asyncio_oss.ObjectMetaCache
+
+    :param metrics: 请求的统计指标，None表示不统计
+    :type metrics: asyncio_oss.MetricsRegistry
     """
 
     ACL = 'acl'
@@ -451,18 +590,26 @@ class Bucket(_Base):
                  enable_crc=True,
                  proxies=None,
                  region=None,
-                 cloudbox_id=None):
-        logger.debug(
+                 cloudbox_id=None,
+                 retry_policy=None,
+                 session_config=None,
+                 url_cache=None,
+                 meta_cache=None,
+                 metrics=None):
+        logger.debug(LazyFormat(
             "Init Bucket: {0}, endpoint: {1}, isCname: {2}, connect_timeout: {3}, app_name: {4}, enabled_crc: {5}, "
-            "region: {6}, proxies: {7}".format(bucket_name, endpoint, is_cname, connect_timeout, app_name, enable_crc,
-                                               region, proxies))
+            "region: {6}, proxies: {7}",
+            bucket_name, endpoint, is_cname, connect_timeout, app_name, enable_crc, region, proxies))
         super(Bucket, self).__init__(auth, endpoint, is_cname, session, connect_timeout,
                                      app_name=app_name, enable_crc=enable_crc, proxies=proxies,
-                                     region=region, cloudbox_id=cloudbox_id)
+                                     region=region, cloudbox_id=cloudbox_id, retry_policy=retry_policy,
+                                     session_config=session_config, metrics=metrics)
 
         self.bucket_name = bucket_name.strip()
         if utils.is_valid_bucket_name(self.bucket_name) is not True:
             raise ClientError("The bucket_name is invalid, please check it.")
+        self.url_cache = url_cache
+        self.meta_cache = meta_cache
 
     async def sign_url(self, method, key, expires, headers=None, params=None, slash_safe=False):
         """生成签名URL。
@@ -486,21 +633,87 @@ class Bucket(_Base):
         :param slash_safe: 是否开启key名称中的‘/’转义保护，如果不开启'/'将会转义成%2F
         :type slash_safe: bool
 
-        :return: 签名URL。
+        :return: 签名URL。有 `url_cache` 时，可能是之前为相同参数生成、剩余有效期足够的URL。
         """
         if key is None or len(key.strip()) <= 0:
             raise exceptions.ClientError("The key is invalid, please check it.")
         key = to_string(key)
-        logger.debug(
-            "Start to sign_url, method: {0}, bucket: {1}, key: {2}, expires: {3}, headers: {4}, params: {5}, slash_safe: {6}".format(
-                method, self.bucket_name, to_string(key), expires, headers, params, slash_safe))
+
+        cache_key = None
+        if self.url_cache is not None:
+            cache_key = make_cache_key(self, method, key, expires, headers, params, slash_safe)
+            if cache_key is not None:
+                url = self.url_cache.get(cache_key)
+                if url is not None:
+                    return url
+
+        logger.debug(LazyFormat(
+            "Start to sign_url, method: {0}, bucket: {1}, key: {2}, expires: {3}, headers: {4}, params: {5}, "
+            "slash_safe: {6}",
+            method, self.bucket_name, to_string(key), expires, headers, params, slash_safe))
         req = http.Request(method, self._make_url(self.bucket_name, key, slash_safe),
                            headers=headers,
                            params=params,
                            region=self.region,
                            product=self.product,
                            cloudbox_id=self.cloudbox_id)
-        return self.auth._sign_url(req, self.bucket_name, key, expires)
+        signed_at = time.time()
+        url = self._signer.sign_url(req, self.bucket_name, key, expires)
+
+        if cache_key is not None:
+            self.url_cache.put(cache_key, url, expires, signed_at)
+        return url
+
+    async def sign_urls(self, method, keys, expires, headers=None, params=None, slash_safe=False):
+        """批量生成签名URL，每个URL和 :func:`sign_url` 生成的相同。
+
+        The request, the credentials, the expiration time, the canonical headers and the canonical query are built
+        once for all the keys, only the URL and the signature are computed per key. The event loop is given back every
+        1000 keys, so that signing many URLs does not hold up the other tasks.
+
+            >>> urls = await bucket.sign_urls('GET', ['a.jpg', 'b.jpg'], 5 * 60)
+
+        :param method: HTTP方法，如'GET'、'PUT'、'DELETE'等
+        :type method: str
+        :param keys: 文件名列表，可以是任意iterable
+        :param expires: 过期时间（单位：秒），链接在当前时间再过expires秒后过期
+
+        :param headers: 需要签名的HTTP头部，所有文件相同
+        :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+
+        :param params: 需要签名的HTTP查询参数，所有文件相同
+
+        :param slash_safe: 是否开启key名称中的‘/’转义保护，如果不开启'/'将会转义成%2F
+        :type slash_safe: bool
+
+        :return: 签名URL列表，顺序和 `keys` 相同。
+        """
+        keys = list(keys)
+        for key in keys:
+            if key is None or len(key.strip()) <= 0:
+                raise exceptions.ClientError("The key is invalid, please check it.")
+        keys = [to_string(key) for key in keys]
+        logger.debug(LazyFormat(
+            "Start to sign_urls, method: {0}, bucket: {1}, keys: {2}, expires: {3}, headers: {4}, params: {5}, "
+            "slash_safe: {6}",
+            method, self.bucket_name, len(keys), expires, headers, params, slash_safe))
+
+        req = http.Request(method, None,
+                           headers=headers,
+                           params=params,
+                           region=self.region,
+                           product=self.product,
+                           cloudbox_id=self.cloudbox_id)
+        url_prefix = self._make_url(self.bucket_name, '')
+        safe = '/' if slash_safe is True else ''
+
+        urls = []
+        for i in range(0, len(keys), _SIGN_URLS_BATCH_SIZE):
+            if i:
+                await asyncio.sleep(0)
+            urls_and_keys = [(url_prefix + urlquote(key, safe=safe), key) for key in keys[i:i + _SIGN_URLS_BATCH_SIZE]]
+            urls.extend(self._signer.sign_urls(req, self.bucket_name, urls_and_keys, expires))
+        return urls
 
     async def sign_rtmp_url(self, channel_name, playlist_name, expires):
         """生成RTMP推流的签名URL。
@@ -520,7 +733,7 @@ class Bucket(_Base):
         params = {}
         if playlist_name is not None and playlist_name != "":
             params['playlistName'] = playlist_name
-        return self.auth._sign_rtmp_url(url, self.bucket_name, channel_name, expires, params)
+        return self._signer.sign_rtmp_url(url, self.bucket_name, channel_name, expires, params)
 
     async def list_objects(self, prefix='', delimiter='', marker='', max_keys=100, headers=None):
         """根据前缀罗列Bucket里的文件。
@@ -536,9 +749,9 @@ class Bucket(_Base):
         :return: :class:`ListObjectsResult <oss2.models.ListObjectsResult>`
         """
         headers = http.CaseInsensitiveDict(headers)
-        logger.debug(
-            "Start to List objects, bucket: {0}, prefix: {1}, delimiter: {2}, marker: {3}, max-keys: {4}".format(
-                self.bucket_name, to_string(prefix), delimiter, to_string(marker), max_keys))
+        logger.debug(LazyFormat(
+            "Start to List objects, bucket: {0}, prefix: {1}, delimiter: {2}, marker: {3}, max-keys: {4}",
+            self.bucket_name, to_string(prefix), delimiter, to_string(marker), max_keys))
         resp = await self.__do_bucket('GET',
                                       params={'prefix': prefix,
                                               'delimiter': delimiter,
@@ -546,8 +759,8 @@ class Bucket(_Base):
                                               'max-keys': str(max_keys),
                                               'encoding-type': 'url'},
                                       headers=headers)
-        logger.debug("List objects done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
-        return await self._parse_result(resp, xml_utils.parse_list_objects, ListObjectsResult)
+        logger.debug(LazyFormat("List objects done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
+        return await self._parse_stream_result(resp, list_parser.ListObjectsParser, ListObjectsResult)
 
     async def list_objects_v2(self, prefix='', delimiter='', continuation_token='', start_after='', fetch_owner=False,
                               encoding_type='url', max_keys=100, headers=None):
@@ -566,11 +779,46 @@ class Bucket(_Base):
         :return: :class:`ListObjectsV2Result <oss2.models.ListObjectsV2Result>`
         """
         headers = http.CaseInsensitiveDict(headers)
-        logger.debug(
+        logger.debug(LazyFormat(
             "Start to List objects, bucket: {0}, prefix: {1}, delimiter: {2}, continuation_token: {3}, "
-            "start-after: {4}, fetch-owner: {5}, encoding_type: {6}, max-keys: {7}".format(
-                self.bucket_name, to_string(prefix), delimiter, continuation_token, start_after, fetch_owner,
-                encoding_type, max_keys))
+            "start-after: {4}, fetch-owner: {5}, encoding_type: {6}, max-keys: {7}",
+            self.bucket_name, to_string(prefix), delimiter, continuation_token, start_after, fetch_owner, encoding_type,
+            max_keys))
+        resp = await self.__do_bucket('GET',
+                                      params={'list-type': '2',
+                                              'prefix': prefix,
+                                              'delimiter': delimiter,
+                                              'continuation-token': continuation_token,
+                                              'start-after': start_after,
+                                              'fetch-owner': str(fetch_owner).lower(),
+                                              'max-keys': str(max_keys),
+                                              'encoding-type': encoding_type},
+                                      headers=headers)
+        logger.debug(LazyFormat("List objects V2 done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
+        return await self._parse_stream_result(resp, list_parser.ListObjectsV2Parser, ListObjectsV2Result)
+
+    async def list_objects_v2_stream(self, prefix='', delimiter='', continuation_token='', start_after='',
+                                     fetch_owner=False, encoding_type='url', max_keys=100, headers=None):
+        """根据前缀罗列Bucket里的文件，参数和 :func:`list_objects_v2` 相同。
+
+        Unlike :func:`list_objects_v2`, which returns once the whole page is received and parsed, this returns once the
+        headers of the response are, and the entries of the page are returned by iterating the result as soon as
+        their element is parsed, while the rest of the page is still being received. The work on the first keys of a
+        page can start early, and the memory used doesn't depend on the size of the page ::
+
+            >>> async with await bucket.list_objects_v2_stream(prefix='logs/', max_keys=1000) as page:
+            >>>     async for obj in page:
+            >>>         print(obj.key)
+            >>> print(page.next_continuation_token)
+
+        :return: :class:`ListObjectsV2StreamResult <asyncio_oss.models.ListObjectsV2StreamResult>`
+        """
+        headers = http.CaseInsensitiveDict(headers)
+        logger.debug(LazyFormat(
+            "Start to List objects V2 stream, bucket: {0}, prefix: {1}, delimiter: {2}, continuation_token: {3}, "
+            "start-after: {4}, fetch-owner: {5}, encoding_type: {6}, max-keys: {7}",
+            self.bucket_name, to_string(prefix), delimiter, continuation_token, start_after, fetch_owner, encoding_type,
+            max_keys))
         resp = await self.__do_bucket('GET',
                                       params={'list-type': '2',
                                               'prefix': prefix,
@@ -581,8 +829,9 @@ class Bucket(_Base):
                                               'max-keys': str(max_keys),
                                               'encoding-type': encoding_type},
                                       headers=headers)
-        logger.debug("List objects V2 done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
-        return await self._parse_result(resp, xml_utils.parse_list_objects_v2, ListObjectsV2Result)
+        logger.debug(LazyFormat("List objects V2 stream started, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
+        return ListObjectsV2StreamResult(resp, url_encoded=encoding_type == 'url')
 
     async def put_object(self, key, data,
                          headers=None,
@@ -612,12 +861,12 @@ class Bucket(_Base):
             data = utils.make_progress_adapter(data, progress_callback)
 
         if self.enable_crc:
-            data = utils.make_crc_adapter(data)
+            data = make_upload_crc_adapter(data)
 
-        logger.debug("Start to put object, bucket: {0}, key: {1}, headers: {2}".format(self.bucket_name, to_string(key),
-                                                                                       headers))
+        logger.debug(LazyFormat("Start to put object, bucket: {0}, key: {1}, headers: {2}", self.bucket_name,
+                                to_string(key), headers))
         resp = await self.__do_object('PUT', key, data=data, headers=headers)
-        logger.debug("Put object done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Put object done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         result = PutObjectResult(resp)
 
         if self.enable_crc and result.crc is not None:
@@ -641,10 +890,10 @@ class Bucket(_Base):
         :return: :class:`PutObjectResult <oss2.models.PutObjectResult>`
         """
         headers = utils.set_content_type(http.CaseInsensitiveDict(headers), filename)
-        logger.debug("Put object from file, bucket: {0}, key: {1}, file path: {2}".format(
-            self.bucket_name, to_string(key), filename))
-        with open(to_unicode(filename), 'rb') as f:
-            return await self.put_object(key, f, headers=headers, progress_callback=progress_callback)
+        logger.debug(LazyFormat("Put object from file, bucket: {0}, key: {1}, file path: {2}", self.bucket_name,
+                                to_string(key), filename))
+        async with file_io.open(filename, 'rb') as f:
+            return await self.put_object(key, f.raw, headers=headers, progress_callback=progress_callback)
 
     async def put_object_with_url(self, sign_url, data, headers=None, progress_callback=None):
 
@@ -662,13 +911,14 @@ class Bucket(_Base):
             data = utils.make_progress_adapter(data, progress_callback)
 
         if self.enable_crc:
-            data = utils.make_crc_adapter(data)
+            data = make_upload_crc_adapter(data)
 
-        logger.debug("Start to put object with signed url, bucket: {0}, sign_url: {1}, headers: {2}".format(
-            self.bucket_name, sign_url, headers))
+        logger.debug(LazyFormat("Start to put object with signed url, bucket: {0}, sign_url: {1}, headers: {2}",
+                                self.bucket_name, sign_url, headers))
 
         resp = await self._do_url('PUT', sign_url, data=data, headers=headers)
-        logger.debug("Put object with url done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Put object with url done, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
         result = PutObjectResult(resp)
 
         if self.enable_crc and result.crc is not None:
@@ -687,10 +937,11 @@ class Bucket(_Base):
         :param progress_callback: 用户指定的进度回调函数。参考 :ref:`progress_callback`
         :return:
         """
-        logger.debug("Put object from file with signed url, bucket: {0}, sign_url: {1}, file path: {2}".format(
-            self.bucket_name, sign_url, filename))
-        with open(to_unicode(filename), 'rb') as f:
-            return await self.put_object_with_url(sign_url, f, headers=headers, progress_callback=progress_callback)
+        logger.debug(LazyFormat("Put object from file with signed url, bucket: {0}, sign_url: {1}, file path: {2}",
+                                self.bucket_name, sign_url, filename))
+        async with file_io.open(filename, 'rb') as f:
+            return await self.put_object_with_url(sign_url, f.raw, headers=headers,
+                                                  progress_callback=progress_callback)
 
     async def append_object(self, key, position, data,
                             headers=None,
@@ -722,15 +973,15 @@ class Bucket(_Base):
             data = utils.make_progress_adapter(data, progress_callback)
 
         if self.enable_crc and init_crc is not None:
-            data = utils.make_crc_adapter(data, init_crc)
+            data = make_upload_crc_adapter(data, init_crc)
 
-        logger.debug("Start to append object, bucket: {0}, key: {1}, headers: {2}, position: {3}".format(
-            self.bucket_name, to_string(key), headers, position))
+        logger.debug(LazyFormat("Start to append object, bucket: {0}, key: {1}, headers: {2}, position: {3}",
+                                self.bucket_name, to_string(key), headers, position))
         resp = await self.__do_object('POST', key,
                                       data=data,
                                       headers=headers,
                                       params={'append': '', 'position': str(position)})
-        logger.debug("Append object done, req_id: {0}, statu_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Append object done, req_id: {0}, statu_code: {1}", resp.request_id, resp.status))
         result = AppendObjectResult(resp)
 
         if self.enable_crc and result.crc is not None and init_crc is not None:
@@ -779,10 +1030,10 @@ class Bucket(_Base):
         if process:
             params.update({Bucket.PROCESS: process})
 
-        logger.debug("Start to get object, bucket: {0}， key: {1}, range: {2}, headers: {3}, params: {4}".format(
-            self.bucket_name, to_string(key), range_string, headers, params))
+        logger.debug(LazyFormat("Start to get object, bucket: {0}， key: {1}, range: {2}, headers: {3}, params: {4}",
+                                self.bucket_name, to_string(key), range_string, headers, params))
         resp = await self.__do_object('GET', key, headers=headers, params=params)
-        logger.debug("Get object done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Get object done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
 
         # GetObjectResult needs to calculate crc, but the data stream is asynchronous and cannot be read directly,
         # so the GetObjectResult object in asyncio-oss is used to satisfy the crc check calculation.
@@ -798,9 +1049,11 @@ class Bucket(_Base):
 
         用法 ::
         对于Csv:
-            >>> result = bucket.select_object('access.log', 'select * from ossobject where _4 > 40')
-            >>> print(result.read())
+            >>> result = await bucket.select_object('access.log', 'select * from ossobject where _4 > 40')
+            >>> print(await result.read())
             'hello world'
+            >>> async for record in (await bucket.select_object('access.log', 'select _1 from ossobject')).records():
+            ...     print(record)
         对于Json Doc: { contacts:[{"firstName":"abc", "lastName":"def"},{"firstName":"abc1", "lastName":"def1"}]}
             >>> result = bucket.select_object('sample.json', 'select s.firstName, s.lastName from ossobject.contacts[*] s', select_params = {"Json_Type":"DOCUMENT"})
 
@@ -817,7 +1070,8 @@ class Bucket(_Base):
         :param headers: HTTP头部
         :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
 
-        :return: file-like object
+        :return: :class:`SelectObjectResult <asyncio_oss.models.SelectObjectResult>`，其数据通过 `async for` 或
+            `records()` 边接收边解码
 
         :raises: 如果文件不存在，则抛出 :class:`NoSuchKey <oss2.exceptions.NoSuchKey>` ；还可能抛出其他异常
         """
@@ -840,13 +1094,12 @@ class Bucket(_Base):
         if select_params is not None and SelectParameters.Json_Type in select_params:
             params['x-oss-process'] = 'json/select'
 
-        self.timeout = 3600
         resp = await self.__do_object('POST', key, data=body, headers=headers, params=params)
         crc_enabled = False
         if select_params is not None and SelectParameters.EnablePayloadCrc in select_params:
             if str(select_params[SelectParameters.EnablePayloadCrc]).lower() == "true":
                 crc_enabled = True
-        return SelectObjectResult(resp, progress_callback, crc_enabled)
+        return AsyncSelectObjectResult(resp, progress_callback, crc_enabled)
 
     async def get_object_to_file(self, key, filename,
                                  byte_range=None,
@@ -872,9 +1125,9 @@ class Bucket(_Base):
 
         :return: 如果文件不存在，则抛出 :class:`NoSuchKey <oss2.exceptions.NoSuchKey>` ；还可能抛出其他异常
         """
-        logger.debug("Start to get object to file, bucket: {0}, key: {1}, file path: {2}".format(
-            self.bucket_name, to_string(key), filename))
-        with open(to_unicode(filename), 'wb') as f:
+        logger.debug(LazyFormat("Start to get object to file, bucket: {0}, key: {1}, file path: {2}", self.bucket_name,
+                                to_string(key), filename))
+        async with file_io.open(filename, 'wb') as f:
             result = await self.get_object(key, byte_range=byte_range, headers=headers,
                                            progress_callback=progress_callback,
                                            process=process, params=params)
@@ -914,8 +1167,8 @@ class Bucket(_Base):
         if range_string:
             headers['range'] = range_string
 
-        logger.debug("Start to get object with url, bucket: {0}, sign_url: {1}, range: {2}, headers: {3}".format(
-            self.bucket_name, sign_url, range_string, headers))
+        logger.debug(LazyFormat("Start to get object with url, bucket: {0}, sign_url: {1}, range: {2}, headers: {3}",
+                                self.bucket_name, sign_url, range_string, headers))
         resp = await self._do_url('GET', sign_url, headers=headers)
         # GetObjectResult needs to calculate crc, but the data stream is asynchronous and cannot be read directly,
         # so the GetObjectResult object in asyncio-oss is used to satisfy the crc check calculation.
@@ -941,11 +1194,11 @@ class Bucket(_Base):
 
         :raises: 如果文件不存在，则抛出 :class:`NoSuchKey <oss2.exceptions.NoSuchKey>` ；还可能抛出其他异常
         """
-        logger.debug(
-            "Start to get object with url, bucket: {0}, sign_url: {1}, file path: {2}, range: {3}, headers: {4}"
-                .format(self.bucket_name, sign_url, filename, byte_range, headers))
+        logger.debug(LazyFormat(
+            "Start to get object with url, bucket: {0}, sign_url: {1}, file path: {2}, range: {3}, headers: {4}",
+            self.bucket_name, sign_url, filename, byte_range, headers))
 
-        with open(to_unicode(filename), 'wb') as f:
+        async with file_io.open(filename, 'wb') as f:
             result = await self.get_object_with_url(sign_url, byte_range=byte_range, headers=headers,
                                                     progress_callback=progress_callback)
             if result.content_length is None:
@@ -973,12 +1226,12 @@ class Bucket(_Base):
 
         :return: 如果文件不存在, 抛出 :class:`NoSuchKey <oss2.exceptions.NoSuchKey>`
         """
-        with open(to_unicode(filename), 'wb') as f:
+        async with file_io.open(filename, 'wb') as f:
             result = await self.select_object(key, sql, progress_callback=progress_callback,
                                               select_params=select_params, headers=headers)
 
-            for chunk in result:
-                f.write(chunk)
+            async for chunk in result:
+                await f.write(chunk)
 
             return result
 
@@ -1004,12 +1257,19 @@ class Bucket(_Base):
 
         :raises: 如果Bucket不存在或者Object不存在，则抛出 :class:`NotFound <oss2.exceptions.NotFound>`
         """
-        logger.debug("Start to head object, bucket: {0}, key: {1}, headers: {2}".format(
-            self.bucket_name, to_string(key), headers))
+        if self.meta_cache is not None and not headers and not params:
+            return await self.meta_cache.load(make_meta_cache_key(self, key, 'head_object'),
+                                              functools.partial(self.__head_object, key))
+        return await self.__head_object(key, headers, params)
+
+    async def __head_object(self, key, headers=None, params=None):
+        logger.debug(LazyFormat("Start to head object, bucket: {0}, key: {1}, headers: {2}", self.bucket_name,
+                                to_string(key), headers))
 
-        resp = await self.__do_object('HEAD', key, headers=headers, params=params)
+        # named explicitly, the call may run in a task of the meta cache, without the public method among its callers
+        resp = await self.__do_object('HEAD', key, headers=headers, params=params, operation='head_object')
 
-        logger.debug("Head object done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Head object done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return await self._parse_result(resp, xml_utils.parse_dummy_result, HeadObjectResult)
 
     async def create_select_object_meta(self, key, select_meta_params=None, headers=None):
@@ -1034,7 +1294,7 @@ class Bucket(_Base):
         :param headers: HTTP头部
         :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
 
-        :return: :class:`GetSelectObjectMetaResult <oss2.models.HeadObjectResult>`.
+        :return: :class:`GetSelectObjectMetaResult <asyncio_oss.models.GetSelectObjectMetaResult>`.
           除了 rows 和splits 属性之外, 它也返回head object返回的其他属性。
           rows表示该文件的总记录数。
           splits表示该文件的总Split个数，一个Split包含若干条记录，每个Split的总字节数大致相当。用户可以以Split为单位进行分片查询。
@@ -1048,9 +1308,8 @@ class Bucket(_Base):
         if select_meta_params is not None and 'Json_Type' in select_meta_params:
             params['x-oss-process'] = 'json/meta'
 
-        self.timeout = 3600
         resp = await self.__do_object('POST', key, data=body, headers=headers, params=params)
-        return GetSelectObjectMetaResult(resp)
+        return await AsyncGetSelectObjectMetaResult(resp).read_meta()
 
     async def get_object_meta(self, key, params=None, headers=None):
         """获取文件基本元信息，包括该Object的ETag、Size（文件大小）、LastModified，并不返回其内容。
@@ -1067,8 +1326,15 @@ class Bucket(_Base):
 
         :raises: 如果文件不存在，则抛出 :class:`NoSuchKey <oss2.exceptions.NoSuchKey>` ；还可能抛出其他异常
         """
+        if self.meta_cache is not None and not headers and not params:
+            return await self.meta_cache.load(make_meta_cache_key(self, key, 'get_object_meta'),
+                                              functools.partial(self.__get_object_meta, key))
+        return await self.__get_object_meta(key, params, headers)
+
+    async def __get_object_meta(self, key, params=None, headers=None):
         headers = http.CaseInsensitiveDict(headers)
-        logger.debug("Start to get object metadata, bucket: {0}, key: {1}".format(self.bucket_name, to_string(key)))
+        logger.debug(LazyFormat("Start to get object metadata, bucket: {0}, key: {1}", self.bucket_name,
+                                to_string(key)))
 
         if params is None:
             params = dict()
@@ -1076,8 +1342,9 @@ class Bucket(_Base):
         if Bucket.OBJECTMETA not in params:
             params[Bucket.OBJECTMETA] = ''
 
-        resp = await self.__do_object('HEAD', key, params=params, headers=headers)
-        logger.debug("Get object metadata done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        resp = await self.__do_object('HEAD', key, params=params, headers=headers, operation='get_object_meta')
+        logger.debug(LazyFormat("Get object metadata done, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
         return GetObjectMetaResult(resp)
 
     async def object_exists(self, key, headers=None):
@@ -1098,7 +1365,8 @@ class Bucket(_Base):
         # 同时, 对于head 请求，服务端会通过x-oss-err 返回 错误响应信息,
         # 考虑到兼容之前的行为，增加exceptions.NotFound 异常 当作NoSuchKey
 
-        logger.debug("Start to check if object exists, bucket: {0}, key: {1}".format(self.bucket_name, to_string(key)))
+        logger.debug(LazyFormat("Start to check if object exists, bucket: {0}, key: {1}", self.bucket_name,
+                                to_string(key)))
         try:
             await self.get_object_meta(key, headers=headers)
         except exceptions.NoSuchKey:
@@ -1134,11 +1402,11 @@ class Bucket(_Base):
         else:
             headers[OSS_COPY_OBJECT_SOURCE] = '/' + source_bucket_name + '/' + urlquote(source_key, '')
 
-        logger.debug(
-            "Start to copy object, source bucket: {0}, source key: {1}, bucket: {2}, key: {3}, headers: {4}".format(
-                source_bucket_name, to_string(source_key), self.bucket_name, to_string(target_key), headers))
+        logger.debug(LazyFormat(
+            "Start to copy object, source bucket: {0}, source key: {1}, bucket: {2}, key: {3}, headers: {4}",
+            source_bucket_name, to_string(source_key), self.bucket_name, to_string(target_key), headers))
         resp = await self.__do_object('PUT', target_key, headers=headers)
-        logger.debug("Copy object done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Copy object done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
 
         return PutObjectResult(resp)
 
@@ -1158,7 +1426,8 @@ class Bucket(_Base):
         if headers is not None:
             headers[OSS_METADATA_DIRECTIVE] = 'REPLACE'
 
-        logger.debug("Start to update object metadata, bucket: {0}, key: {1}".format(self.bucket_name, to_string(key)))
+        logger.debug(LazyFormat("Start to update object metadata, bucket: {0}, key: {1}", self.bucket_name,
+                                to_string(key)))
         return await self.copy_object(self.bucket_name, key, key, headers=headers)
 
     async def delete_object(self, key, params=None, headers=None):
@@ -1175,9 +1444,9 @@ class Bucket(_Base):
 
         headers = http.CaseInsensitiveDict(headers)
 
-        logger.info("Start to delete object, bucket: {0}, key: {1}".format(self.bucket_name, to_string(key)))
+        logger.info(LazyFormat("Start to delete object, bucket: {0}, key: {1}", self.bucket_name, to_string(key)))
         resp = await self.__do_object('DELETE', key, params=params, headers=headers)
-        logger.debug("Delete object done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Delete object done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return RequestResult(resp)
 
     async def restore_object(self, key, params=None, headers=None, input=None):
@@ -1211,7 +1480,7 @@ class Bucket(_Base):
         :return: :class:`RequestResult <oss2.models.RequestResult>`
         """
         headers = http.CaseInsensitiveDict(headers)
-        logger.debug("Start to restore object, bucket: {0}, key: {1}".format(self.bucket_name, to_string(key)))
+        logger.debug(LazyFormat("Start to restore object, bucket: {0}, key: {1}", self.bucket_name, to_string(key)))
 
         if params is None:
             params = dict()
@@ -1222,7 +1491,7 @@ class Bucket(_Base):
         data = self.__convert_data(RestoreConfiguration, xml_utils.to_put_restore_config, input)
 
         resp = await self.__do_object('POST', key, params=params, headers=headers, data=data)
-        logger.debug("Restore object done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Restore object done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return RequestResult(resp)
 
     async def put_object_acl(self, key, permission, params=None, headers=None):
@@ -1238,8 +1507,8 @@ class Bucket(_Base):
 
         :return: :class:`RequestResult <oss2.models.RequestResult>`
         """
-        logger.debug("Start to put object acl, bucket: {0}, key: {1}, acl: {2}".format(
-            self.bucket_name, to_string(key), permission))
+        logger.debug(LazyFormat("Start to put object acl, bucket: {0}, key: {1}, acl: {2}", self.bucket_name,
+                                to_string(key), permission))
 
         headers = http.CaseInsensitiveDict(headers)
         headers[OSS_OBJECT_ACL] = permission
@@ -1251,7 +1520,7 @@ class Bucket(_Base):
             params[Bucket.ACL] = ''
 
         resp = await self.__do_object('PUT', key, params=params, headers=headers)
-        logger.debug("Put object acl done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Put object acl done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return RequestResult(resp)
 
     async def get_object_acl(self, key, params=None, headers=None):
@@ -1265,7 +1534,7 @@ class Bucket(_Base):
 
         :return: :class:`GetObjectAclResult <oss2.models.GetObjectAclResult>`
         """
-        logger.debug("Start to get object acl, bucket: {0}, key: {1}".format(self.bucket_name, to_string(key)))
+        logger.debug(LazyFormat("Start to get object acl, bucket: {0}, key: {1}", self.bucket_name, to_string(key)))
         headers = http.CaseInsensitiveDict(headers)
 
         if params is None:
@@ -1275,7 +1544,7 @@ class Bucket(_Base):
             params[Bucket.ACL] = ''
 
         resp = await self.__do_object('GET', key, params=params, headers=headers)
-        logger.debug("Get object acl done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Get object acl done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return await self._parse_result(resp, xml_utils.parse_get_object_acl, GetObjectAclResult)
 
     async def batch_delete_objects(self, key_list, headers=None):
@@ -1291,18 +1560,15 @@ class Bucket(_Base):
         if not key_list:
             raise ClientError('key_list should not be empty')
 
-        logger.debug("Start to delete objects, bucket: {0}, keys: {1}".format(self.bucket_name, key_list))
+        logger.debug(LazyFormat("Start to delete objects, bucket: {0}, keys: {1}", self.bucket_name, key_list))
 
         data = xml_utils.to_batch_delete_objects_request(key_list, False)
 
         headers = http.CaseInsensitiveDict(headers)
         headers['Content-MD5'] = utils.content_md5(data)
 
-        resp = await self.__do_bucket('POST',
-                                      data=data,
-                                      params={'delete': '', 'encoding-type': 'url'},
-                                      headers=headers)
-        logger.debug("Delete objects done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        resp = await self._do_batch_delete(key_list, data, headers)
+        logger.debug(LazyFormat("Delete objects done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return await self._parse_result(resp, xml_utils.parse_batch_delete_objects, BatchDeleteObjectsResult)
 
     async def delete_object_versions(self, keylist_versions, headers=None):
@@ -1318,20 +1584,35 @@ class Bucket(_Base):
         if not keylist_versions:
             raise ClientError('keylist_versions should not be empty')
 
-        logger.debug("Start to delete object versions, bucket: {0}".format(self.bucket_name))
+        logger.debug(LazyFormat("Start to delete object versions, bucket: {0}", self.bucket_name))
 
         data = xml_utils.to_batch_delete_objects_version_request(keylist_versions, False)
 
         headers = http.CaseInsensitiveDict(headers)
         headers['Content-MD5'] = utils.content_md5(data)
 
-        resp = await self.__do_bucket('POST',
-                                      data=data,
-                                      params={'delete': '', 'encoding-type': 'url'},
-                                      headers=headers)
-        logger.debug("Delete object versions done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        keys = [object_version.key for object_version in keylist_versions.object_version_list]
+        resp = await self._do_batch_delete(keys, data, headers)
+        logger.debug(LazyFormat("Delete object versions done, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
         return await self._parse_result(resp, xml_utils.parse_batch_delete_objects, BatchDeleteObjectsResult)
 
+    async def _do_batch_delete(self, keys, data, headers, operation=None):
+        """Send a DeleteMultipleObjects request of the objects `keys`, with the XML body `data`, for
+        :func:`batch_delete_objects`, :func:`delete_object_versions` and
+        :func:`bulk_delete_objects <asyncio_oss.bulk_delete_objects>`."""
+        # dropped even when the request fails, it may have been applied anyway
+        try:
+            return await self.__do_bucket('POST',
+                                          data=data,
+                                          params={'delete': '', 'encoding-type': 'url'},
+                                          headers=headers,
+                                          operation=operation)
+        finally:
+            if self.meta_cache is not None:
+                for key in keys:
+                    self.meta_cache.invalidate(self, key)
+
     async def init_multipart_upload(self, key, headers=None, params=None):
         """初始化分片上传。
 
@@ -1352,10 +1633,11 @@ class Bucket(_Base):
             tmp_params = params.copy()
 
         tmp_params['uploads'] = ''
-        logger.debug("Start to init multipart upload, bucket: {0}, keys: {1}, headers: {2}, params: {3}".format(
-            self.bucket_name, to_string(key), headers, tmp_params))
+        logger.debug(LazyFormat("Start to init multipart upload, bucket: {0}, keys: {1}, headers: {2}, params: {3}",
+                                self.bucket_name, to_string(key), headers, tmp_params))
         resp = await self.__do_object('POST', key, params=tmp_params, headers=headers)
-        logger.debug("Init multipart upload done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Init multipart upload done, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
         return await self._parse_result(resp, xml_utils.parse_init_multipart_upload, InitMultipartUploadResult)
 
     async def upload_part(self, key, upload_id, part_number, data, progress_callback=None, headers=None):
@@ -1378,16 +1660,16 @@ class Bucket(_Base):
             data = utils.make_progress_adapter(data, progress_callback)
 
         if self.enable_crc:
-            data = utils.make_crc_adapter(data)
+            data = make_upload_crc_adapter(data)
 
-        logger.debug(
-            "Start to upload multipart, bucket: {0}, key: {1}, upload_id: {2}, part_number: {3}, headers: {4}".format(
-                self.bucket_name, to_string(key), upload_id, part_number, headers))
+        logger.debug(LazyFormat(
+            "Start to upload multipart, bucket: {0}, key: {1}, upload_id: {2}, part_number: {3}, headers: {4}",
+            self.bucket_name, to_string(key), upload_id, part_number, headers))
         resp = await self.__do_object('PUT', key,
                                       params={'uploadId': upload_id, 'partNumber': str(part_number)},
                                       headers=headers,
                                       data=data)
-        logger.debug("Upload multipart done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Upload multipart done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         result = PutObjectResult(resp)
 
         if self.enable_crc and result.crc is not None:
@@ -1416,20 +1698,20 @@ class Bucket(_Base):
             parts = sorted(parts, key=lambda p: p.part_number)
             data = xml_utils.to_complete_upload_request(parts)
 
-        logger.debug("Start to complete multipart upload, bucket: {0}, key: {1}, upload_id: {2}, parts: {3}".format(
-            self.bucket_name, to_string(key), upload_id, data))
+        logger.debug(LazyFormat("Start to complete multipart upload, bucket: {0}, key: {1}, upload_id: {2}, parts: {3}",
+                                self.bucket_name, to_string(key), upload_id, data))
 
         resp = await self.__do_object('POST', key,
                                       params={'uploadId': upload_id},
                                       data=data,
                                       headers=headers)
-        logger.debug(
-            "Complete multipart upload done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Complete multipart upload done, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
 
         result = PutObjectResult(resp)
 
         if self.enable_crc and parts is not None:
-            object_crc = utils.calc_obj_crc_from_parts(parts)
+            object_crc = calc_obj_crc_from_parts(parts)
             utils.check_crc('multipart upload', object_crc, result.crc, result.request_id)
 
         return result
@@ -1446,14 +1728,14 @@ class Bucket(_Base):
         :return: :class:`RequestResult <oss2.models.RequestResult>`
         """
 
-        logger.debug("Start to abort multipart upload, bucket: {0}, key: {1}, upload_id: {2}".format(
-            self.bucket_name, to_string(key), upload_id))
+        logger.debug(LazyFormat("Start to abort multipart upload, bucket: {0}, key: {1}, upload_id: {2}",
+                                self.bucket_name, to_string(key), upload_id))
 
         headers = http.CaseInsensitiveDict(headers)
 
         resp = await self.__do_object('DELETE', key,
                                       params={'uploadId': upload_id}, headers=headers)
-        logger.debug("Abort multipart done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Abort multipart done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return RequestResult(resp)
 
     async def list_multipart_uploads(self,
@@ -1492,7 +1774,8 @@ class Bucket(_Base):
                                               'max-uploads': str(max_uploads),
                                               'encoding-type': 'url'},
                                       headers=headers)
-        logger.debug("List multipart uploads done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("List multipart uploads done, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
         return await self._parse_result(resp, xml_utils.parse_list_multipart_uploads, ListMultipartUploadsResult)
 
     async def upload_part_copy(self, source_bucket_name, source_key, byte_range,
@@ -1524,13 +1807,11 @@ class Bucket(_Base):
         if range_string:
             headers[OSS_COPY_OBJECT_SOURCE_RANGE] = range_string
 
-        logger.debug("Start to upload part copy, source bucket: {0}, source key: {1}, bucket: {2}, key: {3}, range"
-                     ": {4}, upload id: {5}, part_number: {6}, headers: {7}".format(source_bucket_name,
-                                                                                    to_string(source_key),
-                                                                                    self.bucket_name,
-                                                                                    to_string(target_key),
-                                                                                    byte_range, target_upload_id,
-                                                                                    target_part_number, headers))
+        logger.debug(LazyFormat(
+            "Start to upload part copy, source bucket: {0}, source key: {1}, bucket: {2}, key: {3}, range"
+            ": {4}, upload id: {5}, part_number: {6}, headers: {7}",
+            source_bucket_name, to_string(source_key), self.bucket_name, to_string(target_key), byte_range,
+            target_upload_id, target_part_number, headers))
 
         if params is None:
             params = dict()
@@ -1540,7 +1821,7 @@ class Bucket(_Base):
 
         resp = await self.__do_object('PUT', target_key,
                                       params=params, headers=headers)
-        logger.debug("Upload part copy done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Upload part copy done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
 
         return PutObjectResult(resp)
 
@@ -1559,7 +1840,8 @@ class Bucket(_Base):
 
         :return: :class:`ListPartsResult <oss2.models.ListPartsResult>`
         """
-        logger.debug("Start to list parts, bucket: {0}, key: {1}, upload_id: {2}, marker: {3}, max_parts: {4}".format(
+        logger.debug(LazyFormat(
+            "Start to list parts, bucket: {0}, key: {1}, upload_id: {2}, marker: {3}, max_parts: {4}",
             self.bucket_name, to_string(key), upload_id, marker, max_parts))
 
         headers = http.CaseInsensitiveDict(headers)
@@ -1569,7 +1851,7 @@ class Bucket(_Base):
                                               'part-number-marker': marker,
                                               'max-parts': str(max_parts)},
                                       headers=headers)
-        logger.debug("List parts done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("List parts done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return await self._parse_result(resp, xml_utils.parse_list_parts, ListPartsResult)
 
     async def put_symlink(self, target_key, symlink_key, headers=None):
@@ -1586,10 +1868,10 @@ class Bucket(_Base):
         headers = http.CaseInsensitiveDict(headers)
         headers[OSS_SYMLINK_TARGET] = urlquote(target_key, '')
 
-        logger.debug("Start to put symlink, bucket: {0}, target_key: {1}, symlink_key: {2}, headers: {3}".format(
-            self.bucket_name, to_string(target_key), to_string(symlink_key), headers))
+        logger.debug(LazyFormat("Start to put symlink, bucket: {0}, target_key: {1}, symlink_key: {2}, headers: {3}",
+                                self.bucket_name, to_string(target_key), to_string(symlink_key), headers))
         resp = await self.__do_object('PUT', symlink_key, headers=headers, params={Bucket.SYMLINK: ''})
-        logger.debug("Put symlink done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Put symlink done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return RequestResult(resp)
 
     async def get_symlink(self, symlink_key, params=None, headers=None):
@@ -1605,8 +1887,8 @@ class Bucket(_Base):
 
         :raises: 如果文件的符号链接不存在，则抛出 :class:`NoSuchKey <oss2.exceptions.NoSuchKey>` ；还可能抛出其他异常
         """
-        logger.debug(
-            "Start to get symlink, bucket: {0}, symlink_key: {1}".format(self.bucket_name, to_string(symlink_key)))
+        logger.debug(LazyFormat("Start to get symlink, bucket: {0}, symlink_key: {1}", self.bucket_name,
+                                to_string(symlink_key)))
 
         headers = http.CaseInsensitiveDict(headers)
 
@@ -1617,7 +1899,7 @@ class Bucket(_Base):
             params[Bucket.SYMLINK] = ''
 
         resp = await self.__do_object('GET', symlink_key, params=params, headers=headers)
-        logger.debug("Get symlink done, req_id: {0}, status_code: {1}".format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("Get symlink done, req_id: {0}, status_code: {1}", resp.request_id, resp.status))
         return GetSymlinkResult(resp)
 
     async def create_bucket(self, permission=None, input=None, headers=None):
@@ -2177,11 +2459,10 @@ class Bucket(_Base):
 
         :return: :class:`ListObjectVersionsResult <oss2.models.ListObjectVersionsResult>`
         """
-        logger.debug(
-            "Start to List object versions, bucket: {0}, prefix: {1}, delimiter: {2},"
-            + "key_marker: {3}, versionid_marker: {4}, max-keys: {5}".format(
-                self.bucket_name, to_string(prefix), delimiter, to_string(key_marker),
-                to_string(versionid_marker), max_keys))
+        logger.debug(LazyFormat(
+            "Start to List object versions, bucket: {0}, prefix: {1}, delimiter: {2}, key_marker: {3}, "
+            "versionid_marker: {4}, max-keys: {5}",
+            self.bucket_name, to_string(prefix), delimiter, to_string(key_marker), to_string(versionid_marker), max_keys))
 
         headers = http.CaseInsensitiveDict(headers)
 
@@ -2194,10 +2475,11 @@ class Bucket(_Base):
                                               'encoding-type': 'url',
                                               Bucket.VERSIONS: ''},
                                       headers=headers)
-        logger.debug("List object versions done, req_id: {0}, status_code: {1}"
-                     .format(resp.request_id, resp.status))
+        logger.debug(LazyFormat("List object versions done, req_id: {0}, status_code: {1}", resp.request_id,
+                                resp.status))
 
-        return await self._parse_result(resp, xml_utils.parse_list_object_versions, ListObjectVersionsResult)
+        return await self._parse_stream_result(resp, list_parser.ListObjectVersionsParser,
+                                               ListObjectVersionsResult)
 
     async def put_bucket_versioning(self, config, headers=None):
         """
@@ -2884,7 +3166,14 @@ class Bucket(_Base):
             raise exceptions.ClientError("Bucket name should not be null or empty.")
         if not key:
             raise exceptions.ClientError("key should not be null or empty.")
-        return await self._do(method, self.bucket_name, key, **kwargs)
+        if self.meta_cache is None or method in ('GET', 'HEAD') or \
+                (method == 'POST' and Bucket.PROCESS in (kwargs.get('params') or {})):
+            return await self._do(method, self.bucket_name, key, **kwargs)
+        # dropped even when the request fails, it may have been applied anyway
+        try:
+            return await self._do(method, self.bucket_name, key, **kwargs)
+        finally:
+            self.meta_cache.invalidate(self, key)
 
     async def __do_bucket(self, method, **kwargs):
         return await self._do(method, self.bucket_name, '', **kwargs)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.bulk
+~~~~~~~~~~~~~~~~
+
+Bulk operations over key sets of any size: the keys are streamed from an iterable or an asynchronous iterable, split
+into requests of the size OSS accepts, and the requests are sent concurrently.
+
+Usage ::
+
+    >>> result = await asyncio_oss.bulk_delete_objects(bucket, asyncio_oss.ObjectIterator(bucket, prefix='tmp/'))
+    >>> result.deleted_count, result.failed
+"""
+import logging
+import xml.etree.ElementTree as ElementTree
+
+from oss2 import defaults, utils
+from oss2.compat import to_string
+from oss2.xml_utils import _find_object, _find_tag_with_default, _is_url_encoding, to_batch_delete_objects_request
+from requests.structures import CaseInsensitiveDict
+
+from . import exceptions
+from .task_queue import TaskQueue
+
+logger = logging.getLogger(__name__)
+
+#: default number of concurrent requests of `bulk_delete_objects`
+delete_num_tasks = 8
+
+#: max number of keys of one DeleteMultipleObjects request
+MAX_DELETE_OBJECTS_KEYS = 1000
+
+
+class BulkDeleteError(object):
+    """A key which could not be deleted.
+
+    :param str key: 文件名
+    :param str code: OSS错误码
+    :param str message: OSS错误信息
+    :param str request_id: ID of the request which failed
+    :param exception: exception raised by the whole request when all its keys failed together, None otherwise
+    """
+
+    def __init__(self, key, code, message, request_id='', exception=None):
+        self.key = key
+        self.code = code
+        self.message = message
+        self.request_id = request_id
+        self.exception = exception
+
+    def __repr__(self):
+        return 'BulkDeleteError(key={0!r}, code={1!r}, message={2!r})'.format(self.key, self.code, self.message)
+
+
+class BulkDeleteResult(object):
+    """Aggregated result of `bulk_delete_objects`."""
+
+    def __init__(self):
+        #: number of keys deleted
+        self.deleted_count = 0
+
+        #: list of :class:`BulkDeleteError`, one for each key which could not be deleted
+        self.failed = []
+
+        #: number of requests sent
+        self.request_count = 0
+
+    @property
+    def ok(self):
+        return not self.failed
+
+
+async def bulk_delete_objects(bucket, keys, num_tasks=None, batch_size=MAX_DELETE_OBJECTS_KEYS, headers=None):
+    """Delete the objects of `keys`, which can be of any size.
+
+    The keys are read lazily and grouped into DeleteMultipleObjects requests of `batch_size` keys, sent in quiet mode
+    so that responses only carry the failures. At most `num_tasks` requests are in flight, and at most as many
+    batches are buffered ahead of them, so the memory used does not depend on the number of keys.
+
+    A request failing as a whole, once the retry policy of the bucket gave up, does not stop the others: each of its
+    keys is reported in `BulkDeleteResult.failed` with the exception. Only client errors are raised.
+
+    :param bucket: :class:`Bucket <asyncio_oss.Bucket>` object
+    :param keys: iterable or asynchronous iterable of keys, e.g. a list of str or an `ObjectIterator`. Items with a
+        `key` attribute, such as `SimplifiedObjectInfo`, are deleted by that key.
+    :param int num_tasks: max number of concurrent requests, defaults to `delete_num_tasks`
+    :param int batch_size: number of keys per request, at most 1000
+    :param headers: HTTP头部 of each request
+
+    :return: :class:`BulkDeleteResult`
+    """
+    if not 0 < batch_size <= MAX_DELETE_OBJECTS_KEYS:
+        raise exceptions.ClientError('batch_size should be between 1 and {0}, got {1}'.format(
+            MAX_DELETE_OBJECTS_KEYS, batch_size))
+
+    num_tasks = defaults.get(num_tasks, delete_num_tasks)
+    result = BulkDeleteResult()
+
+    logger.debug("Start to bulk delete objects, bucket: {0}, num_tasks: {1}, batch_size: {2}".format(
+        bucket.bucket_name, num_tasks, batch_size))
+
+    async def producer(q):
+        batch = []
+        async for key in _iter_keys(keys):
+            batch.append(key)
+            if len(batch) == batch_size:
+                await q.put(batch)
+                batch = []
+        if batch:
+            await q.put(batch)
+
+    async def consumer(q):
+        while q.ok():
+            batch = await q.get()
+            if batch is None:
+                break
+            await _delete_batch(bucket, batch, headers, result)
+
+    await TaskQueue(producer, [consumer] * num_tasks, maxsize=num_tasks).run()
+
+    logger.debug("Bulk delete objects done, bucket: {0}, deleted: {1}, failed: {2}, requests: {3}".format(
+        bucket.bucket_name, result.deleted_count, len(result.failed), result.request_count))
+    return result
+
+
+async def _iter_keys(keys):
+    if hasattr(keys, '__aiter__'):
+        async for item in keys:
+            yield _to_key(item)
+    else:
+        for item in keys:
+            yield _to_key(item)
+
+
+def _to_key(item):
+    key = getattr(item, 'key', item)
+    if not isinstance(key, (str, bytes)):
+        raise exceptions.ClientError('{0} is not a key'.format(item.__class__.__name__))
+    return to_string(key)
+
+
+async def _delete_batch(bucket, batch, headers, result):
+    data = to_batch_delete_objects_request(batch, True)
+
+    headers = CaseInsensitiveDict(headers)
+    headers['Content-MD5'] = utils.content_md5(data)
+
+    result.request_count += 1
+    try:
+        resp = await bucket._do_batch_delete(batch, data, headers, operation='bulk_delete_objects')
+        body = await resp.read()
+    except (exceptions.ServerError, exceptions.RequestError) as e:
+        logger.info("Delete objects failed, bucket: {0}, keys: {1}, exception: {2}".format(
+            bucket.bucket_name, len(batch), e))
+        code, message = e.code or e.__class__.__name__, e.message or str(e)
+        result.failed.extend(BulkDeleteError(key, code, message, e.request_id, e) for key in batch)
+        return
+
+    errors = _parse_delete_errors(body, resp.request_id)
+    result.failed.extend(errors)
+    result.deleted_count += len(batch) - len(errors)
+
+
+def _parse_delete_errors(body, request_id):
+    # in quiet mode only the keys which could not be deleted are returned, if any
+    if not body:
+        return []
+
+    root = ElementTree.fromstring(body)
+    url_encoded = _is_url_encoding(root)
+
+    return [BulkDeleteError(_find_object(node, 'Key', url_encoded),
+                            _find_tag_with_default(node, 'Code', ''),
+                            _find_tag_with_default(node, 'Message', ''),
+                            request_id)
+            for node in root.findall('Error')]
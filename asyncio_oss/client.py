@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.client
+~~~~~~~~~~~~~~~~~~
+
+A `Client` owns one connection pool and hands out `Bucket` and `Service` objects sharing it, so that a process
+touching many buckets of the same endpoint opens a single pool and reuses its connections and TLS sessions.
+
+Usage ::
+
+    >>> async with asyncio_oss.Client(auth, 'http://oss-cn-hangzhou.aliyuncs.com') as client:
+    >>>     await client.bucket('bucket-a').put_object('a.txt', 'content of a')
+    >>>     await client.bucket('bucket-b').get_object_to_file('b.txt', 'b.txt')
+"""
+import logging
+
+from . import http
+from .api import Bucket, Service
+
+logger = logging.getLogger(__name__)
+
+
+class Client(object):
+    """Owner of a connection pool shared by the `Bucket` and `Service` objects it creates.
+
+    The objects returned by :func:`bucket` and :func:`service` are cheap views: they share the session of the client
+    and can be used concurrently from any number of tasks. Closing a view, or leaving its `async with` block, only
+    gives back its reference on the session; the pool is closed once, by :func:`close` of the client.
+
+    :param auth: 包含了用户认证信息的Auth对象
+    :type auth: oss2.Auth
+
+    :param str endpoint: 访问域名或者CNAME
+    :param bool is_cname: 如果endpoint是CNAME则设为True；反之，则为False。
+
+    :param session_config: 连接池的配置，None表示使用默认配置
+    :type session_config: asyncio_oss.SessionConfig
+
+    The other parameters are the defaults of the created objects, see :class:`Bucket <asyncio_oss.Bucket>`; each of
+    them can be overridden per view.
+    """
+
+    def __init__(self, auth, endpoint,
+                 is_cname=False,
+                 session_config=None,
+                 connect_timeout=None,
+                 app_name='',
+                 enable_crc=True,
+                 proxies=None,
+                 region=None,
+                 cloudbox_id=None,
+                 retry_policy=None,
+                 metrics=None):
+        logger.debug("Init Client, endpoint: {0}, isCname: {1}, connect_timeout: {2}, app_name: {3}".format(
+            endpoint, is_cname, connect_timeout, app_name))
+        self.auth = auth
+        self.endpoint = endpoint
+        self.is_cname = is_cname
+        self.session = http.Session(session_config)
+        self.session.acquire()
+        self._closed = False
+        self._options = {
+            'connect_timeout': connect_timeout,
+            'app_name': app_name,
+            'proxies': proxies,
+            'region': region,
+            'cloudbox_id': cloudbox_id,
+            'retry_policy': retry_policy,
+            'metrics': metrics,
+        }
+        self._enable_crc = enable_crc
+
+    def bucket(self, bucket_name, **kwargs):
+        """Return a `Bucket` using the pool of the client.
+
+        :param str bucket_name: Bucket名
+        :param kwargs: parameters of `Bucket` overriding the ones of the client, e.g. `connect_timeout`
+
+        :return: :class:`Bucket <asyncio_oss.Bucket>`
+        """
+        options = dict(self._options, is_cname=self.is_cname, enable_crc=self._enable_crc)
+        options.update(kwargs)
+        return Bucket(self.auth, self.endpoint, bucket_name, session=self.session, **options)
+
+    def service(self, **kwargs):
+        """Return a `Service` using the pool of the client.
+
+        :param kwargs: parameters of `Service` overriding the ones of the client
+
+        :return: :class:`Service <asyncio_oss.Service>`
+        """
+        options = dict(self._options)
+        options.update(kwargs)
+        return Service(self.auth, self.endpoint, session=self.session, **options)
+
+    async def close(self):
+        """Close the connection pool, the views handed out can't send requests anymore."""
+        if not self._closed:
+            self._closed = True
+            await self.session.close()
+
+    async def __aenter__(self):
+        await self.session._create_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
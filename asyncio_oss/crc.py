@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.crc
+~~~~~~~~~~~~~~~
+
+CRC64 as computed by OSS (ECMA-182 polynomial, reflected, initial value and final xor of all ones, i.e. CRC-64/XZ).
+
+The checksum is computed by the fastest engine available, in this order:
+
+- `fastcrc` or `anycrc` when installed, both are vectorized and run at several GB/s
+- the C extension of `crcmod`, which is a dependency of oss2
+- a slicing-by-8 implementation in pure Python, faster than the pure Python fallback of `crcmod`
+
+:func:`crc64_combine` computes the crc of the concatenation of two buffers from their crc, so that the parts or
+ranges of a transfer checked concurrently give the crc of the whole object.
+
+Usage ::
+
+    >>> crc = crc64(b'hello ')
+    >>> crc = crc64(b'world', crc)
+    >>> crc == crc64_combine(crc64(b'hello '), crc64(b'world'), 5)
+    True
+"""
+import asyncio
+import logging
+import struct
+
+logger = logging.getLogger(__name__)
+
+#: buffers of at least this size are checked in a worker thread by the asynchronous helpers, so that the event loop
+#: keeps serving the other transfers meanwhile; None to always check them in the event loop
+offload_threshold = 1024 * 1024
+
+_MASK = 0xFFFFFFFFFFFFFFFF
+
+# ECMA-182 polynomial 0x42F0E1EBA9EA3693, bit reversed
+_POLY = 0xC96C5795D7870F42
+
+_CHECK_DATA = b'123456789'
+_CHECK_VALUE = 0x995DC9BBDF1939FA
+
+
+def _make_tables():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ _POLY if crc & 1 else crc >> 1
+        table.append(crc)
+
+    tables = [table]
+    for _ in range(7):
+        prev = tables[-1]
+        tables.append([(prev[i] >> 8) ^ table[prev[i] & 0xff] for i in range(256)])
+    return tables
+
+
+_TABLES = _make_tables()
+
+
+def _crc64_python(data, crc=0):
+    t0, t1, t2, t3, t4, t5, t6, t7 = _TABLES
+    crc ^= _MASK
+
+    data = memoryview(data).cast('B')
+    aligned = len(data) - len(data) % 8
+
+    # slicing-by-8: one step per 64 bits word instead of one per byte
+    for word, in struct.iter_unpack('<Q', data[:aligned]):
+        crc ^= word
+        crc = (t7[crc & 0xff] ^ t6[(crc >> 8) & 0xff] ^ t5[(crc >> 16) & 0xff] ^ t4[(crc >> 24) & 0xff] ^
+               t3[(crc >> 32) & 0xff] ^ t2[(crc >> 40) & 0xff] ^ t1[(crc >> 48) & 0xff] ^ t0[crc >> 56])
+
+    for b in data[aligned:]:
+        crc = t0[(crc ^ b) & 0xff] ^ (crc >> 8)
+
+    return crc ^ _MASK
+
+
+def _load_fastcrc():
+    import fastcrc
+    xz = fastcrc.crc64.xz
+    return lambda data, crc=0: xz(data, crc)
+
+
+def _load_anycrc():
+    import anycrc
+    model = anycrc.Model('CRC64-XZ')
+    return lambda data, crc=0: model.calc(data, crc)
+
+
+def _load_crcmod():
+    import crcmod
+    from crcmod import _crcfunext  # noqa: F401, only the C extension is worth it
+    return crcmod.mkCrcFun(0x142F0E1EBA9EA3693, initCrc=0, rev=True, xorOut=_MASK)
+
+
+_ENGINE_LOADERS = [('fastcrc', _load_fastcrc), ('anycrc', _load_anycrc), ('crcmod', _load_crcmod)]
+
+
+def _find_engine():
+    for name, loader in _ENGINE_LOADERS:
+        try:
+            func = loader()
+            if func(_CHECK_DATA) == _CHECK_VALUE and func(_CHECK_DATA[4:], func(_CHECK_DATA[:4])) == _CHECK_VALUE:
+                return name, func
+        except Exception:
+            continue
+        logger.warning('CRC64 engine {0} gives wrong results, skipped'.format(name))
+    return 'python', _crc64_python
+
+
+#: name of the engine computing the crc
+engine, _crc64 = _find_engine()
+
+
+def set_engine(func, name='custom'):
+    """Compute the crc with `func` from now on.
+
+    :param func: function called as `func(data, crc)`, returning the crc of `data` continued from `crc`, the crc of
+        the preceding data (0 at the start)
+    :param str name: name of the engine, reported by `engine`
+    """
+    global engine, _crc64
+    if func(_CHECK_DATA, 0) != _CHECK_VALUE:
+        raise ValueError('{0} does not compute CRC-64/XZ'.format(name))
+    engine, _crc64 = name, func
+
+
+def crc64(data, crc=0):
+    """Return the crc of `data`, continued from `crc`, the crc of the data before it."""
+    return _crc64(data, crc)
+
+
+async def crc64_async(data, crc=0):
+    """Same as :func:`crc64`, buffers of at least `offload_threshold` bytes are checked in a worker thread."""
+    if offload_threshold is not None and len(data) >= offload_threshold:
+        return await asyncio.get_event_loop().run_in_executor(None, _crc64, data, crc)
+    return _crc64(data, crc)
+
+
+def _multmodp(a, b):
+    # a * b modulo the polynomial, bit 63 is the coefficient of x^0
+    m = 1 << 63
+    p = 0
+    while True:
+        if a & m:
+            p ^= b
+            if a & (m - 1) == 0:
+                break
+        m >>= 1
+        b = (b >> 1) ^ _POLY if b & 1 else b >> 1
+    return p
+
+
+def _make_x2n_table():
+    # x^(2^n) modulo the polynomial
+    p = 1 << 62
+    table = [p]
+    for _ in range(63):
+        p = _multmodp(p, p)
+        table.append(p)
+    return table
+
+
+_X2N_TABLE = _make_x2n_table()
+
+
+def _x8nmodp(n):
+    # x^(8 * n) modulo the polynomial
+    p = 1 << 63
+    k = 3
+    while n:
+        if n & 1:
+            p = _multmodp(_X2N_TABLE[k & 63], p)
+        n >>= 1
+        k += 1
+    return p
+
+
+def crc64_combine(crc1, crc2, len2):
+    """Return the crc of the concatenation of two buffers.
+
+    :param int crc1: crc of the first buffer
+    :param int crc2: crc of the second buffer
+    :param int len2: size of the second buffer in bytes
+    """
+    if len2 <= 0:
+        return crc1
+    return _multmodp(_x8nmodp(len2), crc1) ^ crc2
+
+
+def calc_obj_crc_from_parts(parts, init_crc=0):
+    """Return the crc of an object from its parts, in order, each with `part_crc` and `size`."""
+    crc = init_crc
+    for part in parts:
+        if part.part_crc is None or part.size is None:
+            return None
+        crc = crc64_combine(crc, part.part_crc, part.size)
+    return crc
+
+
+class Crc64(object):
+    """Running crc of a stream, drop-in replacement of `oss2.utils.Crc64` used as `crc_callback` by the adapters.
+
+    :param int init_crc: crc of the data before the stream, e.g. the current crc of an appendable object
+    """
+
+    def __init__(self, init_crc=0):
+        self.crc = init_crc
+
+    def __call__(self, data):
+        self.update(data)
+
+    def update(self, data):
+        self.crc = _crc64(data, self.crc)
+
+    async def update_async(self, data):
+        self.crc = await crc64_async(data, self.crc)
+
+    def combine(self, crc1, crc2, len2):
+        return crc64_combine(crc1, crc2, len2)
@@ -0,0 +1,1236 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.fake_server
+~~~~~~~~~~~~~~~~~~~~~~~
+
+An in process stand-in of OSS built on `aiohttp.web`, for the tests and benchmarks which can't, or shouldn't, depend
+on credentials and on the network. `Service` and `Bucket` talk to it unchanged through its IP endpoint ::
+
+    >>> async with FakeOssServer() as server:
+    >>>     bucket = asyncio_oss.Bucket(oss2.Auth('ak', 'sk'), server.endpoint, 'bucket-name')
+    >>>     await bucket.put_object('a.txt', 'content of a')
+
+It speaks the subset of the API used by asyncio_oss: listing buckets, creating and deleting them, put, get (ranged
+or not), head, append, copy and delete of objects, object meta, multipart uploads (parts, part copies, list of parts
+and of uploads, complete, abort), listing of objects (v1 and v2), batch delete and object tagging. SelectObject of CSV
+and JSON lines objects only knows `select * from ossobject` and `select count(*) from ossobject`, over the whole
+object or a line or split range. The responses
+carry the ETag, CRC64 and request id headers of OSS, and the errors the XML body and code of OSS.
+
+The latency, the bandwidth and the failures of the real service can be simulated: `latency` delays the answer of
+each request, `bandwidth` caps the transfer of each body, objects and XML documents alike, and `error_rate` answers
+a fraction of the requests with an error, or :func:`FakeOssServer.inject_error` the next matching ones.
+
+Signatures, ACLs, versioning and the other bucket configurations are not implemented: any request is accepted as
+signed, including the presigned URLs of `sign_url`, and the unsupported ones are answered with `501 NotImplemented`.
+"""
+import asyncio
+import base64
+import bisect
+import calendar
+import collections
+import email.utils
+import hashlib
+import itertools
+import logging
+import os
+import random
+import re
+import struct
+import time
+import uuid
+import zlib
+from urllib.parse import quote, unquote, parse_qsl
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+from . import file_io, select_response
+from .crc import crc64, crc64_combine
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CONTENT_TYPE = 'application/octet-stream'
+
+# size of the chunks of the bodies sent by the server
+_CHUNK_SIZE = 256 * 1024
+
+# smaller with a bandwidth cap, for a smoother rate
+_THROTTLED_CHUNK_SIZE = 16 * 1024
+
+_MAX_KEYS = 1000
+
+
+class MemoryStorage(object):
+    """Keep the content of the objects in memory."""
+
+    #: whether the methods block on I/O and should be run in a worker thread
+    blocking = False
+
+    def write(self, data):
+        """Store `data` and return its handle."""
+        return bytes(data)
+
+    def read(self, blob, start=0, stop=None):
+        """Return the bytes of `blob` in [start, stop)."""
+        return blob[start:stop]
+
+    def concat(self, blobs):
+        """Store the concatenation of `blobs` and return its handle."""
+        return b''.join(blobs)
+
+    def delete(self, blob):
+        pass
+
+
+class DiskStorage(object):
+    """Keep the content of the objects in files of the directory `root`, one per object or part."""
+
+    blocking = True
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def write(self, data):
+        path = os.path.join(self.root, uuid.uuid4().hex)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def read(self, blob, start=0, stop=None):
+        with open(blob, 'rb') as f:
+            f.seek(start)
+            return f.read(-1 if stop is None else max(stop - start, 0))
+
+    def concat(self, blobs):
+        path = os.path.join(self.root, uuid.uuid4().hex)
+        with open(path, 'wb') as f:
+            for blob in blobs:
+                with open(blob, 'rb') as part:
+                    while True:
+                        chunk = part.read(_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+        return path
+
+    def delete(self, blob):
+        try:
+            os.remove(blob)
+        except FileNotFoundError:
+            pass
+
+
+class FakeObject(object):
+    """An object of a :class:`FakeOssServer`, `blob` is the handle of its content in the storage of the server."""
+
+    __slots__ = ('key', 'blob', 'size', 'etag', 'crc', 'content_md5', 'last_modified', 'content_type', 'metadata',
+                 'tags', 'object_type')
+
+    def __init__(self, key, blob, size, etag, crc, content_md5='', last_modified=None,
+                 content_type=_DEFAULT_CONTENT_TYPE, metadata=None, tags=None, object_type='Normal'):
+        self.key = key
+        self.blob = blob
+        self.size = size
+        self.etag = etag
+        self.crc = crc
+        self.content_md5 = content_md5
+        self.last_modified = last_modified or time.time()
+        self.content_type = content_type
+        self.metadata = metadata or {}
+        self.tags = tags or collections.OrderedDict()
+        self.object_type = object_type
+
+
+class FakeBucket(object):
+    """A bucket of a :class:`FakeOssServer`: its objects by key, the sorted list of the keys and the multipart uploads
+    in progress."""
+
+    def __init__(self, name, location='oss-cn-hangzhou'):
+        self.name = name
+        self.location = location
+        self.created = time.time()
+        self.objects = {}
+        self.keys = []
+        self.uploads = collections.OrderedDict()
+
+    def put(self, obj):
+        if obj.key not in self.objects:
+            bisect.insort(self.keys, obj.key)
+        previous = self.objects.get(obj.key)
+        self.objects[obj.key] = obj
+        return previous
+
+    def pop(self, key):
+        obj = self.objects.pop(key, None)
+        if obj is not None:
+            del self.keys[bisect.bisect_left(self.keys, key)]
+        return obj
+
+
+class _Upload(object):
+    def __init__(self, key, upload_id, content_type, metadata, tags):
+        self.key = key
+        self.upload_id = upload_id
+        self.initiated = time.time()
+        self.content_type = content_type
+        self.metadata = metadata
+        self.tags = tags
+
+        # {part number: (blob, size, etag, crc, md5 digest, last modified)}
+        self.parts = {}
+
+
+class _OssError(Exception):
+    def __init__(self, status, code, message, **details):
+        self.status = status
+        self.code = code
+        self.message = message
+        self.details = details
+
+
+class _Throttle(object):
+    """Cap the transfer of a body to `rate` bytes per second."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.start = time.monotonic()
+        self.transferred = 0
+
+    async def consume(self, nbytes):
+        self.transferred += nbytes
+        delay = self.transferred / self.rate - (time.monotonic() - self.start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _http_date(timestamp):
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+def _iso8601(timestamp):
+    return time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(timestamp))
+
+
+def _md5_etag(digest):
+    return digest.hex().upper()
+
+
+def _prefix_end(prefix):
+    # the smallest string greater than all the strings starting with `prefix`
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _parse_range(value, size):
+    # (start, stop) of a single range 'bytes=a-b', 'bytes=a-' or 'bytes=-n', None if it is invalid or not satisfiable
+    if not value or not value.startswith('bytes=') or ',' in value:
+        return None
+    first, _, last = value[len('bytes='):].strip().partition('-')
+    try:
+        if first == '':
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size
+        start = int(first)
+        stop = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size or stop <= start:
+        return None
+    return start, min(stop, size)
+
+
+class FakeOssServer(object):
+    """In process stand-in of OSS, see :mod:`asyncio_oss.fake_server`.
+
+    :param str host: address the server listens on
+    :param int port: port the server listens on, 0 to pick a free one
+    :param storage: where the content of the objects is kept, :class:`MemoryStorage` (default) or
+        :class:`DiskStorage`
+    :param latency: delay in seconds before the answer of each request, or a function returning it, e.g.
+        `lambda: random.expovariate(1 / 0.02)`
+    :param int bandwidth: max bytes per second of each request and response body, None for no cap
+    :param float error_rate: fraction of the requests answered with `error_status` and `error_code`
+    :param int error_status: HTTP status of the random errors
+    :param str error_code: OSS error code of the random errors
+    :param bool auto_create_buckets: create the buckets on their first use, rather than answering `NoSuchBucket`
+    :param int seed: seed of the random errors
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, storage=None, latency=0.0, bandwidth=None, error_rate=0.0,
+                 error_status=503, error_code='SlowDown', auto_create_buckets=True, seed=None):
+        self.host = host
+        self.port = port
+        self.storage = storage or MemoryStorage()
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.error_code = error_code
+        self.auto_create_buckets = auto_create_buckets
+
+        #: {bucket name: FakeBucket}
+        self.buckets = {}
+
+        #: number of requests received, by operation, e.g. `server.requests['put_object']`
+        self.requests = collections.Counter()
+
+        #: size of the splits of the objects reported by `create_select_object_meta`, cut at the end of a record
+        self.select_split_size = _SELECT_SPLIT_SIZE
+        self._select_cache = {}
+
+        self._random = random.Random(seed)
+        self._injected_errors = []
+        self._upload_ids = itertools.count(1)
+        self._runner = None
+
+    @property
+    def endpoint(self):
+        return 'http://{0}:{1}'.format(self.host, self.port)
+
+    async def start(self):
+        app = web.Application(client_max_size=1024 ** 4)
+        app.router.add_route('*', '/{path:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if not self.port:
+            self.port = site._server.sockets[0].getsockname()[1]
+        logger.debug("Fake OSS server listening on {0}".format(self.endpoint))
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def inject_error(self, status=503, code='SlowDown', count=1, method=None, key=None):
+        """Answer the next `count` requests matching `method` and `key` (any if None) with an error."""
+        self._injected_errors.append([status, code, count, method, key])
+
+    def create_bucket(self, bucket_name, location='oss-cn-hangzhou'):
+        """Create the bucket `bucket_name` if it doesn't exist and return it."""
+        bucket = self.buckets.get(bucket_name)
+        if bucket is None:
+            bucket = self.buckets[bucket_name] = FakeBucket(bucket_name, location)
+        return bucket
+
+    def add_object(self, bucket_name, key, data=b'', content_type=_DEFAULT_CONTENT_TYPE, metadata=None, tags=None):
+        """Store an object without any request, e.g. to fill a bucket to list. The content is written synchronously,
+        even with a :class:`DiskStorage`."""
+        digest = hashlib.md5(data).digest()
+        obj = FakeObject(key, self.storage.write(data), len(data), _md5_etag(digest), crc64(data),
+                         base64.b64encode(digest).decode(), content_type=content_type, metadata=metadata, tags=tags)
+        self._replace(self.create_bucket(bucket_name), obj)
+        return obj
+
+    def get_object_data(self, bucket_name, key):
+        """Return the content of an object, synchronously."""
+        obj = self.buckets[bucket_name].objects[key]
+        return self.storage.read(obj.blob)
+
+    async def _storage(self, method, *args):
+        if self.storage.blocking:
+            return await file_io.run(method, *args)
+        return method(*args)
+
+    def _replace(self, bucket, obj):
+        previous = bucket.put(obj)
+        if previous is not None:
+            self.storage.delete(previous.blob)
+
+    async def _handle(self, request):
+        request_id = uuid.uuid4().hex[:24].upper()
+        try:
+            bucket_name, key = self._parse_path(request)
+            handler, operation = self._route(request, bucket_name, key)
+            self.requests[operation] += 1
+
+            latency = self.latency() if callable(self.latency) else self.latency
+            if latency:
+                await asyncio.sleep(latency)
+            self._maybe_fail(request, key)
+
+            bucket = None
+            if bucket_name:
+                bucket = self.buckets.get(bucket_name)
+                if bucket is None:
+                    if not self.auto_create_buckets and operation != 'create_bucket':
+                        raise _OssError(404, 'NoSuchBucket', 'The specified bucket does not exist.',
+                                        BucketName=bucket_name)
+                    bucket = self.create_bucket(bucket_name)
+            response = await handler(request, bucket, key)
+        except _OssError as e:
+            # the body of the request is read whatever the error, for the connection to be reused
+            await request.read()
+            response = self._error_response(request, e, request_id)
+
+        response.headers['x-oss-request-id'] = request_id
+        response.headers['Server'] = 'AliyunOSS'
+        if isinstance(response, _BodyResponse):
+            return await response.send(request, self)
+        if self.bandwidth is not None and response.body:
+            return await _send_throttled(request, response, self.bandwidth)
+        return response
+
+    @staticmethod
+    def _parse_path(request):
+        path = unquote(request.raw_path.split('?', 1)[0])
+        bucket_name, _, key = path[1:].partition('/')
+        return bucket_name, key
+
+    def _route(self, request, bucket_name, key):
+        method = request.method
+        # the signature of a presigned URL is in its query, it doesn't change the operation
+        query = dict((name, value) for name, value in request.query.items() if name not in _QUERY_AUTH_PARAMS)
+        if not bucket_name:
+            routes = {'GET': 'list_buckets'} if set(query) <= _LIST_BUCKETS_PARAMS else {}
+        elif not key:
+            if method == 'GET' and 'uploads' in query:
+                routes = {'GET': 'list_multipart_uploads'}
+            elif method == 'GET' and query.get('list-type') == '2':
+                routes = {'GET': 'list_objects_v2'}
+            elif method == 'POST' and 'delete' in query:
+                routes = {'POST': 'batch_delete_objects'}
+            elif method == 'GET' and set(query) <= _LIST_OBJECTS_PARAMS:
+                routes = {'GET': 'list_objects'}
+            else:
+                # the other sub-resources of the buckets (acl, cors, lifecycle...) are not implemented
+                routes = {'PUT': 'create_bucket', 'DELETE': 'delete_bucket'} if not query else {}
+        elif 'uploads' in query:
+            routes = {'POST': 'init_multipart_upload'}
+        elif 'uploadId' in query:
+            if 'partNumber' in query:
+                copy = 'x-oss-copy-source' in request.headers
+                routes = {'PUT': 'upload_part_copy' if copy else 'upload_part'}
+            else:
+                routes = {'POST': 'complete_multipart_upload', 'GET': 'list_parts',
+                          'DELETE': 'abort_multipart_upload'}
+        elif 'tagging' in query:
+            routes = {'PUT': 'put_object_tagging', 'GET': 'get_object_tagging', 'DELETE': 'delete_object_tagging'}
+        elif 'append' in query:
+            routes = {'POST': 'append_object'}
+        elif 'objectMeta' in query:
+            routes = {'HEAD': 'get_object_meta', 'GET': 'get_object_meta'}
+        elif method == 'POST' and 'x-oss-process' in query:
+            routes = {'POST': _SELECT_PROCESSES.get(query['x-oss-process'])}
+        elif query:
+            routes = {'GET': 'get_object', 'HEAD': 'head_object'} if set(query) <= _GET_OBJECT_PARAMS else {}
+        else:
+            copy = 'x-oss-copy-source' in request.headers
+            routes = {'PUT': 'copy_object' if copy else 'put_object', 'GET': 'get_object', 'HEAD': 'head_object',
+                      'DELETE': 'delete_object'}
+
+        operation = routes.get(method)
+        if operation is None:
+            raise _OssError(501, 'NotImplemented', 'The fake OSS server does not support {0} {1}'.format(
+                method, request.path_qs))
+        return getattr(self, '_' + operation), operation
+
+    def _maybe_fail(self, request, key):
+        for error in self._injected_errors:
+            status, code, count, method, error_key = error
+            if (method is None or method == request.method) and (error_key is None or error_key == key):
+                error[2] -= 1
+                if error[2] <= 0:
+                    self._injected_errors.remove(error)
+                raise _OssError(status, code, 'Error injected by the fake OSS server.')
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise _OssError(self.error_status, self.error_code, 'Error injected by the fake OSS server.')
+
+    def _error_response(self, request, error, request_id):
+        details = ''.join('<{0}>{1}</{0}>'.format(name, escape(str(value))) for name, value in error.details.items())
+        body = ('<?xml version="1.0" encoding="UTF-8"?>\n<Error><Code>{0}</Code><Message>{1}</Message>'
+                '<RequestId>{2}</RequestId><HostId>{3}</HostId>{4}</Error>').format(
+            error.code, escape(error.message), request_id, request.host, details)
+        headers = {'x-oss-ec': '0000-00000000'}
+        if request.method == 'HEAD':
+            # no body for HEAD, OSS gives the error in a header instead
+            headers['x-oss-err'] = base64.b64encode(body.encode('utf-8')).decode()
+            return web.Response(status=error.status, headers=headers)
+        return web.Response(status=error.status, body=body.encode('utf-8'), content_type='application/xml',
+                            headers=headers)
+
+    # body of the requests
+
+    async def _read_body(self, request):
+        if self.bandwidth is None:
+            data = await request.read()
+        else:
+            throttle = _Throttle(self.bandwidth)
+            chunks = bytearray()
+            async for chunk in request.content.iter_chunked(_THROTTLED_CHUNK_SIZE):
+                chunks += chunk
+                await throttle.consume(len(chunk))
+            data = bytes(chunks)
+
+        content_md5 = request.headers.get('Content-MD5')
+        if content_md5 is not None and content_md5 != base64.b64encode(hashlib.md5(data).digest()).decode():
+            raise _OssError(400, 'InvalidDigest', 'The Content-MD5 you specified was invalid.')
+        return data
+
+    async def _read_xml(self, request):
+        data = await self._read_body(request)
+        try:
+            return ElementTree.fromstring(data)
+        except ElementTree.ParseError:
+            raise _OssError(400, 'MalformedXML', 'The XML you provided was not well-formed.')
+
+    @staticmethod
+    def _object_attributes(request):
+        headers = request.headers
+        content_type = headers.get('Content-Type') or _DEFAULT_CONTENT_TYPE
+        metadata = dict((name.lower(), value) for name, value in headers.items()
+                        if name.lower().startswith('x-oss-meta-'))
+        tags = collections.OrderedDict(parse_qsl(headers.get('x-oss-tagging', ''), keep_blank_values=True))
+        return content_type, metadata, tags
+
+    async def _store(self, bucket, key, data, content_type, metadata, tags, object_type='Normal'):
+        digest = hashlib.md5(data).digest()
+        blob = await self._storage(self.storage.write, data)
+        obj = FakeObject(key, blob, len(data), _md5_etag(digest), crc64(data), base64.b64encode(digest).decode(),
+                         content_type=content_type, metadata=metadata, tags=tags, object_type=object_type)
+        self._replace(bucket, obj)
+        return obj
+
+    @staticmethod
+    def _get(bucket, key):
+        obj = bucket.objects.get(key)
+        if obj is None:
+            raise _OssError(404, 'NoSuchKey', 'The specified key does not exist.', Key=key)
+        return obj
+
+    @staticmethod
+    def _object_headers(obj):
+        headers = {
+            'ETag': '"{0}"'.format(obj.etag),
+            'Last-Modified': _http_date(obj.last_modified),
+            'Content-Type': obj.content_type,
+            'x-oss-object-type': obj.object_type,
+            'x-oss-storage-class': 'Standard',
+            'x-oss-hash-crc64ecma': str(obj.crc),
+            'Accept-Ranges': 'bytes',
+        }
+        if obj.content_md5:
+            headers['Content-MD5'] = obj.content_md5
+        if obj.object_type == 'Appendable':
+            headers['x-oss-next-append-position'] = str(obj.size)
+        if obj.tags:
+            headers['x-oss-tagging-count'] = str(len(obj.tags))
+        headers.update(obj.metadata)
+        return headers
+
+    @staticmethod
+    def _check_conditions(request, obj):
+        headers = request.headers
+        if 'If-Match' in headers and headers['If-Match'].strip('"') != obj.etag:
+            raise _OssError(412, 'PreconditionFailed', 'At least one of the pre-conditions you specified did not hold.')
+        if 'If-None-Match' in headers and headers['If-None-Match'].strip('"') == obj.etag:
+            return False
+        if 'If-Modified-Since' in headers:
+            since = email.utils.parsedate(headers['If-Modified-Since'])
+            if since is not None and int(obj.last_modified) <= calendar.timegm(since):
+                return False
+        if 'If-Unmodified-Since' in headers:
+            since = email.utils.parsedate(headers['If-Unmodified-Since'])
+            if since is not None and int(obj.last_modified) > calendar.timegm(since):
+                raise _OssError(412, 'PreconditionFailed',
+                                'At least one of the pre-conditions you specified did not hold.')
+        return True
+
+    # service
+
+    async def _list_buckets(self, request, bucket, key):
+        query = request.query
+        prefix = query.get('prefix', '')
+        marker = query.get('marker', '')
+        max_keys = min(int(query.get('max-keys') or 100), _MAX_KEYS)
+        names = [name for name in sorted(self.buckets) if name.startswith(prefix) and name > marker]
+        truncated = len(names) > max_keys
+        names = names[:max_keys]
+
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<ListAllMyBucketsResult>',
+                 '<Owner><ID>fake-owner</ID><DisplayName>fake-owner</DisplayName></Owner>']
+        if truncated:
+            parts.append('<IsTruncated>true</IsTruncated><NextMarker>{0}</NextMarker>'.format(escape(names[-1])))
+        parts.append('<Buckets>')
+        for name in names:
+            b = self.buckets[name]
+            parts.append('<Bucket><Name>{0}</Name><CreationDate>{1}</CreationDate><Location>{2}</Location>'
+                         '<ExtranetEndpoint>{3}</ExtranetEndpoint><IntranetEndpoint>{3}</IntranetEndpoint>'
+                         '<StorageClass>Standard</StorageClass></Bucket>'.format(
+                             escape(name), _iso8601(b.created), b.location, request.host))
+        parts.append('</Buckets></ListAllMyBucketsResult>')
+        return _xml_response(parts)
+
+    # bucket
+
+    async def _create_bucket(self, request, bucket, key):
+        await request.read()
+        return web.Response()
+
+    async def _delete_bucket(self, request, bucket, key):
+        if bucket.objects or bucket.uploads:
+            raise _OssError(409, 'BucketNotEmpty', 'The bucket has objects. Please delete them first.',
+                            BucketName=bucket.name)
+        del self.buckets[bucket.name]
+        return web.Response(status=204)
+
+    def _list(self, bucket, prefix, delimiter, after, max_keys):
+        # (keys, common prefixes, is truncated, next marker) of the objects after `after`
+        keys = bucket.keys
+        i = bisect.bisect_left(keys, prefix)
+        if after:
+            i = max(i, bisect.bisect_right(keys, after))
+
+        contents = []
+        prefixes = []
+        next_marker = ''
+        while i < len(keys):
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+
+            common_prefix = None
+            if delimiter:
+                j = key.find(delimiter, len(prefix))
+                if j >= 0:
+                    common_prefix = key[:j + len(delimiter)]
+                    if common_prefix <= after:
+                        # listed by a previous page
+                        i = bisect.bisect_left(keys, _prefix_end(common_prefix), i)
+                        continue
+
+            if len(contents) + len(prefixes) >= max_keys:
+                return contents, prefixes, True, next_marker
+
+            if common_prefix is not None:
+                prefixes.append(common_prefix)
+                next_marker = common_prefix
+                i = bisect.bisect_left(keys, _prefix_end(common_prefix), i)
+            else:
+                contents.append(bucket.objects[key])
+                next_marker = key
+                i += 1
+
+        return contents, prefixes, False, ''
+
+    @staticmethod
+    def _list_entries(contents, prefixes, encode, fetch_owner=True):
+        parts = []
+        for obj in contents:
+            owner = '<Owner><ID>fake-owner</ID><DisplayName>fake-owner</DisplayName></Owner>' if fetch_owner else ''
+            parts.append('<Contents><Key>{0}</Key><LastModified>{1}</LastModified><ETag>"{2}"</ETag><Type>{3}</Type>'
+                         '<Size>{4}</Size><StorageClass>Standard</StorageClass>{5}</Contents>'.format(
+                             encode(obj.key), _iso8601(obj.last_modified), obj.etag, obj.object_type, obj.size, owner))
+        for prefix in prefixes:
+            parts.append('<CommonPrefixes><Prefix>{0}</Prefix></CommonPrefixes>'.format(encode(prefix)))
+        return parts
+
+    async def _list_objects(self, request, bucket, key):
+        query = request.query
+        prefix = query.get('prefix', '')
+        delimiter = query.get('delimiter', '')
+        marker = query.get('marker', '')
+        max_keys = min(int(query.get('max-keys') or 100), _MAX_KEYS)
+        encode = _get_encoder(query)
+
+        contents, prefixes, truncated, next_marker = self._list(bucket, prefix, delimiter, marker, max_keys)
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<ListBucketResult>']
+        if query.get('encoding-type') == 'url':
+            parts.append('<EncodingType>url</EncodingType>')
+        parts.append('<Name>{0}</Name><Prefix>{1}</Prefix><Marker>{2}</Marker><MaxKeys>{3}</MaxKeys>'
+                     '<Delimiter>{4}</Delimiter><IsTruncated>{5}</IsTruncated>'.format(
+                         bucket.name, encode(prefix), encode(marker), max_keys, encode(delimiter),
+                         'true' if truncated else 'false'))
+        if truncated:
+            parts.append('<NextMarker>{0}</NextMarker>'.format(encode(next_marker)))
+        parts.extend(self._list_entries(contents, prefixes, encode))
+        parts.append('</ListBucketResult>')
+        return _xml_response(parts)
+
+    async def _list_objects_v2(self, request, bucket, key):
+        query = request.query
+        prefix = query.get('prefix', '')
+        delimiter = query.get('delimiter', '')
+        token = query.get('continuation-token', '')
+        start_after = query.get('start-after', '')
+        max_keys = min(int(query.get('max-keys') or 100), _MAX_KEYS)
+        encode = _get_encoder(query)
+
+        after = max(token, start_after)
+        contents, prefixes, truncated, next_marker = self._list(bucket, prefix, delimiter, after, max_keys)
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<ListBucketResult>']
+        if query.get('encoding-type') == 'url':
+            parts.append('<EncodingType>url</EncodingType>')
+        parts.append('<Name>{0}</Name><Prefix>{1}</Prefix><MaxKeys>{2}</MaxKeys><Delimiter>{3}</Delimiter>'
+                     '<IsTruncated>{4}</IsTruncated>'.format(bucket.name, encode(prefix), max_keys, encode(delimiter),
+                                                             'true' if truncated else 'false'))
+        if start_after:
+            parts.append('<StartAfter>{0}</StartAfter>'.format(encode(start_after)))
+        if token:
+            parts.append('<ContinuationToken>{0}</ContinuationToken>'.format(encode(token)))
+        if truncated:
+            parts.append('<NextContinuationToken>{0}</NextContinuationToken>'.format(encode(next_marker)))
+        parts.extend(self._list_entries(contents, prefixes, encode, query.get('fetch-owner') == 'true'))
+        parts.append('<KeyCount>{0}</KeyCount></ListBucketResult>'.format(len(contents) + len(prefixes)))
+        return _xml_response(parts)
+
+    async def _batch_delete_objects(self, request, bucket, key):
+        root = await self._read_xml(request)
+        quiet = root.findtext('Quiet', 'false').lower() == 'true'
+        encode = _get_encoder(request.query)
+
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<DeleteResult>']
+        if request.query.get('encoding-type') == 'url':
+            parts.append('<EncodingType>url</EncodingType>')
+        for node in root.findall('Object'):
+            object_key = node.findtext('Key', '')
+            obj = bucket.pop(object_key)
+            if obj is not None:
+                await self._storage(self.storage.delete, obj.blob)
+            if not quiet:
+                parts.append('<Deleted><Key>{0}</Key></Deleted>'.format(encode(object_key)))
+        parts.append('</DeleteResult>')
+        return _xml_response(parts)
+
+    async def _list_multipart_uploads(self, request, bucket, key):
+        query = request.query
+        prefix = query.get('prefix', '')
+        key_marker = query.get('key-marker', '')
+        upload_id_marker = query.get('upload-id-marker', '')
+        max_uploads = min(int(query.get('max-uploads') or 1000), _MAX_KEYS)
+        encode = _get_encoder(query)
+
+        uploads = sorted((upload for upload in bucket.uploads.values() if upload.key.startswith(prefix)),
+                         key=lambda upload: (upload.key, upload.upload_id))
+        if key_marker:
+            uploads = [upload for upload in uploads
+                       if upload.key > key_marker or (upload.key == key_marker and
+                                                      upload_id_marker and upload.upload_id > upload_id_marker)]
+        truncated = len(uploads) > max_uploads
+        uploads = uploads[:max_uploads]
+        next_key_marker = uploads[-1].key if truncated else ''
+        next_upload_id_marker = uploads[-1].upload_id if truncated else ''
+
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<ListMultipartUploadsResult>']
+        if query.get('encoding-type') == 'url':
+            parts.append('<EncodingType>url</EncodingType>')
+        parts.append('<Bucket>{0}</Bucket><KeyMarker>{1}</KeyMarker><UploadIdMarker>{2}</UploadIdMarker>'
+                     '<NextKeyMarker>{3}</NextKeyMarker><NextUploadIdMarker>{4}</NextUploadIdMarker>'
+                     '<MaxUploads>{5}</MaxUploads><IsTruncated>{6}</IsTruncated>'.format(
+                         bucket.name, encode(key_marker), upload_id_marker, encode(next_key_marker),
+                         next_upload_id_marker, max_uploads, 'true' if truncated else 'false'))
+        for upload in uploads:
+            parts.append('<Upload><Key>{0}</Key><UploadId>{1}</UploadId><StorageClass>Standard</StorageClass>'
+                         '<Initiated>{2}</Initiated></Upload>'.format(encode(upload.key), upload.upload_id,
+                                                                       _iso8601(upload.initiated)))
+        parts.append('</ListMultipartUploadsResult>')
+        return _xml_response(parts)
+
+    # object
+
+    async def _put_object(self, request, bucket, key):
+        data = await self._read_body(request)
+        obj = await self._store(bucket, key, data, *self._object_attributes(request))
+        return web.Response(headers={'ETag': '"{0}"'.format(obj.etag), 'x-oss-hash-crc64ecma': str(obj.crc),
+                                     'Content-MD5': obj.content_md5})
+
+    async def _append_object(self, request, bucket, key):
+        position = int(request.query.get('position', '0'))
+        data = await self._read_body(request)
+        obj = bucket.objects.get(key)
+        if obj is None:
+            if position != 0:
+                raise _OssError(409, 'PositionNotEqualToLength', 'Position is not equal to file length.')
+            obj = await self._store(bucket, key, data, *self._object_attributes(request), object_type='Appendable')
+        else:
+            if obj.object_type != 'Appendable':
+                raise _OssError(409, 'ObjectNotAppendable', 'The object is not appendable.')
+            if position != obj.size:
+                raise _OssError(409, 'PositionNotEqualToLength', 'Position is not equal to file length.')
+            blob = await self._storage(self.storage.concat, [obj.blob, await self._storage(self.storage.write, data)])
+            digest = hashlib.md5(await self._storage(self.storage.read, blob)).digest()
+            obj = FakeObject(key, blob, obj.size + len(data), _md5_etag(digest), crc64_combine(obj.crc, crc64(data),
+                                                                                                len(data)),
+                             last_modified=time.time(), content_type=obj.content_type, metadata=obj.metadata,
+                             tags=obj.tags, object_type='Appendable')
+            self._replace(bucket, obj)
+        return web.Response(headers={'ETag': '"{0}"'.format(obj.etag), 'x-oss-hash-crc64ecma': str(obj.crc),
+                                     'x-oss-next-append-position': str(obj.size)})
+
+    async def _get_object(self, request, bucket, key):
+        obj = self._get(bucket, key)
+        if not self._check_conditions(request, obj):
+            return web.Response(status=304, headers={'ETag': '"{0}"'.format(obj.etag)})
+
+        headers = self._object_headers(obj)
+        start, stop, status = 0, obj.size, 200
+        range_header = request.headers.get('Range')
+        if range_header:
+            byte_range = _parse_range(range_header, obj.size)
+            if byte_range is not None:
+                start, stop = byte_range
+                status = 206
+                headers['Content-Range'] = 'bytes {0}-{1}/{2}'.format(start, stop - 1, obj.size)
+            elif request.headers.get('x-oss-range-behavior') == 'standard':
+                raise _OssError(416, 'InvalidRange', 'The requested range cannot be satisfied.')
+
+        for name, header in _RESPONSE_OVERRIDES:
+            if name in request.query:
+                headers[header] = request.query[name]
+        return _BodyResponse(status, headers, obj, start, stop)
+
+    async def _head_object(self, request, bucket, key):
+        obj = self._get(bucket, key)
+        if not self._check_conditions(request, obj):
+            return web.Response(status=304, headers={'ETag': '"{0}"'.format(obj.etag)})
+        headers = self._object_headers(obj)
+        headers['Content-Length'] = str(obj.size)
+        return _HeadResponse(headers)
+
+    async def _get_object_meta(self, request, bucket, key):
+        obj = self._get(bucket, key)
+        headers = {'ETag': '"{0}"'.format(obj.etag), 'Last-Modified': _http_date(obj.last_modified),
+                   'Content-Length': str(obj.size)}
+        return _HeadResponse(headers)
+
+    async def _delete_object(self, request, bucket, key):
+        obj = bucket.pop(key)
+        if obj is not None:
+            await self._storage(self.storage.delete, obj.blob)
+        return web.Response(status=204)
+
+    def _copy_source(self, request):
+        source = unquote(request.headers['x-oss-copy-source'])
+        source_bucket_name, _, source_key = source.lstrip('/').partition('/')
+        source_key = source_key.split('?versionId=', 1)[0]
+        source_bucket = self.buckets.get(source_bucket_name)
+        if source_bucket is None:
+            raise _OssError(404, 'NoSuchBucket', 'The specified bucket does not exist.',
+                            BucketName=source_bucket_name)
+        return self._get(source_bucket, source_key)
+
+    async def _copy_object(self, request, bucket, key):
+        source = self._copy_source(request)
+        await request.read()
+        data = await self._storage(self.storage.read, source.blob)
+
+        if request.headers.get('x-oss-metadata-directive', 'COPY').upper() == 'REPLACE':
+            content_type, metadata, _ = self._object_attributes(request)
+        else:
+            content_type, metadata = source.content_type, dict(source.metadata)
+        if request.headers.get('x-oss-tagging-directive', 'COPY').upper() == 'REPLACE':
+            tags = self._object_attributes(request)[2]
+        else:
+            tags = collections.OrderedDict(source.tags)
+
+        obj = await self._store(bucket, key, data, content_type, metadata, tags)
+        body = ('<?xml version="1.0" encoding="UTF-8"?>\n<CopyObjectResult><ETag>"{0}"</ETag>'
+                '<LastModified>{1}</LastModified></CopyObjectResult>').format(obj.etag, _iso8601(obj.last_modified))
+        return web.Response(body=body.encode('utf-8'), content_type='application/xml',
+                            headers={'ETag': '"{0}"'.format(obj.etag), 'x-oss-hash-crc64ecma': str(obj.crc)})
+
+    # multipart upload
+
+    def _get_upload(self, bucket, request):
+        upload = bucket.uploads.get(request.query['uploadId'])
+        if upload is None:
+            raise _OssError(404, 'NoSuchUpload', 'The specified upload does not exist.',
+                            UploadId=request.query['uploadId'])
+        return upload
+
+    async def _init_multipart_upload(self, request, bucket, key):
+        await request.read()
+        upload_id = '{0:032X}'.format(next(self._upload_ids))
+        bucket.uploads[upload_id] = _Upload(key, upload_id, *self._object_attributes(request))
+        body = ('<?xml version="1.0" encoding="UTF-8"?>\n<InitiateMultipartUploadResult><Bucket>{0}</Bucket>'
+                '<Key>{1}</Key><UploadId>{2}</UploadId></InitiateMultipartUploadResult>').format(
+            bucket.name, escape(key), upload_id)
+        return web.Response(body=body.encode('utf-8'), content_type='application/xml')
+
+    async def _add_part(self, bucket, upload, part_number, data):
+        digest = hashlib.md5(data).digest()
+        blob = await self._storage(self.storage.write, data)
+        previous = upload.parts.get(part_number)
+        upload.parts[part_number] = (blob, len(data), _md5_etag(digest), crc64(data), digest, time.time())
+        if previous is not None:
+            await self._storage(self.storage.delete, previous[0])
+        return upload.parts[part_number]
+
+    @staticmethod
+    def _part_number(request):
+        part_number = int(request.query['partNumber'])
+        if not 1 <= part_number <= 10000:
+            raise _OssError(400, 'InvalidArgument', 'Part number must be an integer between 1 and 10000.')
+        return part_number
+
+    async def _upload_part(self, request, bucket, key):
+        upload = self._get_upload(bucket, request)
+        part_number = self._part_number(request)
+        data = await self._read_body(request)
+        _, _, etag, crc, digest, _ = await self._add_part(bucket, upload, part_number, data)
+        return web.Response(headers={'ETag': '"{0}"'.format(etag), 'x-oss-hash-crc64ecma': str(crc),
+                                     'Content-MD5': base64.b64encode(digest).decode()})
+
+    async def _upload_part_copy(self, request, bucket, key):
+        upload = self._get_upload(bucket, request)
+        part_number = self._part_number(request)
+        source = self._copy_source(request)
+        await request.read()
+
+        start, stop = 0, source.size
+        range_header = request.headers.get('x-oss-copy-source-range')
+        if range_header:
+            byte_range = _parse_range(range_header, source.size)
+            if byte_range is None:
+                raise _OssError(416, 'InvalidRange', 'The requested range cannot be satisfied.')
+            start, stop = byte_range
+        data = await self._storage(self.storage.read, source.blob, start, stop)
+        _, _, etag, crc, _, last_modified = await self._add_part(bucket, upload, part_number, data)
+        body = ('<?xml version="1.0" encoding="UTF-8"?>\n<CopyPartResult><LastModified>{0}</LastModified>'
+                '<ETag>"{1}"</ETag></CopyPartResult>').format(_iso8601(last_modified), etag)
+        return web.Response(body=body.encode('utf-8'), content_type='application/xml',
+                            headers={'ETag': '"{0}"'.format(etag), 'x-oss-hash-crc64ecma': str(crc)})
+
+    async def _complete_multipart_upload(self, request, bucket, key):
+        upload = self._get_upload(bucket, request)
+        if request.headers.get('x-oss-complete-all', '').lower() == 'yes':
+            await request.read()
+            part_numbers = sorted(upload.parts)
+        else:
+            root = await self._read_xml(request)
+            part_numbers = []
+            for node in root.findall('Part'):
+                part_number = int(node.findtext('PartNumber', '0'))
+                part = upload.parts.get(part_number)
+                if part is None or node.findtext('ETag', '').strip('"').upper() != part[2]:
+                    raise _OssError(400, 'InvalidPart', 'One or more of the specified parts could not be found or '
+                                                        'the specified entity tag might not have matched the part\'s '
+                                                        'entity tag.', PartNumber=part_number)
+                if part_numbers and part_number <= part_numbers[-1]:
+                    raise _OssError(400, 'InvalidPartOrder', 'The list of parts was not in ascending order.')
+                part_numbers.append(part_number)
+        if not part_numbers:
+            raise _OssError(400, 'InvalidRequest', 'The list of parts is empty.')
+
+        parts = [upload.parts[part_number] for part_number in part_numbers]
+        blob = await self._storage(self.storage.concat, [part[0] for part in parts])
+        crc = 0
+        for part in parts:
+            crc = crc64_combine(crc, part[3], part[1])
+        etag = '{0}-{1}'.format(_md5_etag(hashlib.md5(b''.join(part[4] for part in parts)).digest()), len(parts))
+
+        obj = FakeObject(key, blob, sum(part[1] for part in parts), etag, crc, content_type=upload.content_type,
+                         metadata=upload.metadata, tags=upload.tags, object_type='Multipart')
+        self._replace(bucket, obj)
+        del bucket.uploads[upload.upload_id]
+        for part in upload.parts.values():
+            await self._storage(self.storage.delete, part[0])
+
+        encode = _get_encoder(request.query)
+        body = ['<?xml version="1.0" encoding="UTF-8"?>\n<CompleteMultipartUploadResult>']
+        if request.query.get('encoding-type') == 'url':
+            body.append('<EncodingType>url</EncodingType>')
+        body.append('<Location>{0}/{1}/{2}</Location><Bucket>{1}</Bucket><Key>{3}</Key><ETag>"{4}"</ETag>'
+                    '</CompleteMultipartUploadResult>'.format(self.endpoint, bucket.name, escape(key), encode(key),
+                                                              etag))
+        return _xml_response(body, headers={'ETag': '"{0}"'.format(etag), 'x-oss-hash-crc64ecma': str(crc)})
+
+    async def _abort_multipart_upload(self, request, bucket, key):
+        upload = self._get_upload(bucket, request)
+        del bucket.uploads[upload.upload_id]
+        for part in upload.parts.values():
+            await self._storage(self.storage.delete, part[0])
+        return web.Response(status=204)
+
+    async def _list_parts(self, request, bucket, key):
+        upload = self._get_upload(bucket, request)
+        marker = int(request.query.get('part-number-marker') or 0)
+        max_parts = min(int(request.query.get('max-parts') or 1000), _MAX_KEYS)
+
+        part_numbers = [part_number for part_number in sorted(upload.parts) if part_number > marker]
+        truncated = len(part_numbers) > max_parts
+        part_numbers = part_numbers[:max_parts]
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<ListPartsResult>',
+                 '<Bucket>{0}</Bucket><Key>{1}</Key><UploadId>{2}</UploadId><PartNumberMarker>{3}</PartNumberMarker>'
+                 '<NextPartNumberMarker>{4}</NextPartNumberMarker><MaxParts>{5}</MaxParts>'
+                 '<IsTruncated>{6}</IsTruncated>'.format(bucket.name, escape(key), upload.upload_id, marker,
+                                                         part_numbers[-1] if part_numbers else marker, max_parts,
+                                                         'true' if truncated else 'false')]
+        for part_number in part_numbers:
+            _, size, etag, _, _, last_modified = upload.parts[part_number]
+            parts.append('<Part><PartNumber>{0}</PartNumber><LastModified>{1}</LastModified><ETag>"{2}"</ETag>'
+                         '<Size>{3}</Size></Part>'.format(part_number, _iso8601(last_modified), etag, size))
+        parts.append('</ListPartsResult>')
+        return _xml_response(parts)
+
+    # tagging
+
+    async def _put_object_tagging(self, request, bucket, key):
+        obj = self._get(bucket, key)
+        root = await self._read_xml(request)
+        obj.tags = collections.OrderedDict((node.findtext('Key', ''), node.findtext('Value', ''))
+                                           for node in root.findall('TagSet/Tag'))
+        return web.Response()
+
+    async def _get_object_tagging(self, request, bucket, key):
+        obj = self._get(bucket, key)
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<Tagging><TagSet>']
+        for tag_key, tag_value in obj.tags.items():
+            parts.append('<Tag><Key>{0}</Key><Value>{1}</Value></Tag>'.format(escape(tag_key), escape(tag_value)))
+        parts.append('</TagSet></Tagging>')
+        return _xml_response(parts)
+
+    async def _delete_object_tagging(self, request, bucket, key):
+        self._get(bucket, key).tags = collections.OrderedDict()
+        return web.Response(status=204)
+
+    # select
+
+    async def _select_records(self, bucket, key, input_node):
+        obj = self._get(bucket, key)
+        data = await self._storage(self.storage.read, obj.blob)
+        delimiter = _b64_text(input_node, 'RecordDelimiter', b'\n')
+        # the records of the last object selected, which the requests of a parallel select share
+        cached = self._select_cache.get((bucket.name, key))
+        if cached is not None and cached[:3] == [obj, delimiter, self.select_split_size]:
+            return obj, data, delimiter, cached[3], cached[4]
+        records = _split_records(data, delimiter)
+        splits = _split_starts(records, self.select_split_size)
+        self._select_cache = {(bucket.name, key): [obj, delimiter, self.select_split_size, records, splits]}
+        return obj, data, delimiter, records, splits
+
+    async def _create_select_object_meta(self, request, bucket, key):
+        root = await self._read_xml(request)
+        is_json = request.query['x-oss-process'] == 'json/meta'
+        input_node = root.find('InputSerialization/JSON' if is_json else 'InputSerialization/CSV')
+        obj, data, _, records, splits = await self._select_records(bucket, key, input_node)
+
+        payload = struct.pack('>QQIIQ', obj.size, obj.size, 200, len(splits), len(records))
+        if is_json:
+            frame = _select_frame(select_response.JSON_META_END_FRAME_TYPE, payload)
+        else:
+            field_delimiter = _b64_text(input_node, 'FieldDelimiter', b',')
+            columns = data[records[0][0]:records[0][1]].count(field_delimiter) + 1 if records else 0
+            frame = _select_frame(select_response.META_END_FRAME_TYPE, payload + struct.pack('>I', columns))
+        return web.Response(body=frame, headers=self._object_headers(obj))
+
+    async def _select_object(self, request, bucket, key):
+        root = await self._read_xml(request)
+        is_json = request.query['x-oss-process'] == 'json/select'
+        input_node = root.find('InputSerialization/JSON' if is_json else 'InputSerialization/CSV')
+        output_node = root.find('OutputSerialization/JSON' if is_json else 'OutputSerialization/CSV')
+        expression = base64.b64decode(root.findtext('Expression', '')).decode('utf-8')
+        match = _SELECT_EXPRESSION.match(expression)
+        if match is None:
+            raise _OssError(501, 'NotImplemented', 'The fake OSS server only supports the expressions '
+                                                   '"select * from ossobject" and "select count(*) from ossobject".')
+
+        obj, data, delimiter, records, splits = await self._select_records(bucket, key, input_node)
+        first, last = 0, len(records)
+        select_range = input_node.findtext('Range') if input_node is not None else None
+        if select_range:
+            kind, _, bounds = select_range.partition('=')
+            start, _, end = bounds.partition('-')
+            first, last = int(start or 0), int(end) + 1 if end else None
+            if kind == 'split-range':
+                splits = splits + [len(records)]
+                first, last = splits[min(first, len(splits) - 1)], splits[min(last or len(splits), len(splits) - 1)]
+        selected = records[first:last]
+
+        header = None
+        if not is_json and (input_node.findtext('FileHeaderInfo') or '').lower() in ('use', 'ignore') and records:
+            header = records[0]
+            if first == 0:
+                selected = selected[1:]
+
+        out_delimiter = _b64_text(output_node, 'RecordDelimiter', b'\n')
+        if match.group(1) != '*':
+            output = [('{{"_1":{0}}}' if is_json else '{0}').format(len(selected)).encode('utf-8'), b'']
+        elif selected and out_delimiter == delimiter:
+            # the records are consecutive in the object
+            output = [data[selected[0][0]:selected[-1][1]], b'']
+        else:
+            output = [data[start:stop] for start, stop in selected] + [b''] if selected else []
+        if header is not None and match.group(1) == '*' and \
+                root.findtext('OutputSerialization/OutputHeader', '').lower() == 'true':
+            output.insert(0, data[header[0]:header[1]])
+        content = out_delimiter.join(output)
+        scanned = selected[-1][1] if selected else 0
+
+        headers = self._object_headers(obj)
+        for name in ('x-oss-hash-crc64ecma', 'Content-MD5', 'Accept-Ranges'):
+            headers.pop(name, None)
+        if root.findtext('OutputSerialization/OutputRawData', '').lower() == 'true':
+            headers['x-oss-select-output-raw'] = 'true'
+            body = content
+        else:
+            frames = [_select_frame(select_response.DATA_FRAME_TYPE,
+                                    struct.pack('>Q', scanned) + content[offset:offset + _SELECT_FRAME_SIZE])
+                      for offset in range(0, len(content), _SELECT_FRAME_SIZE)]
+            frames.append(_select_frame(select_response.END_FRAME_TYPE, struct.pack('>QQI', scanned, scanned, 206)))
+            body = b''.join(frames)
+        return web.Response(status=206, body=body, headers=headers)
+
+
+# parameters of GetObject overriding headers of the response
+_RESPONSE_OVERRIDES = (
+    ('response-content-type', 'Content-Type'),
+    ('response-content-language', 'Content-Language'),
+    ('response-expires', 'Expires'),
+    ('response-cache-control', 'Cache-Control'),
+    ('response-content-disposition', 'Content-Disposition'),
+    ('response-content-encoding', 'Content-Encoding'),
+)
+
+_LIST_BUCKETS_PARAMS = frozenset(['prefix', 'marker', 'max-keys'])
+
+_LIST_OBJECTS_PARAMS = frozenset(['prefix', 'delimiter', 'marker', 'max-keys', 'encoding-type'])
+
+_GET_OBJECT_PARAMS = frozenset(name for name, _ in _RESPONSE_OVERRIDES) | {'versionId', 'x-oss-process'}
+
+# query parameters of the presigned URLs, of signature version 1 then 4
+_QUERY_AUTH_PARAMS = frozenset(['OSSAccessKeyId', 'Expires', 'Signature', 'security-token',
+                                'x-oss-signature', 'x-oss-signature-version', 'x-oss-credential', 'x-oss-date',
+                                'x-oss-expires', 'x-oss-additional-headers', 'x-oss-security-token'])
+
+_SELECT_PROCESSES = {
+    'csv/select': 'select_object',
+    'json/select': 'select_object',
+    'csv/meta': 'create_select_object_meta',
+    'json/meta': 'create_select_object_meta',
+}
+
+_SELECT_EXPRESSION = re.compile(r'^\s*select\s+(\*|count\(\s*\*\s*\))\s+from\s+ossobject(\s+\w+)?\s*;?\s*$',
+                                re.IGNORECASE)
+
+# max size of the data of the frames of a select response
+_SELECT_FRAME_SIZE = 64 * 1024
+
+# size of the splits of the objects, cut at the end of a record
+_SELECT_SPLIT_SIZE = 1024 * 1024
+
+
+def _b64_text(node, tag, default):
+    text = node.findtext(tag) if node is not None else None
+    return base64.b64decode(text) if text else default
+
+
+def _split_records(data, delimiter):
+    # (start, stop) of each record of `data`, without its delimiter
+    records = []
+    start = 0
+    while start < len(data):
+        stop = data.find(delimiter, start)
+        if stop < 0:
+            stop = len(data)
+        records.append((start, stop))
+        start = stop + len(delimiter)
+    return records
+
+
+def _split_starts(records, split_size):
+    # index of the first record of each split
+    starts = []
+    for i, (start, _) in enumerate(records):
+        if not starts or start - records[starts[-1]][0] >= split_size:
+            starts.append(i)
+    return starts
+
+
+def _select_frame(frame_type, payload):
+    return struct.pack('>III', frame_type | 0x01000000, len(payload), 0) + payload + \
+        struct.pack('>I', zlib.crc32(payload))
+
+
+def _get_encoder(query):
+    if query.get('encoding-type') == 'url':
+        return lambda value: quote(value, safe='')
+    return escape
+
+
+def _xml_response(parts, headers=None):
+    return web.Response(body=''.join(parts).encode('utf-8'), content_type='application/xml', headers=headers)
+
+
+class _HeadResponse(web.Response):
+    # a HEAD response announcing the Content-Length of the object, which aiohttp would otherwise replace by 0
+    def __init__(self, headers):
+        length = headers.pop('Content-Length')
+        super(_HeadResponse, self).__init__(headers=headers)
+        self._length = length
+
+    async def _prepare_headers(self):
+        await super(_HeadResponse, self)._prepare_headers()
+        self._headers['Content-Length'] = self._length
+
+
+async def _send_throttled(request, response, rate):
+    # send the body of `response`, e.g. a listing, at `rate` bytes per second
+    body = response.body
+    stream = web.StreamResponse(status=response.status, headers=response.headers)
+    stream.content_length = len(body)
+    await stream.prepare(request)
+
+    throttle = _Throttle(rate)
+    try:
+        for offset in range(0, len(body), _THROTTLED_CHUNK_SIZE):
+            chunk = body[offset:offset + _THROTTLED_CHUNK_SIZE]
+            await throttle.consume(len(chunk))
+            await stream.write(chunk)
+        await stream.write_eof()
+    except ConnectionResetError:
+        # the client closed the connection before the end of the body
+        pass
+    return stream
+
+
+class _BodyResponse(object):
+    """Body of an object, streamed from the storage of the server in chunks, at the bandwidth of the server."""
+
+    def __init__(self, status, headers, obj, start, stop):
+        self.status = status
+        self.headers = headers
+        self.obj = obj
+        self.start = start
+        self.stop = stop
+
+    async def send(self, request, server):
+        response = web.StreamResponse(status=self.status, headers=self.headers)
+        response.content_length = self.stop - self.start
+        await response.prepare(request)
+
+        throttle = _Throttle(server.bandwidth) if server.bandwidth is not None else None
+        if throttle is not None:
+            chunk_size = _THROTTLED_CHUNK_SIZE
+        elif server.storage.blocking:
+            chunk_size = _CHUNK_SIZE
+        else:
+            chunk_size = self.stop - self.start
+        offset = self.start
+        try:
+            while offset < self.stop:
+                end = min(offset + max(chunk_size, 1), self.stop)
+                chunk = await server._storage(server.storage.read, self.obj.blob, offset, end)
+                if throttle is not None:
+                    await throttle.consume(len(chunk))
+                await response.write(chunk)
+                offset = end
+            await response.write_eof()
+        except ConnectionResetError:
+            # the client closed the connection before the end of the body
+            pass
+        return response
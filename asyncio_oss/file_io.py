@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.file_io
+~~~~~~~~~~~~~~~~~~~
+
+Disk I/O of the SDK. Blocking file operations are run in a bounded thread pool, so that a slow volume (NFS, overlay
+filesystems...) never stalls the other requests of the event loop.
+
+Usage ::
+
+    >>> async with file_io.open('local_file.txt', 'wb') as f:
+    >>>     await f.write(b'content')
+"""
+import asyncio
+import builtins
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from oss2.compat import to_unicode
+
+#: max number of threads doing disk I/O, it is read when the pool is created
+max_workers = 8
+
+#: size of the buffers written to disk. It is a multiple of the page size, so that full buffers written one after
+#: another stay aligned.
+buffer_size = 1024 * 1024
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the thread pool doing disk I/O, it is created on first use with `max_workers` threads."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asyncio-oss-file-io')
+    return _executor
+
+
+def set_executor(executor):
+    """Replace the thread pool doing disk I/O, e.g. by one shared with the application.
+
+    :param executor: :class:`concurrent.futures.Executor` object, None to go back to the default pool
+    """
+    global _executor
+    with _executor_lock:
+        _executor = executor
+
+
+async def run(func, *args, **kwargs):
+    """Run the blocking `func(*args, **kwargs)` in the disk I/O thread pool and return its result."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def open(filename, mode='rb'):
+    """Open a local file in the disk I/O thread pool. It is used as an asynchronous context manager which yields an
+    :class:`AsyncFile` and closes it in the pool too.
+
+    :param str filename: local file name
+    :param str mode: mode of the builtin `open`, only binary modes make sense here
+    """
+    return _AsyncFileContext(filename, mode)
+
+
+class AsyncFile(object):
+    """Asynchronous wrapper of a file object, each operation is run in the disk I/O thread pool.
+
+    :param fileobj: file object opened by the builtin `open`, available as `raw` for the code that needs a
+        synchronous file object
+    """
+
+    def __init__(self, fileobj):
+        self.raw = fileobj
+
+    @property
+    def name(self):
+        return self.raw.name
+
+    async def read(self, amt=-1):
+        return await run(self.raw.read, amt)
+
+    async def write(self, data):
+        return await run(self.raw.write, data)
+
+    async def seek(self, offset, whence=0):
+        return await run(self.raw.seek, offset, whence)
+
+    async def tell(self):
+        return self.raw.tell()
+
+    async def truncate(self, size=None):
+        return await run(self.raw.truncate, size)
+
+    async def flush(self):
+        return await run(self.raw.flush)
+
+    async def close(self):
+        await run(self.raw.close)
+
+
+class _AsyncFileContext(object):
+    def __init__(self, filename, mode):
+        self.filename = filename
+        self.mode = mode
+        self.file = None
+
+    async def __aenter__(self):
+        self.file = AsyncFile(await run(builtins.open, to_unicode(self.filename), self.mode))
+        return self.file
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.file.close()
@@ -7,10 +7,18 @@ oss2.http
 这个模块包含了HTTP Adapters。尽管OSS Python SDK内部使用requests库进行HTTP通信，但是对使用者是透明的。
 该模块中的 `Session` 、 `Request` 、`Response` 对requests的对应的类做了简单的封装。
 """
+import asyncio
+import copy
+import functools
+import inspect
+import io
 import logging
+import os
 import platform
+import socket
 
-from .exceptions import RequestError
+from . import file_io
+from .exceptions import RequestError, ClientError
 
 import aiohttp
 from requests.structures import CaseInsensitiveDict
@@ -25,49 +33,166 @@ USER_AGENT = 'aliyun-sdk-python/{0}({1}/{2}/{3};{4})'.format(
 logger = logging.getLogger(__name__)
 
 
+class SessionConfig(object):
+    """Settings of the connection pool of a :class:`Session`, i.e. of its `aiohttp.TCPConnector`. Unlike patching
+    `oss2.defaults`, they only apply to the sessions created with this config.
+
+    Parameters left to None keep the default of aiohttp.
+
+    :param int pool_size: max number of connections of the pool, defaults to `oss2.defaults.connection_pool_size`
+    :param int pool_size_per_host: max number of connections to one host, 0 means no per host limit
+    :param bool use_dns_cache: cache the DNS resolutions
+    :param int dns_cache_ttl: seconds a DNS resolution is cached
+    :param float keepalive_timeout: seconds an idle connection is kept in the pool
+    :param bool force_close: close each connection after its request instead of reusing it, `keepalive_timeout` must
+        then be None
+    :param bool enable_cleanup_closed: abort SSL transports left open by servers which don't close them properly
+    :param tuple local_addr: local (host, port) the connections are bound to
+    :param resolver: `aiohttp.abc.AbstractResolver` object, e.g. `aiohttp.AsyncResolver()`
+    :param int family: address family of the connections, e.g. `socket.AF_INET` to skip IPv6
+    :param int recv_buffer_size: SO_RCVBUF of the sockets, in bytes
+    :param int send_buffer_size: SO_SNDBUF of the sockets, in bytes
+    :param socket_options: list of (level, option, value) set on each socket before it connects, e.g.
+        `[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]`. Note that aiohttp already enables TCP_NODELAY on every
+        connection.
+
+    Socket options need an aiohttp version supporting `socket_factory` (3.12 or later).
+
+    :param tracer: :class:`RequestTracer <asyncio_oss.tracing.RequestTracer>` timing the requests of the session, None
+        to install no trace hook
+    """
+
+    def __init__(self, pool_size=None, pool_size_per_host=0, use_dns_cache=None, dns_cache_ttl=None,
+                 keepalive_timeout=None, force_close=False, enable_cleanup_closed=False, local_addr=None,
+                 resolver=None, family=None, recv_buffer_size=None, send_buffer_size=None, socket_options=None,
+                 tracer=None):
+        if force_close and keepalive_timeout is not None:
+            raise ClientError('keepalive_timeout cannot be set when force_close is True')
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.use_dns_cache = use_dns_cache
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.force_close = force_close
+        self.enable_cleanup_closed = enable_cleanup_closed
+        self.local_addr = local_addr
+        self.resolver = resolver
+        self.family = family
+        self.recv_buffer_size = recv_buffer_size
+        self.send_buffer_size = send_buffer_size
+        self.socket_options = list(socket_options or [])
+        self.tracer = tracer
+
+    def make_connector(self):
+        """Create the `aiohttp.TCPConnector` described by this config, it must be called within the event loop."""
+        kwargs = {
+            'limit': defaults.get(self.pool_size, defaults.connection_pool_size),
+            'limit_per_host': self.pool_size_per_host,
+            'force_close': self.force_close,
+            'enable_cleanup_closed': self.enable_cleanup_closed,
+        }
+        optional = {
+            'use_dns_cache': self.use_dns_cache,
+            'ttl_dns_cache': self.dns_cache_ttl,
+            'keepalive_timeout': self.keepalive_timeout,
+            'local_addr': self.local_addr,
+            'resolver': self.resolver,
+            'family': self.family,
+        }
+        kwargs.update((k, v) for k, v in optional.items() if v is not None)
+
+        socket_options = self._get_socket_options()
+        if socket_options:
+            if 'socket_factory' not in inspect.signature(aiohttp.TCPConnector.__init__).parameters:
+                raise ClientError('Socket options need aiohttp 3.12 or later, the installed version is {0}'.format(
+                    aiohttp.__version__))
+            kwargs['socket_factory'] = functools.partial(_make_socket, socket_options)
+
+        return aiohttp.TCPConnector(**kwargs)
+
+    def _get_socket_options(self):
+        options = []
+        if self.recv_buffer_size is not None:
+            options.append((socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size))
+        if self.send_buffer_size is not None:
+            options.append((socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size))
+        options.extend(self.socket_options)
+        return options
+
+
+def _make_socket(socket_options, addr_info):
+    family, type_, proto, _, _ = addr_info
+    sock = socket.socket(family=family, type=type_, proto=proto)
+    try:
+        for level, option, value in socket_options:
+            sock.setsockopt(level, option, value)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
 class Session(object):
-    """属于同一个Session的请求共享一组连接池，如有可能也会重用HTTP连接。"""
+    """属于同一个Session的请求共享一组连接池，如有可能也会重用HTTP连接。
+
+    A session keeps no per request state, so it can be shared by any number of `Bucket` and `Service` objects sending
+    requests concurrently. Each of them holds a reference on the session with :func:`acquire` and gives it back
+    with :func:`release` when it is closed; the pool is closed when the last reference is released.
 
-    def __init__(self):
-        self.resp = None
+    :param config: 连接池的配置，None表示使用默认配置
+    :type config: asyncio_oss.SessionConfig
+    """
+
+    def __init__(self, config=None):
+        self.config = config or SessionConfig()
         self._aio_session = None
+        self._refs = 0
 
     async def _create_session(self):
         if self._aio_session is None:
-            pool_size = defaults.connection_pool_size
-            connector = aiohttp.TCPConnector(limit=pool_size)
-            self._aio_session = aiohttp.ClientSession(connector=connector)
+            connector = self.config.make_connector()
+            trace_configs = [self.config.tracer.trace_config] if self.config.tracer is not None else None
+            self._aio_session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
 
     async def do_request(self, req, timeout):
         try:
-            logger.debug(
-                "Send request, method: {0}, url: {1}, params: {2}, headers: {3}, timeout: {4}, proxies: {5}".format(
-                    req.method, req.url, req.params, req.headers, timeout, req.proxies))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Send request, method: {0}, url: {1}, params: {2}, headers: {3}, timeout: {4}, proxies: {5}".format(
+                        req.method, req.url, req.params, req.headers, timeout, req.proxies))
 
             await self._create_session()
             # 1. When setting progress_callback or enabling crc verification, the data type will be converted to the
             # corresponding adapter object by oss make_progress_adapter / make_crc_adapter, and the process_callback
             # and crc verification calculation will be performed when read
-            # 2. requests supports the reading of file-like-objects, while aiohttp does not, so you need to read the
-            # data in advance
-            req_data = req.data.read() if hasattr(req.data, 'read') else req.data
+            # 2. requests supports the reading of file-like-objects, while aiohttp does not, so file-like bodies are
+            # wrapped into an async generator and streamed out in bounded chunks instead of being read in advance
+            req_data = req.data
+            headers = req.headers
+            if hasattr(req_data, 'read'):
+                size = _get_body_size(req_data)
+                if size is not None and 'Content-Length' not in headers:
+                    # without Content-Length aiohttp would fall back to chunked transfer encoding
+                    headers = CaseInsensitiveDict(headers)
+                    headers['Content-Length'] = str(size)
+                req_data = _stream_request_body(req_data)
             resp = await self._aio_session.request(
                 req.method,
                 req.url,
                 data=req_data,
                 params=req.params,
-                headers=req.headers,
+                headers=headers,
                 timeout=timeout,
-                proxy=req.proxies
+                proxy=req.proxies,
+                trace_request_ctx=req.trace
             )
-            self.resp = resp
-            return Response(resp)
-        except IOError as e:
-            # catch read IO error
+            return Response(resp, req.trace)
+        except (IOError, asyncio.TimeoutError) as e:
+            # catch read IO error and timeouts
             raise RequestError(e)
         except aiohttp.ClientError as e:
-            # catch all aiohttp client errors
-            await self._aio_session.close()
+            # catch all aiohttp client errors. The session is kept open: aiohttp already drops the broken connection,
+            # and closing the session would fail the other requests in flight as well as any retry of this one.
             raise RequestError(e)
 
     async def __aenter__(self):
@@ -78,8 +203,26 @@ class Session(object):
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self._aio_session.__aexit__(exc_type, exc_val, exc_tb)
 
+    def acquire(self):
+        """Take a reference on the session, to be given back with :func:`release`."""
+        self._refs += 1
+
+    async def release(self):
+        """Give back a reference taken by :func:`acquire`, the session is closed with the last one."""
+        if self._refs <= 0:
+            raise ClientError('Session released more times than acquired')
+        self._refs -= 1
+        if self._refs == 0:
+            await self.close()
+
+    @property
+    def closed(self):
+        return self._aio_session is not None and self._aio_session.closed
+
     async def close(self):
-        await self._aio_session.close()
+        """Close the pool whatever the references left, closing an already closed session does nothing."""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
 
 
 class Request(object):
@@ -101,6 +244,9 @@ class Request(object):
         self.product = product
         self.cloudbox_id = cloudbox_id
 
+        # `asyncio_oss.tracing.RequestEvent` of the attempt being sent, if the session has a tracer
+        self.trace = None
+
         if not isinstance(headers, CaseInsensitiveDict):
             self.headers = CaseInsensitiveDict(headers)
         else:
@@ -116,19 +262,26 @@ class Request(object):
             else:
                 self.headers['User-Agent'] = USER_AGENT
 
-        logger.debug("Init request, method: {0}, url: {1}, params: {2}, headers: {3}".format(method, url, params,
-                                                                                             headers))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Init request, method: {0}, url: {1}, params: {2}, headers: {3}".format(method, url, params,
+                                                                                                 headers))
 
 
 _CHUNK_SIZE = 8 * 1024
 
+# chunk size of streaming request bodies, it bounds the memory used by an upload no matter how large the object is
+_STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class Response(object):
-    def __init__(self, response):
+    def __init__(self, response, trace=None):
         self.response = response
         self.status = response.status
         self.headers = response.headers
         self.request_id = response.headers.get('x-oss-request-id', '')
+        self.trace = trace
+        if trace is not None:
+            trace.set_response(self.status, self.request_id)
 
         # When a response contains no body, iter_content() cannot
         # be run twice (requests.exceptions.StreamConsumedError will be raised).
@@ -141,8 +294,9 @@ class Response(object):
         # we try to avoid depends on details of self.response.raw.
         self.__all_read = False
 
-        logger.debug("Get response headers, req-id:{0}, status: {1}, headers: {2}".format(self.request_id, self.status,
-                                                                                          self.headers))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Get response headers, req-id:{0}, status: {1}, headers: {2}".format(
+                self.request_id, self.status, self.headers))
 
     async def read(self, amt=None):
         if self.__all_read:
@@ -155,17 +309,30 @@ class Response(object):
             content = b''.join(content_list)
 
             self.__all_read = True
+            if self.trace is not None:
+                self.trace.body_read(len(content), True)
             return content
         else:
             try:
-                return await self.response.content.read(amt)
+                content = await self.response.content.read(amt)
             except StopAsyncIteration:
+                content = b''
                 self.__all_read = True
-                return b''
+            if self.trace is not None:
+                self.trace.body_read(len(content), not content and amt != 0)
+            return content
 
     def __aiter__(self):
+        if self.trace is not None:
+            return self.__iter_traced()
         return self.response.content
 
+    async def __iter_traced(self):
+        async for chunk in self.response.content:
+            self.trace.body_read(len(chunk), False)
+            yield chunk
+        self.trace.body_read(0, True)
+
 
 # requests 对于具有 fileno() 方法的 file object，会用 fileno() 的返回值作为 Content-Length。
 # 这对于已经读取了部分内容，或执行了seek() 的 file object是不正确的。
@@ -182,3 +349,101 @@ def _convert_request_body(data):
         return SizedFileAdapter(data, file_object_remaining_bytes(data))
 
     return data
+
+
+def _get_body_size(data):
+    if hasattr(data, '__len__'):
+        return len(data)
+    return getattr(data, 'len', None)
+
+
+def _is_in_memory_body(data):
+    # walk down the adapter chain (oss2 / asyncio_oss adapters and SizedFileAdapter) to the innermost object
+    for _ in range(8):
+        if isinstance(data, (bytes, bytearray, memoryview, io.BytesIO)):
+            return True
+        inner = None
+        for attr in ('data', 'fileobj', 'file_object'):
+            inner = getattr(data, attr, None)
+            if inner is not None:
+                break
+        if inner is None:
+            return False
+        data = inner
+    return False
+
+
+def _make_body_rewinder(data):
+    """Capture the current state of a request body, so that it can be sent again from the same point.
+
+    Return a function restoring that state, or None when the body can't be replayed: iterables, non seekable streams
+    and encrypting adapters are consumed once and for all.
+    """
+    states = []
+    for _ in range(8):
+        if data is None or isinstance(data, (bytes, bytearray, memoryview)):
+            break
+
+        inner = None
+        for attr in ('data', 'fileobj', 'file_object'):
+            inner = getattr(data, attr, None)
+            if inner is not None:
+                break
+
+        if inner is not None and hasattr(data, 'offset'):
+            # oss2 adapters: position, crc and read state are restored, progress is reported again from there
+            if getattr(data, 'cipher_callback', None) is not None:
+                return None
+            state = {k: getattr(data, k) for k in ('offset', 'read_all', 'discard') if hasattr(data, k)}
+            if getattr(data, 'crc_callback', None) is not None:
+                state['crc_callback'] = copy.deepcopy(data.crc_callback)
+            states.append((data, state))
+            data = inner
+            continue
+
+        if hasattr(data, 'seek') and hasattr(data, 'tell') and not asyncio.iscoroutinefunction(data.tell):
+            try:
+                if hasattr(data, 'seekable') and not data.seekable():
+                    return None
+                states.append((data, data.tell()))
+            except (IOError, ValueError):
+                return None
+            break
+
+        return None
+    else:
+        return None
+
+    def rewind():
+        for obj, state in states:
+            if isinstance(state, dict):
+                for k, v in state.items():
+                    setattr(obj, k, copy.deepcopy(v) if k == 'crc_callback' else v)
+            else:
+                obj.seek(state, os.SEEK_SET)
+
+    return rewind
+
+
+async def _stream_request_body(data, chunk_size=_STREAM_CHUNK_SIZE):
+    """Yield the body of a file-like request in chunks of at most `chunk_size` bytes.
+
+    The adapters compute crc and invoke progress callbacks inside `read`, so both are still done as data goes out.
+    Reads of disk backed bodies are done in the disk I/O thread pool, so that they never block the event loop; note
+    that the progress callback of such bodies is invoked from that pool.
+    """
+    read = data.read
+    if asyncio.iscoroutinefunction(read):
+        read_chunk = read
+    elif _is_in_memory_body(data):
+        async def read_chunk(amt):
+            return read(amt)
+    else:
+        async def read_chunk(amt):
+            return await file_io.run(read, amt)
+
+    while True:
+        chunk = await read_chunk(chunk_size)
+        if not chunk:
+            break
+        yield to_bytes(chunk)
@@ -6,6 +6,8 @@ oss2.iterators
 
 该模块包含了一些易于使用的迭代器，可以用来遍历Bucket、文件、分片上传等。
 """
+import asyncio
+import collections
 
 from .exceptions import ServerError
 from . import http
@@ -14,39 +16,95 @@ from oss2 import defaults
 from oss2.models import MultipartUploadInfo, SimplifiedObjectInfo
 
 
+#: default number of pages an iterator fetches ahead of the one being consumed
+default_prefetch = 1
+
+
 class _BaseIterator(object):
-    def __init__(self, marker, max_retries):
+    """Base of the paginated iterators.
+
+    While a page is consumed, up to `prefetch` following pages are fetched in the background, one request at a
+    time since each one needs the marker returned by the previous one. So the round trip of a page is hidden behind
+    the processing of the previous one, instead of stalling the iteration at each page boundary. With a prefetch of
+    0, a page is only fetched once the previous one is drained.
+
+    A page failing on a 5xx error is fetched again up to `max_retries` times, each fetch being itself retried by the
+    `retry_policy` of the bucket or service, so a page may be requested up to `max_retries` times its `max_attempts`.
+
+    Note that when prefetching, `next_marker` and `is_truncated` are those of the last page fetched, which may not be
+    consumed yet. Iterators left before the end should be closed with :func:`close` to cancel the pending fetch, or
+    used as asynchronous context managers, which close them on exit ::
+
+        >>> async with asyncio_oss.ObjectIterator(bucket, prefix='logs/') as it:
+        >>>     async for obj in it:
+        >>>         if obj.key > 'logs/2024':
+        >>>             break
+    """
+
+    def __init__(self, marker, max_retries, prefetch=None):
         self.is_truncated = True
         self.next_marker = marker
 
         max_retries = defaults.get(max_retries, defaults.request_retries)
         self.max_retries = max_retries if max_retries > 0 else 1
 
-        self.entries = []
+        prefetch = defaults.get(prefetch, default_prefetch)
+        self.prefetch = prefetch if prefetch > 0 else 0
+
+        self.entries = collections.deque()
+        self.__pages = collections.deque()
+        self.__task = None
+        self.__error = None
 
-    def _fetch(self):
+    async def _fetch(self):
+        """Fetch the page at `self.next_marker`, return (is_truncated, next_marker, entries)."""
         raise NotImplemented  # pragma: no cover
 
     def __aiter__(self):
         return self
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
     async def __anext__(self):
         while True:
             if self.entries:
-                return self.entries.pop(0)
+                return self.entries.popleft()
+
+            if self.__pages:
+                self.entries.extend(self.__pages.popleft())
+                self.__fetch_ahead()
+                continue
 
-            if not self.is_truncated:
-                raise StopAsyncIteration
+            if self.__error is not None:
+                e, self.__error = self.__error, None
+                raise e
 
-            await self.fetch_with_retry()
+            if self.__task is None:
+                if not self.is_truncated:
+                    raise StopAsyncIteration
+                self.__start_fetch()
+
+            await asyncio.shield(self.__task)
 
     async def next(self):
         return await self.__anext__()
 
+    async def close(self):
+        """Cancel the page being fetched in the background, if any."""
+        task, self.__task = self.__task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.__pages.clear()
+
     async def fetch_with_retry(self):
         for i in range(self.max_retries):
             try:
-                self.is_truncated, self.next_marker = await self._fetch()
+                self.is_truncated, self.next_marker, entries = await self._fetch()
             except ServerError as e:
                 if e.status // 100 != 5:
                     raise
@@ -54,7 +112,28 @@ class _BaseIterator(object):
                 if i == self.max_retries - 1:
                     raise
             else:
-                return
+                return entries
+
+    def __start_fetch(self):
+        self.__task = asyncio.ensure_future(self.__fetch_page())
+
+    def __fetch_ahead(self):
+        if self.__task is None and self.__error is None and self.is_truncated and len(self.__pages) < self.prefetch:
+            self.__start_fetch()
+
+    async def __fetch_page(self):
+        try:
+            entries = await self.fetch_with_retry()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # kept until the consumer reaches this page, so that a failure in the background is not lost
+            self.__error = e
+        else:
+            self.__pages.append(entries)
+        finally:
+            self.__task = None
+        self.__fetch_ahead()
 
 
 class BucketIterator(_BaseIterator):
@@ -66,9 +145,10 @@ class BucketIterator(_BaseIterator):
     :param prefix: 只列举匹配该前缀的Bucket
     :param marker: 分页符。只列举Bucket名字典序在此之后的Bucket
     :param max_keys: 每次调用 `list_buckets` 时的max_keys参数。注意迭代器返回的数目可能会大于该值。
+    :param int prefetch: 在消费当前页时后台预取的页数，0表示不预取。默认为 `default_prefetch`
     """
-    def __init__(self, service, prefix='', marker='', max_keys=100, max_retries=None):
-        super(BucketIterator, self).__init__(marker, max_retries)
+    def __init__(self, service, prefix='', marker='', max_keys=100, max_retries=None, prefetch=None):
+        super(BucketIterator, self).__init__(marker, max_retries, prefetch)
         self.service = service
         self.prefix = prefix
         self.max_keys = max_keys
@@ -77,9 +157,7 @@ class BucketIterator(_BaseIterator):
         result = await self.service.list_buckets(prefix=self.prefix,
                                                  marker=self.next_marker,
                                                  max_keys=self.max_keys)
-        self.entries = result.buckets
-
-        return result.is_truncated, result.next_marker
+        return result.is_truncated, result.next_marker, result.buckets
 
 
 class ObjectIterator(_BaseIterator):
@@ -96,9 +174,12 @@ class ObjectIterator(_BaseIterator):
 
     :param headers: HTTP头部
     :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+
+    :param int prefetch: 在消费当前页时后台预取的页数，0表示不预取。默认为 `default_prefetch`
     """
-    def __init__(self, bucket, prefix='', delimiter='', marker='', max_keys=100, max_retries=None, headers=None):
-        super(ObjectIterator, self).__init__(marker, max_retries)
+    def __init__(self, bucket, prefix='', delimiter='', marker='', max_keys=100, max_retries=None, headers=None,
+                 prefetch=None):
+        super(ObjectIterator, self).__init__(marker, max_retries, prefetch)
 
         self.bucket = bucket
         self.prefix = prefix
@@ -112,11 +193,11 @@ class ObjectIterator(_BaseIterator):
                                                 marker=self.next_marker,
                                                 max_keys=self.max_keys,
                                                 headers=self.headers)
-        self.entries = result.object_list + [SimplifiedObjectInfo(prefix, None, None, None, None, None)
-                                             for prefix in result.prefix_list]
-        self.entries.sort(key=lambda obj: obj.key)
+        entries = result.object_list + [SimplifiedObjectInfo(prefix, None, None, None, None, None)
+                                        for prefix in result.prefix_list]
+        entries.sort(key=lambda obj: obj.key)
 
-        return result.is_truncated, result.next_marker
+        return result.is_truncated, result.next_marker, entries
 
 
 class ObjectIteratorV2(_BaseIterator):
@@ -134,11 +215,13 @@ class ObjectIteratorV2(_BaseIterator):
 
     :param headers: HTTP头部
     :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+
+    :param int prefetch: 在消费当前页时后台预取的页数，0表示不预取。默认为 `default_prefetch`
     """
 
     def __init__(self, bucket, prefix='', delimiter='', continuation_token='', start_after='', fetch_owner=False,
-                 encoding_type='url', max_keys=100, max_retries=None, headers=None):
-        super(ObjectIteratorV2, self).__init__(continuation_token, max_retries)
+                 encoding_type='url', max_keys=100, max_retries=None, headers=None, prefetch=None):
+        super(ObjectIteratorV2, self).__init__(continuation_token, max_retries, prefetch)
 
         self.bucket = bucket
         self.prefix = prefix
@@ -149,20 +232,129 @@ class ObjectIteratorV2(_BaseIterator):
         self.max_keys = max_keys
         self.headers = http.CaseInsensitiveDict(headers)
 
-    def _fetch(self):
-        result = self.bucket.list_objects_v2(prefix=self.prefix,
-                                             delimiter=self.delimiter,
-                                             continuation_token=self.next_marker,
-                                             start_after=self.start_after,
-                                             fetch_owner=self.fetch_owner,
-                                             encoding_type=self.encoding_type,
-                                             max_keys=self.max_keys,
-                                             headers=self.headers)
-        self.entries = result.object_list + [SimplifiedObjectInfo(prefix, None, None, None, None, None)
-                                             for prefix in result.prefix_list]
-        self.entries.sort(key=lambda obj: obj.key)
-
-        return result.is_truncated, result.next_continuation_token
+    async def _fetch(self):
+        result = await self.bucket.list_objects_v2(prefix=self.prefix,
+                                                   delimiter=self.delimiter,
+                                                   continuation_token=self.next_marker,
+                                                   start_after=self.start_after,
+                                                   fetch_owner=self.fetch_owner,
+                                                   encoding_type=self.encoding_type,
+                                                   max_keys=self.max_keys,
+                                                   headers=self.headers)
+        entries = result.object_list + [SimplifiedObjectInfo(prefix, None, None, None, None, None)
+                                        for prefix in result.prefix_list]
+        entries.sort(key=lambda obj: obj.key)
+
+        return result.is_truncated, result.next_continuation_token, entries
+
+
+class StreamingObjectIterator(object):
+    """遍历Bucket里文件的迭代器，每一页用 :func:`list_objects_v2_stream <asyncio_oss.Bucket.list_objects_v2_stream>` 罗列。
+
+    Unlike :class:`ObjectIteratorV2`, which returns the entries of a page once it is fully received, this one returns
+    each entry as soon as its element is parsed, so that the processing of the first keys of a page, e.g. a
+    `head_object` per key, overlaps the transfer of the rest of the page. The pages are requested one after the
+    other, with no prefetch. With a delimiter, the common prefixes of a page are returned after its objects rather
+    than merged with them in the order of the keys.
+
+    每次迭代返回的是 :class:`SimplifiedObjectInfo <oss2.models.SimplifiedObjectInfo>` 对象。
+    当 `SimplifiedObjectInfo.is_prefix()` 返回True时，表明是公共前缀（目录）。
+
+    Iterators left before the end should be closed with :func:`close`, or used as asynchronous context managers, to
+    release the connection of the page being received. An error while receiving a page closes it, and the next
+    iteration resumes after the last entry returned: with the same continuation token if none of the page was
+    returned, otherwise with `start_after` set to the last key returned, so that no entry is returned twice. With a
+    delimiter, the common prefixes of a page come after its objects and can't be resumed from, so the error is raised
+    again by the next iterations once part of the page was returned.
+
+    :param str prefix: 只罗列文件名为该前缀的文件
+    :param str delimiter: 分隔符。可以用来模拟目录
+    :param str continuation_token: 分页标志。首次调用传空串，后续使用返回值的next_continuation_token
+    :param str start_after: 起始文件名称，OSS会按照文件的字典序排列返回start_after之后的文件。
+    :param bool fetch_owner: 是否获取文件的owner信息，默认不返回。
+    :param int max_keys: 最多返回文件的个数，文件和目录的和不能超过该值
+
+    :param headers: HTTP头部
+    :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+    """
+
+    def __init__(self, bucket, prefix='', delimiter='', continuation_token='', start_after='', fetch_owner=False,
+                 encoding_type='url', max_keys=100, headers=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.delimiter = delimiter
+        self.start_after = start_after
+        self.fetch_owner = fetch_owner
+        self.encoding_type = encoding_type
+        self.max_keys = max_keys
+        self.headers = http.CaseInsensitiveDict(headers)
+
+        self.is_truncated = True
+        self.next_marker = continuation_token
+        self.__page = None
+        self.__last_key = None
+        self.__error = None
+
+    def __aiter__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def __anext__(self):
+        if self.__error is not None:
+            raise self.__error
+
+        while True:
+            if self.__page is None:
+                if not self.is_truncated:
+                    raise StopAsyncIteration
+                self.__page = await self.bucket.list_objects_v2_stream(prefix=self.prefix,
+                                                                        delimiter=self.delimiter,
+                                                                        continuation_token=self.next_marker,
+                                                                        start_after=self.start_after,
+                                                                        fetch_owner=self.fetch_owner,
+                                                                        encoding_type=self.encoding_type,
+                                                                        max_keys=self.max_keys,
+                                                                        headers=self.headers)
+
+            try:
+                entry = await self.__page.__anext__()
+            except StopAsyncIteration:
+                self.is_truncated = self.__page.is_truncated
+                self.next_marker = self.__page.next_continuation_token
+                self.__page = None
+                self.__last_key = None
+            except BaseException as e:
+                self.__close_page()
+                if self.__last_key is not None:
+                    if self.delimiter:
+                        self.__error = e
+                    else:
+                        # the page is requested again from the last key returned rather than from its start
+                        self.next_marker = ''
+                        self.start_after = self.__last_key
+                        self.__last_key = None
+                raise
+            else:
+                self.__last_key = entry.key
+                return entry
+
+    async def next(self):
+        return await self.__anext__()
+
+    async def close(self):
+        """Release the connection of the page being received, if any."""
+        self.__close_page()
+
+    def __close_page(self):
+        page, self.__page = self.__page, None
+        if page is not None:
+            page.close()
+
 
 class MultipartUploadIterator(_BaseIterator):
     """遍历Bucket里未完成的分片上传。
@@ -179,11 +371,13 @@ class MultipartUploadIterator(_BaseIterator):
 
     :param headers: HTTP头部
     :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+
+    :param int prefetch: 在消费当前页时后台预取的页数，0表示不预取。默认为 `default_prefetch`
     """
     def __init__(self, bucket,
                  prefix='', delimiter='', key_marker='', upload_id_marker='',
-                 max_uploads=1000, max_retries=None, headers=None):
-        super(MultipartUploadIterator, self).__init__(key_marker, max_retries)
+                 max_uploads=1000, max_retries=None, headers=None, prefetch=None):
+        super(MultipartUploadIterator, self).__init__(key_marker, max_retries, prefetch)
 
         self.bucket = bucket
         self.prefix = prefix
@@ -199,11 +393,11 @@ class MultipartUploadIterator(_BaseIterator):
                                                           upload_id_marker=self.next_upload_id_marker,
                                                           max_uploads=self.max_uploads,
                                                           headers=self.headers)
-        self.entries = result.upload_list + [MultipartUploadInfo(prefix, None, None) for prefix in result.prefix_list]
-        self.entries.sort(key=lambda u: u.key)
+        entries = result.upload_list + [MultipartUploadInfo(prefix, None, None) for prefix in result.prefix_list]
+        entries.sort(key=lambda u: u.key)
 
         self.next_upload_id_marker = result.next_upload_id_marker
-        return result.is_truncated, result.next_key_marker
+        return result.is_truncated, result.next_key_marker, entries
 
 
 class ObjectUploadIterator(_BaseIterator):
@@ -218,9 +412,11 @@ class ObjectUploadIterator(_BaseIterator):
 
     :param headers: HTTP头部
     :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+
+    :param int prefetch: 在消费当前页时后台预取的页数，0表示不预取。默认为 `default_prefetch`
     """
-    def __init__(self, bucket, key, max_uploads=1000, max_retries=None, headers=None):
-        super(ObjectUploadIterator, self).__init__('', max_retries)
+    def __init__(self, bucket, key, max_uploads=1000, max_retries=None, headers=None, prefetch=None):
+        super(ObjectUploadIterator, self).__init__('', max_retries, prefetch)
         self.bucket = bucket
         self.key = key
         self.next_upload_id_marker = ''
@@ -234,16 +430,16 @@ class ObjectUploadIterator(_BaseIterator):
                                                           max_uploads=self.max_uploads,
                                                           headers=self.headers)
 
-        self.entries = [u for u in result.upload_list if u.key == self.key]
+        entries = [u for u in result.upload_list if u.key == self.key]
         self.next_upload_id_marker = result.next_upload_id_marker
 
-        if not result.is_truncated or not self.entries:
-            return False, result.next_key_marker
+        if not result.is_truncated or not entries:
+            return False, result.next_key_marker, entries
 
         if result.next_key_marker > self.key:
-            return False, result.next_key_marker
+            return False, result.next_key_marker, entries
 
-        return result.is_truncated, result.next_key_marker
+        return result.is_truncated, result.next_key_marker, entries
 
 
 class PartIterator(_BaseIterator):
@@ -259,10 +455,12 @@ class PartIterator(_BaseIterator):
 
     :param headers: HTTP头部
     :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+
+    :param int prefetch: 在消费当前页时后台预取的页数，0表示不预取。默认为 `default_prefetch`
     """
     def __init__(self, bucket, key, upload_id,
-                 marker='0', max_parts=1000, max_retries=None, headers=None):
-        super(PartIterator, self).__init__(marker, max_retries)
+                 marker='0', max_parts=1000, max_retries=None, headers=None, prefetch=None):
+        super(PartIterator, self).__init__(marker, max_retries, prefetch)
 
         self.bucket = bucket
         self.key = key
@@ -275,9 +473,7 @@ class PartIterator(_BaseIterator):
                                               marker=self.next_marker,
                                               max_parts=self.max_parts,
                                               headers=self.headers)
-        self.entries = result.parts
-
-        return result.is_truncated, result.next_marker
+        return result.is_truncated, result.next_marker, result.parts
 
 
 class LiveChannelIterator(_BaseIterator):
@@ -289,9 +485,10 @@ class LiveChannelIterator(_BaseIterator):
     :param prefix: 只列举匹配该前缀的文件
     :param marker: 分页符
     :param max_keys: 每次调用 `list_live_channel` 时的max_keys参数。注意迭代器返回的数目可能会大于该值。
+    :param int prefetch: 在消费当前页时后台预取的页数，0表示不预取。默认为 `default_prefetch`
     """
-    def __init__(self, bucket, prefix='', marker='', max_keys=100, max_retries=None):
-        super(LiveChannelIterator, self).__init__(marker, max_retries)
+    def __init__(self, bucket, prefix='', marker='', max_keys=100, max_retries=None, prefetch=None):
+        super(LiveChannelIterator, self).__init__(marker, max_retries, prefetch)
 
         self.bucket = bucket
         self.prefix = prefix
@@ -301,6 +498,4 @@ class LiveChannelIterator(_BaseIterator):
         result = await self.bucket.list_live_channel(prefix=self.prefix,
                                                      marker=self.next_marker,
                                                      max_keys=self.max_keys)
-        self.entries = result.channels
-
-        return result.is_truncated, result.next_marker
+        return result.is_truncated, result.next_marker, result.channels
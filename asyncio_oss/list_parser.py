@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.list_parser
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Parsers of the listing responses (`list_objects`, `list_objects_v2` and `list_object_versions`), replacing the ones of
+`oss2.xml_utils` on the request paths.
+
+The body is fed to the C XML parser chunk by chunk as it is received, instead of once fully read, and each entry is
+built from the children of its element in a single pass, instead of one `find` per field. The entries keep the raw
+text of their fields and only convert it when the field is first read: the url decoding of the keys, the parsing of
+the dates, sizes and ETags, and the owners. A scan which only reads the keys doesn't pay for the other fields.
+
+The entries are subclasses of the `oss2.models` classes the oss2 parsers return, with the same attributes.
+"""
+import calendar
+
+from xml.etree import ElementTree
+
+from oss2.compat import urlunquote
+from oss2.models import SimplifiedObjectInfo, ObjectVersionInfo, DeleteMarkerInfo, Owner
+from oss2.utils import iso8601_to_unixtime
+
+
+def parse_iso8601(time_string):
+    """Return the UNIX time, in seconds, of an ISO8601 time string such as `2012-02-24T06:07:48.000Z`."""
+    try:
+        if time_string[4] == '-' and time_string[10] == 'T' and time_string[-1] == 'Z':
+            return calendar.timegm((int(time_string[0:4]), int(time_string[5:7]), int(time_string[8:10]),
+                                    int(time_string[11:13]), int(time_string[14:16]), int(time_string[17:19])))
+    except (IndexError, ValueError):
+        pass
+    return iso8601_to_unixtime(time_string)
+
+
+class _Page(object):
+    """What the entries of a page share."""
+
+    __slots__ = ('url_encoded', 'entries')
+
+    def __init__(self, url_encoded):
+        self.url_encoded = url_encoded
+        self.entries = []
+
+    def decode(self, value):
+        return urlunquote(value) if self.url_encoded else value
+
+    def decode_keys(self):
+        # the keys of all the entries at once, on the first read of one of them: a single unquote of the joined keys
+        # costs a fraction of one unquote per key
+        entries, self.entries = self.entries, []
+        entries = [entry for entry in entries if 'key' not in entry.__dict__]
+        keys = [_required(entry, 'Key', entry._key) for entry in entries]
+        if self.url_encoded and keys:
+            decoded = urlunquote('\n'.join(keys)).split('\n')
+            # unless a key contains a line feed
+            keys = decoded if len(decoded) == len(keys) else [urlunquote(key) for key in keys]
+        for entry, key in zip(entries, keys):
+            entry.__dict__['key'] = key
+
+
+class _lazy(object):
+    """Attribute computed by `func` on first read, then kept in the `__dict__` of the instance, which takes precedence
+    over this descriptor for the next reads and for the assignments."""
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+def _required(entry, tag, value):
+    if value is None:
+        raise RuntimeError("parse xml: " + tag + " could not be found under " + entry._tag)
+    return value
+
+
+def _parse_bool(tag, text, parent='ListBucketResult'):
+    if text == 'true':
+        return True
+    elif text == 'false':
+        return False
+    raise RuntimeError("parse xml: value of " + tag + " is not a boolean under " + parent)
+
+
+class ObjectInfo(SimplifiedObjectInfo):
+    """:class:`SimplifiedObjectInfo <oss2.models.SimplifiedObjectInfo>` of a `Contents` element, converting its fields
+    on first access."""
+
+    __slots__ = ('_page', '_key', '_last_modified', '_etag', '_size', '_owner', 'type', 'storage_class',
+                 'restore_info')
+
+    _tag = 'Contents'
+
+    def __init__(self, page):
+        self._page = page
+        self._key = self._last_modified = self._etag = self._size = self._owner = None
+        self.type = self.storage_class = self.restore_info = None
+
+    @_lazy
+    def key(self):
+        self._page.decode_keys()
+        return self.__dict__['key']
+
+    @_lazy
+    def last_modified(self):
+        return parse_iso8601(_required(self, 'LastModified', self._last_modified))
+
+    @_lazy
+    def etag(self):
+        return _required(self, 'ETag', self._etag).strip('"')
+
+    @_lazy
+    def size(self):
+        return int(_required(self, 'Size', self._size))
+
+    @_lazy
+    def owner(self):
+        if self._owner is None:
+            return None
+        return Owner(self._owner.findtext('DisplayName', ''), self._owner.findtext('ID', ''))
+
+    def is_prefix(self):
+        return False
+
+
+class VersionInfo(ObjectVersionInfo):
+    """:class:`ObjectVersionInfo <oss2.models.ObjectVersionInfo>` of a `Version` element, converting its fields on
+    first access."""
+
+    __slots__ = ('_page', '_key', '_is_latest', '_last_modified', '_etag', '_size', '_owner', 'versionid', 'type',
+                 'storage_class', 'restore_info')
+
+    _tag = 'Version'
+
+    def __init__(self, page):
+        self._page = page
+        self._key = self._is_latest = self._last_modified = self._etag = self._size = self._owner = None
+        self.versionid = self.type = self.storage_class = self.restore_info = None
+
+    key = ObjectInfo.key
+    last_modified = ObjectInfo.last_modified
+    etag = ObjectInfo.etag
+    size = ObjectInfo.size
+
+    @_lazy
+    def is_latest(self):
+        return _parse_bool('IsLatest', _required(self, 'IsLatest', self._is_latest), self._tag)
+
+    @_lazy
+    def owner(self):
+        owner = _required(self, 'Owner', self._owner)
+        return Owner(owner.findtext('DisplayName', ''), owner.findtext('ID', ''))
+
+
+class DeleteMarker(DeleteMarkerInfo):
+    """:class:`DeleteMarkerInfo <oss2.models.DeleteMarkerInfo>` of a `DeleteMarker` element, converting its fields on
+    first access."""
+
+    __slots__ = ('_page', '_key', '_is_latest', '_last_modified', '_owner', 'versionid')
+
+    _tag = 'DeleteMarker'
+
+    def __init__(self, page):
+        self._page = page
+        self._key = self._is_latest = self._last_modified = self._owner = None
+        self.versionid = None
+
+    key = ObjectInfo.key
+    last_modified = ObjectInfo.last_modified
+    is_latest = VersionInfo.is_latest
+    owner = VersionInfo.owner
+
+
+# slot of each child element of the entries, None for the elements kept as is
+_FIELDS = {
+    'Key': '_key',
+    'LastModified': '_last_modified',
+    'ETag': '_etag',
+    'Size': '_size',
+    'Type': 'type',
+    'StorageClass': 'storage_class',
+    'RestoreInfo': 'restore_info',
+    'VersionId': 'versionid',
+    'IsLatest': '_is_latest',
+    'Owner': None,
+}
+
+
+def _make_entry(klass, node, page):
+    entry = klass(page)
+    page.entries.append(entry)
+    for child in node:
+        tag = child.tag
+        if tag in _FIELDS:
+            slot = _FIELDS[tag]
+            if slot is None:
+                entry._owner = child
+            else:
+                setattr(entry, slot, child.text or '')
+    return entry
+
+
+class _ListParser(object):
+    """Fill `result` from a listing body given by chunks to :func:`feed`, :func:`close` returns `result`."""
+
+    #: class of the entries of each element of the body
+    entries = {}
+
+    def __init__(self, result):
+        self.result = result
+        self._parser = ElementTree.XMLParser()
+
+    def feed(self, data):
+        self._parser.feed(data)
+
+    def close(self):
+        root = self._parser.close()
+        page = _Page(root.findtext('EncodingType') == 'url')
+        self.result.is_truncated = _parse_bool('IsTruncated', self._text(root, 'IsTruncated'))
+
+        entries = self.entries
+        for node in root:
+            klass = entries.get(node.tag)
+            if klass is not None:
+                self._add_entry(_make_entry(klass, node, page))
+            elif node.tag == 'CommonPrefixes':
+                self._add_prefix(page.decode(self._text(node, 'Prefix')))
+
+        self._parse_fields(root, page)
+        return self.result
+
+    @staticmethod
+    def _text(node, tag):
+        text = node.findtext(tag)
+        if text is None:
+            raise RuntimeError("parse xml: " + tag + " could not be found under " + node.tag)
+        return text
+
+    def _add_entry(self, entry):
+        self.result.object_list.append(entry)
+
+    def _add_prefix(self, prefix):
+        self.result.prefix_list.append(prefix)
+
+    def _parse_fields(self, root, page):
+        pass
+
+
+class ListObjectsParser(_ListParser):
+    entries = {'Contents': ObjectInfo}
+
+    def _parse_fields(self, root, page):
+        if self.result.is_truncated:
+            self.result.next_marker = page.decode(self._text(root, 'NextMarker'))
+
+
+class ListObjectsV2Parser(_ListParser):
+    entries = {'Contents': ObjectInfo}
+
+    def _parse_fields(self, root, page):
+        if self.result.is_truncated:
+            self.result.next_continuation_token = page.decode(self._text(root, 'NextContinuationToken'))
+
+
+class ListObjectVersionsParser(_ListParser):
+    entries = {'Version': VersionInfo, 'DeleteMarker': DeleteMarker}
+
+    def _add_entry(self, entry):
+        if isinstance(entry, DeleteMarker):
+            self.result.delete_marker.append(entry)
+        else:
+            self.result.versions.append(entry)
+
+    def _add_prefix(self, prefix):
+        self.result.common_prefix.append(prefix)
+
+    def _parse_fields(self, root, page):
+        result = self.result
+        if result.is_truncated:
+            result.next_key_marker = page.decode(self._text(root, 'NextKeyMarker'))
+            result.next_versionid_marker = page.decode(self._text(root, 'NextVersionIdMarker'))
+
+        result.name = self._text(root, 'Name')
+        result.prefix = page.decode(self._text(root, 'Prefix'))
+        result.key_marker = page.decode(self._text(root, 'KeyMarker'))
+        result.versionid_marker = page.decode(self._text(root, 'VersionIdMarker'))
+        result.max_keys = int(self._text(root, 'MaxKeys'))
+        result.delimiter = page.decode(self._text(root, 'Delimiter'))
+
+
+class StreamingListParser(object):
+    """Incremental parser of a `list_objects` or `list_objects_v2` body, returning the entries as soon as their
+    element is complete rather than once the whole body is parsed.
+
+    The objects are returned as :class:`ObjectInfo` and the common prefixes as `SimplifiedObjectInfo` whose
+    `is_prefix()` is True, in the order of the body. The elements are dropped once converted, so that the memory used
+    doesn't grow with the size of the page. The other elements of the page, such as `IsTruncated`, are kept in
+    `fields` by tag.
+
+    :param bool url_encoded: whether the keys are url encoded, i.e. whether the listing was requested with
+        `encoding-type=url`, which OSS only reports by an `EncodingType` element that may come after them
+    """
+
+    def __init__(self, url_encoded):
+        self.fields = {}
+        self._page = _Page(url_encoded)
+        self._parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        self._root = None
+        self._depth = 0
+
+    def decode(self, value):
+        return self._page.decode(value)
+
+    def feed(self, data):
+        """Parse `data`, the next chunk of the body, and return the list of the entries it completes."""
+        self._parser.feed(data)
+        return self._read_entries()
+
+    def close(self):
+        """End the body and return the list of the entries left."""
+        self._parser.close()
+        return self._read_entries()
+
+    def _read_entries(self):
+        entries = []
+        for event, node in self._parser.read_events():
+            if event == 'start':
+                self._depth += 1
+                if self._depth == 1:
+                    self._root = node
+                continue
+
+            if self._depth == 2:
+                tag = node.tag
+                if tag == 'Contents':
+                    entries.append(_make_entry(ObjectInfo, node, self._page))
+                elif tag == 'CommonPrefixes':
+                    entries.append(SimplifiedObjectInfo(self._page.decode(node.findtext('Prefix', '')),
+                                                        None, None, None, None, None))
+                else:
+                    self.fields[tag] = node.text or ''
+                # the children of the root are complete one at a time, so this one is the first
+                self._root.remove(node)
+            self._depth -= 1
+        return entries
+
+
+def _parse(parser_class, result, body):
+    parser = parser_class(result)
+    parser.feed(body)
+    return parser.close()
+
+
+def parse_list_objects(result, body):
+    """Same as `oss2.xml_utils.parse_list_objects`, with lazily converted entries."""
+    return _parse(ListObjectsParser, result, body)
+
+
+def parse_list_objects_v2(result, body):
+    """Same as `oss2.xml_utils.parse_list_objects_v2`, with lazily converted entries."""
+    return _parse(ListObjectsV2Parser, result, body)
+
+
+def parse_list_object_versions(result, body):
+    """Same as `oss2.xml_utils.parse_list_object_versions`, with lazily converted entries."""
+    return _parse(ListObjectVersionsParser, result, body)
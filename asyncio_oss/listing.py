@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.listing
+~~~~~~~~~~~~~~~~~~~
+
+Parallel listing of large buckets. The keyspace under a prefix is split into shards, which are listed concurrently
+with `list_objects_v2` and merged back into a single asynchronous stream of objects.
+
+Usage ::
+
+    >>> async for obj in asyncio_oss.ParallelObjectIterator(bucket, prefix='logs/', num_tasks=16):
+    >>>     print(obj.key, obj.size)
+"""
+import asyncio
+import collections
+import json
+import logging
+import os
+
+from oss2 import defaults, utils
+from oss2.resumable import _ResumableStoreBase
+
+from . import file_io
+
+logger = logging.getLogger(__name__)
+
+#: default number of shards listed concurrently
+list_num_tasks = 8
+
+_LIST_TEMP_DIR = '.py-oss-list'
+
+
+class ResumableListStore(_ResumableStoreBase):
+    """保存并行列举断点信息的类。
+
+    每次列举的断点信息会保存在 `root/dir/` 下面的某个文件里。
+
+    :param str root: 父目录，缺省为HOME
+    :param str dir: 子目录，缺省为 `_LIST_TEMP_DIR`
+    """
+
+    def __init__(self, root=None, dir=None):
+        super(ResumableListStore, self).__init__(root or os.path.expanduser('~'), dir or _LIST_TEMP_DIR)
+
+    @staticmethod
+    def make_store_key(bucket_name, prefix, plan):
+        oss_pathname = 'oss://{0}/{1}'.format(bucket_name, prefix)
+        return utils.md5_string(oss_pathname) + '--' + utils.md5_string(json.dumps(plan, sort_keys=True))
+
+
+def make_list_store(root=None, dir=None):
+    return ResumableListStore(root=root, dir=dir)
+
+
+class ParallelObjectIterator(object):
+    """List all the objects under `prefix` with several concurrent cursors.
+
+    Each iteration returns a :class:`SimplifiedObjectInfo <oss2.models.SimplifiedObjectInfo>` object, all the objects
+    under the prefix are returned, there are no common prefixes.
+
+    The keyspace is split into shards:
+
+    - with `split_points`, by key ranges: the shards are (, p1], (p1, p2], ... (pn, ). Keys sampled from a previous
+      listing or an inventory make balanced shards.
+    - otherwise, by the common prefixes found under `prefix` with `delimiter`: each common prefix is a shard, and the
+      objects directly under `prefix` are listed by extra shards in between.
+
+    At most `num_tasks` shards are listed at the same time, and each of them buffers at most `queue_size` pages ahead
+    of the consumer. With `ordered`, the objects are returned in key order, as `ObjectIteratorV2` would; otherwise
+    they are returned as soon as any shard gets them.
+
+    With a `store`, the shards and the progress of each of them are saved after each page consumed, and an
+    interrupted listing with the same parameters resumes from there: objects of the page being consumed when it was
+    interrupted may be returned again. The record is deleted once the listing is done.
+
+    :param bucket: :class:`Bucket <asyncio_oss.Bucket>` 对象
+    :param str prefix: 只列举匹配该前缀的文件
+    :param split_points: list of keys splitting the keyspace, None to split by `delimiter`
+    :param str delimiter: 分隔符, used to find the shards when there are no `split_points`. An empty delimiter
+        lists the prefix with a single shard.
+    :param bool ordered: return the objects in key order
+    :param int num_tasks: max number of shards listed concurrently, defaults to `list_num_tasks`
+    :param int max_keys: 每次调用 `list_objects_v2` 时的max_keys参数
+    :param int queue_size: max number of pages buffered per shard in order, or per task otherwise
+    :param store: 用来保存断点信息的持久存储，如 `make_list_store()`，None表示不保存断点
+    :param bool fetch_owner: 是否获取文件的owner信息
+
+    :param headers: HTTP头部
+    :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+    """
+
+    def __init__(self, bucket, prefix='', split_points=None, delimiter='/', ordered=True, num_tasks=None,
+                 max_keys=1000, queue_size=2, store=None, fetch_owner=False, headers=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.split_points = sorted(set(split_points)) if split_points is not None else None
+        self.delimiter = delimiter
+        self.ordered = ordered
+        self.num_tasks = defaults.get(num_tasks, list_num_tasks)
+        self.max_keys = max_keys
+        self.queue_size = queue_size
+        self.fetch_owner = fetch_owner
+        self.headers = headers
+
+        self.__store = store
+        self.__record_key = None
+        if store is not None:
+            plan = {'split_points': self.split_points, 'delimiter': delimiter}
+            self.__record_key = store.make_store_key(bucket.bucket_name, prefix, plan)
+
+        self.__gen = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.__gen is None:
+            self.__gen = self.__iterate()
+        return await self.__gen.__anext__()
+
+    async def next(self):
+        return await self.__anext__()
+
+    async def close(self):
+        """Stop the listing and cancel the shards being listed."""
+        if self.__gen is not None:
+            await self.__gen.aclose()
+
+    async def __iterate(self):
+        record = await self.__get_record()
+        if record is None:
+            record = {'shards': await self.__make_shards()}
+            await self.__put_record(record)
+
+        shards = record['shards']
+        todo = [i for i, shard in enumerate(shards) if not shard['done']]
+        logger.debug("Start to list objects in parallel, bucket: {0}, prefix: {1}, shards: {2}, left: {3}".format(
+            self.bucket.bucket_name, self.prefix, len(shards), len(todo)))
+
+        if self.ordered:
+            queues = dict((i, asyncio.Queue(self.queue_size)) for i in todo)
+        else:
+            queue = asyncio.Queue(self.queue_size * self.num_tasks)
+            queues = dict((i, queue) for i in todo)
+
+        pending = collections.deque(todo)
+
+        async def worker():
+            while pending:
+                i = pending.popleft()
+                try:
+                    await self.__list_shard(i, shards[i], queues[i])
+                except Exception as e:
+                    # reported when the consumer gets to this shard, the other shards keep going meanwhile
+                    await queues[i].put((i, e, None, True))
+
+        tasks = [asyncio.ensure_future(worker()) for _ in range(min(self.num_tasks, len(todo)))]
+        try:
+            if self.ordered:
+                for i in todo:
+                    done = False
+                    while not done:
+                        i, entries, last_key, done = await queues[i].get()
+                        async for obj in self.__consume(shards, record, i, entries, last_key, done):
+                            yield obj
+            else:
+                left = len(todo)
+                while left:
+                    i, entries, last_key, done = await queue.get()
+                    async for obj in self.__consume(shards, record, i, entries, last_key, done):
+                        yield obj
+                    if done:
+                        left -= 1
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        await self.__del_record()
+        logger.debug("List objects in parallel done, bucket: {0}, prefix: {1}".format(
+            self.bucket.bucket_name, self.prefix))
+
+    async def __consume(self, shards, record, i, entries, last_key, done):
+        if isinstance(entries, Exception):
+            raise entries
+
+        for obj in entries:
+            yield obj
+
+        if last_key is not None:
+            shards[i]['start_after'] = last_key
+        shards[i]['done'] = done
+        await self.__put_record(record)
+
+    async def __list_shard(self, i, shard, queue):
+        continuation_token = ''
+        end = shard['end']
+        while True:
+            result = await self.bucket.list_objects_v2(prefix=shard['prefix'],
+                                                       delimiter=shard['delimiter'],
+                                                       continuation_token=continuation_token,
+                                                       start_after=shard['start_after'],
+                                                       fetch_owner=self.fetch_owner,
+                                                       max_keys=self.max_keys,
+                                                       headers=self.headers)
+
+            # the common prefixes returned when listing with a delimiter are the subtrees of other shards
+            entries = result.object_list
+            done = not result.is_truncated
+            if end is not None:
+                if (entries and entries[-1].key > end) or any(p > end for p in result.prefix_list):
+                    entries = [obj for obj in entries if obj.key <= end]
+                    done = True
+
+            last_key = entries[-1].key if entries else None
+            await queue.put((i, entries, last_key, done))
+            if done:
+                return
+            continuation_token = result.next_continuation_token
+
+    async def __make_shards(self):
+        if self.split_points is not None:
+            bounds = [''] + self.split_points
+            ends = self.split_points + [None]
+            return [_make_shard(self.prefix, start_after=start_after, end=end)
+                    for start_after, end in zip(bounds, ends)]
+
+        if not self.delimiter:
+            return [_make_shard(self.prefix)]
+
+        # one pass over the first level, which the delimiter makes short
+        items = []
+        continuation_token = ''
+        while True:
+            result = await self.bucket.list_objects_v2(prefix=self.prefix,
+                                                       delimiter=self.delimiter,
+                                                       continuation_token=continuation_token,
+                                                       max_keys=self.max_keys,
+                                                       headers=self.headers)
+            items.extend((obj.key, False) for obj in result.object_list)
+            items.extend((prefix, True) for prefix in result.prefix_list)
+            if not result.is_truncated:
+                break
+            continuation_token = result.next_continuation_token
+        items.sort()
+
+        # the objects directly under the prefix sit between the subtrees in key order: each run of them is listed
+        # again with the delimiter, from the common prefix before it to its last key
+        shards = []
+        run_start, run_end = '', None
+        for key, is_prefix in items:
+            if not is_prefix:
+                run_end = key
+                continue
+
+            if run_end is not None:
+                shards.append(_make_shard(self.prefix, self.delimiter, start_after=run_start, end=run_end))
+                run_end = None
+            shards.append(_make_shard(key))
+            run_start = key
+
+        if run_end is not None:
+            shards.append(_make_shard(self.prefix, self.delimiter, start_after=run_start, end=run_end))
+
+        return shards
+
+    async def __get_record(self):
+        if self.__store is None:
+            return None
+
+        record = await file_io.run(self.__store.get, self.__record_key)
+        if record is not None and not _is_record_valid(record):
+            logger.warning('{0} is not a valid list record, start over'.format(self.__record_key))
+            await self.__del_record()
+            return None
+        return record
+
+    async def __put_record(self, record):
+        if self.__store is not None:
+            await file_io.run(self.__store.put, self.__record_key, record)
+
+    async def __del_record(self):
+        if self.__store is not None:
+            try:
+                await file_io.run(self.__store.delete, self.__record_key)
+            except OSError:
+                pass
+
+
+def _make_shard(prefix, delimiter='', start_after='', end=None):
+    return {'prefix': prefix, 'delimiter': delimiter, 'start_after': start_after, 'end': end, 'done': False}
+
+
+def _is_record_valid(record):
+    try:
+        return all(isinstance(shard['prefix'], str) and isinstance(shard['start_after'], str)
+                   and isinstance(shard['done'], bool) and 'end' in shard and 'delimiter' in shard
+                   for shard in record['shards'])
+    except (KeyError, TypeError):
+        return False
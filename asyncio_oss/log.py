@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.log
+~~~~~~~~~~~~~~~
+
+Logging helpers for the request paths.
+
+The debug messages are :class:`LazyFormat` objects, formatted by the handlers only for the records they emit, so that
+they cost next to nothing while DEBUG is off.
+
+Every request sent by `Service` and `Bucket` can also be reported by a single record of the `asyncio_oss.request`
+logger, carrying its fields in `record.oss_request`, e.g. for a JSON handler. The record is only built when that
+logger is enabled for DEBUG, independently of the other loggers of the package ::
+
+    >>> logging.getLogger('asyncio_oss.request').setLevel(logging.DEBUG)
+"""
+import logging
+
+#: logger of the per request records
+request_logger = logging.getLogger('asyncio_oss.request')
+
+
+class LazyFormat(object):
+    """Log message formatted with `str.format` when a handler emits it, rather than when it is logged."""
+
+    __slots__ = ('fmt', 'args', 'kwargs')
+
+    def __init__(self, fmt, *args, **kwargs):
+        self.fmt = fmt
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return self.fmt.format(*self.args, **self.kwargs)
+
+
+def log_request(req, bucket_name, key, status, request_id, error_code, attempts, elapsed):
+    """Emit the record of a request done, if `request_logger` is enabled for DEBUG.
+
+    `record.oss_request` is a dict with `method`, `bucket`, `key`, `params`, `status`, `request_id`, `error_code` (an
+    empty str for successful requests), `attempts` and `elapsed` in seconds, for all the attempts.
+    """
+    if not request_logger.isEnabledFor(logging.DEBUG):
+        return
+
+    fields = {
+        'method': req.method,
+        'bucket': bucket_name or '',
+        'key': key or '',
+        'params': sorted(req.params) if req.params else [],
+        'status': status,
+        'request_id': request_id,
+        'error_code': error_code,
+        'attempts': attempts,
+        'elapsed': elapsed,
+    }
+    request_logger.debug(LazyFormat('{method} /{bucket}/{key} status: {status}, req_id: {request_id}, '
+                                    'attempts: {attempts}, elapsed: {elapsed:.3f}s', **fields),
+                         extra={'oss_request': fields})
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.meta_cache
+~~~~~~~~~~~~~~~~~~~~~~
+
+A bounded LRU cache of object metadata, used by `Bucket.head_object`, `Bucket.get_object_meta` and
+`Bucket.object_exists` when given as `meta_cache`: the result of the same call on the same object is handed out again
+for `ttl` seconds, and a `NoSuchKey` error for `negative_ttl` seconds, instead of sending the request again.
+
+The writes to an object made through a bucket with the cache, e.g. `put_object`, `copy_object`, `update_object_meta`
+or `delete_object`, drop its entries. The writes made by other clients, or through buckets without the cache, are
+only seen once the entries expire.
+
+Usage ::
+
+    >>> bucket = asyncio_oss.Bucket(auth, endpoint, 'bucket', meta_cache=asyncio_oss.ObjectMetaCache(ttl=5))
+    >>> exists = await bucket.object_exists('logo.jpg')
+"""
+import asyncio
+import collections
+import logging
+import time
+
+from oss2.compat import to_string
+
+from .exceptions import NoSuchKey
+
+logger = logging.getLogger(__name__)
+
+# rough size of an entry besides its strings: the key tuple, the entry tuple, the result and the slot of the
+# OrderedDict
+_ENTRY_OVERHEAD = 512
+
+
+class ObjectMetaCache(object):
+    """LRU cache of object metadata with a time to live, a cap on the number of entries and on the memory they use.
+
+    The concurrent calls for the same object share a single request: the first one sends it, the others wait for its
+    result. All of them get the same result object, which must not be modified.
+
+    Only the calls without headers nor params, besides the default ones, are cached: the ones for a given version, or
+    with conditions, always send their request.
+
+    The cache can be shared by several buckets. The results are only reused by the buckets with the same auth object,
+    so that a caller never gets metadata, or a `NoSuchKey` error, obtained with the credentials of another one. A write
+    through any of them drops the entries of the object for all of them.
+
+    :param float ttl: seconds during which a result is reused
+    :param float negative_ttl: seconds during which a `NoSuchKey` error is raised again, 0 to not cache the errors
+    :param int max_entries: max number of results kept
+    :param int max_bytes: max approximate memory used by the results kept, in bytes, None for no limit
+    """
+
+    def __init__(self, ttl=10.0, negative_ttl=2.0, max_entries=10000, max_bytes=16 * 1024 * 1024):
+        if ttl < 0 or negative_ttl < 0:
+            raise ValueError('ttl and negative_ttl should not be negative, got {0} and {1}'.format(ttl, negative_ttl))
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        #: number of results reused
+        self.hits = 0
+
+        #: number of `NoSuchKey` errors raised again
+        self.negative_hits = 0
+
+        #: number of calls which waited for the request of a concurrent call for the same object
+        self.coalesced = 0
+
+        #: number of requests sent because nothing could be reused
+        self.misses = 0
+
+        #: number of results dropped to stay within `max_entries` and `max_bytes`
+        self.evictions = 0
+
+        #: number of objects whose entries were dropped because they were written
+        self.invalidations = 0
+
+        self.nbytes = 0
+        self.__entries = collections.OrderedDict()
+        self.__loading = {}
+        # keys of the entries and requests of each object, by (endpoint, bucket name, key)
+        self.__objects = {}
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def hit_rate(self):
+        """Fraction of the calls answered without sending their own request, 0 before the first call."""
+        calls = self.hits + self.negative_hits + self.coalesced + self.misses
+        return 1 - self.misses / calls if calls else 0.0
+
+    async def load(self, cache_key, loader):
+        """Return the result cached for `cache_key`, or the one of `loader`, a coroutine function called when there is
+        none and no concurrent call is already loading it."""
+        entry = self.__entries.get(cache_key)
+        if entry is not None:
+            result, error, expires_at, _ = entry
+            if time.monotonic() < expires_at:
+                self.__entries.move_to_end(cache_key)
+                if error is not None:
+                    self.negative_hits += 1
+                    raise error.with_traceback(None)
+                self.hits += 1
+                return result
+            self.__remove(cache_key)
+
+        task = self.__loading.get(cache_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # run apart from the caller, so that its cancellation doesn't fail the calls waiting for the same result
+            task = asyncio.ensure_future(loader())
+            self.__loading[cache_key] = task
+            self.__objects.setdefault(cache_key[:3], set()).add(cache_key)
+            task.add_done_callback(lambda t: self.__loaded(cache_key, t))
+        return await asyncio.shield(task)
+
+    def invalidate(self, bucket, key):
+        """Drop the entries of the object `key` of `bucket`, and ignore the results of the requests already sent for
+        it."""
+        cache_keys = self.__objects.pop(_object_key(bucket, key), None)
+        if not cache_keys:
+            return
+        for cache_key in cache_keys:
+            self.__loading.pop(cache_key, None)
+            if cache_key in self.__entries:
+                self.__remove(cache_key)
+        self.invalidations += 1
+
+    def clear(self):
+        """Drop all the results, the counters are kept."""
+        self.__entries.clear()
+        self.__loading.clear()
+        self.__objects.clear()
+        self.nbytes = 0
+
+    def __loaded(self, cache_key, task):
+        # a request still loading when its object is written, or the cache cleared, must not be cached
+        if self.__loading.get(cache_key) is not task:
+            if not task.cancelled():
+                task.exception()
+            return
+        del self.__loading[cache_key]
+        if task.cancelled():
+            self.__untrack(cache_key)
+            return
+
+        error = task.exception()
+        if error is None:
+            result = task.result()
+            self.__put(cache_key, result, None, self.ttl, _headers_size(result.headers))
+        elif isinstance(error, NoSuchKey) and self.negative_ttl > 0:
+            self.__put(cache_key, None, error, self.negative_ttl, len(error.body or b''))
+        else:
+            self.__untrack(cache_key)
+
+    def __put(self, cache_key, result, error, ttl, size):
+        if cache_key in self.__entries:
+            self.__remove(cache_key)
+
+        size += _ENTRY_OVERHEAD + sum(len(part) for part in cache_key[:4])
+        self.__entries[cache_key] = (result, error, time.monotonic() + ttl, size)
+        self.__objects.setdefault(cache_key[:3], set()).add(cache_key)
+        self.nbytes += size
+
+        while self.__entries and (len(self.__entries) > self.max_entries or
+                                  (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            oldest = next(iter(self.__entries))
+            self.__remove(oldest)
+            self.evictions += 1
+
+    def __remove(self, cache_key):
+        entry = self.__entries.pop(cache_key)
+        self.nbytes -= entry[3]
+        self.__untrack(cache_key)
+
+    def __untrack(self, cache_key):
+        if cache_key in self.__entries or cache_key in self.__loading:
+            return
+        cache_keys = self.__objects.get(cache_key[:3])
+        if cache_keys is not None:
+            cache_keys.discard(cache_key)
+            if not cache_keys:
+                del self.__objects[cache_key[:3]]
+
+
+def _headers_size(headers):
+    return sum(len(name) + len(value) for name, value in headers.items())
+
+
+def _object_key(bucket, key):
+    return bucket.endpoint, bucket.bucket_name, to_string(key)
+
+
+def make_cache_key(bucket, key, operation):
+    """Return the key of the result of `operation` on the object `key` of `bucket` in an :class:`ObjectMetaCache`.
+
+    The auth object is part of the key, compared by identity, after the object and the operation.
+    """
+    return _object_key(bucket, key) + (operation, bucket.auth)
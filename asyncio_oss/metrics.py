@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.metrics
+~~~~~~~~~~~~~~~~~~~
+
+Metrics of the requests sent by :class:`Service <asyncio_oss.Service>` and :class:`Bucket <asyncio_oss.Bucket>`,
+exported in the text format of Prometheus, without any metrics library.
+
+Usage ::
+
+    >>> metrics = asyncio_oss.MetricsRegistry()
+    >>> bucket = asyncio_oss.Bucket(auth, endpoint, 'bucket-name', metrics=metrics)
+    >>> await bucket.put_object('a.txt', 'content of a')
+    >>> print(metrics.export_text())
+    # HELP asyncio_oss_requests_total Requests done, by operation and class of status.
+    # TYPE asyncio_oss_requests_total counter
+    asyncio_oss_requests_total{operation="put_object",status="2xx"} 1
+    ...
+
+A registry can be shared by any number of `Bucket` and `Service` objects, e.g. all the views of a `Client`.
+
+The metrics, with the default namespace:
+
+- `asyncio_oss_requests_total{operation, status}`: requests done, the status is the class of the final status
+  (`2xx`, `4xx`, `5xx`...) or `error` when no response was received (network error, timeout...)
+- `asyncio_oss_request_duration_seconds{operation}`: histogram of the time from the start of the first attempt to the
+  headers of the final response, retries included
+- `asyncio_oss_retries_total{operation}`: attempts sent again after a failure
+- `asyncio_oss_sent_bytes_total{operation}`, `asyncio_oss_received_bytes_total{operation}`: bytes of the request
+  bodies of all the attempts, and of the final response bodies, from their lengths
+- `asyncio_oss_requests_in_flight{operation}`: requests being sent, retries included
+- `asyncio_oss_pool_connections{state}`: connections of the pools of the sessions used, `in_use` or `idle`
+- `asyncio_oss_pool_limit`: sum of the max numbers of connections of the pools, 0 if one of them has no limit
+- `asyncio_oss_pool_utilization`: `in_use` connections over `asyncio_oss_pool_limit`
+"""
+import math
+import weakref
+
+#: upper bounds of the buckets of the latency histograms, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(name, _escape_label_value(value))
+                          for name, value in zip(names, values)) + '}'
+
+
+class Metric(object):
+    """Base of the metrics: `values` maps the tuple of the values of `labelnames` to the value of a series."""
+
+    type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def get(self, *labelvalues):
+        """Return the value of the series of `labelvalues`, 0 if it has none."""
+        return self.values.get(labelvalues, 0)
+
+    def clear(self):
+        self.values.clear()
+
+    def _samples(self):
+        for labelvalues in sorted(self.values, key=lambda values: tuple(str(v) for v in values)):
+            yield self.name, self.labelnames, labelvalues, self.values[labelvalues]
+
+    def export_text(self):
+        lines = ['# HELP {0} {1}'.format(self.name, self.documentation.replace('\\', r'\\').replace('\n', r'\n')),
+                 '# TYPE {0} {1}'.format(self.name, self.type)]
+        for name, labelnames, labelvalues, value in self._samples():
+            lines.append('{0}{1} {2}'.format(name, _format_labels(labelnames, labelvalues), _format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+class CounterMetric(Metric):
+    type = 'counter'
+
+    def inc(self, labelvalues=(), amount=1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+
+class GaugeMetric(Metric):
+    type = 'gauge'
+
+    def set(self, labelvalues=(), value=0):
+        self.values[labelvalues] = value
+
+    def inc(self, labelvalues=(), amount=1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def dec(self, labelvalues=(), amount=1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) - amount
+
+
+class HistogramMetric(Metric):
+    """Histogram with cumulative buckets, `values` maps the label values to [bucket counts..., sum, count]."""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super(HistogramMetric, self).__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labelvalues=(), value=0.0):
+        series = self.values.get(labelvalues)
+        if series is None:
+            series = self.values[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def get(self, *labelvalues):
+        """Return the number of values observed for `labelvalues`."""
+        series = self.values.get(labelvalues)
+        return series[-1] if series is not None else 0
+
+    def get_sum(self, *labelvalues):
+        series = self.values.get(labelvalues)
+        return series[-2] if series is not None else 0.0
+
+    def _samples(self):
+        labelnames = self.labelnames + ('le',)
+        for _, _, labelvalues, series in super(HistogramMetric, self)._samples():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield self.name + '_bucket', labelnames, labelvalues + (_format_value(bound),), cumulative
+            yield self.name + '_bucket', labelnames, labelvalues + ('+Inf',), series[-1]
+            yield self.name + '_sum', self.labelnames, labelvalues, series[-2]
+            yield self.name + '_count', self.labelnames, labelvalues, series[-1]
+
+
+class MetricsRegistry(object):
+    """Metrics of the requests of the `Bucket` and `Service` objects it is given to as `metrics`.
+
+    :param str namespace: prefix of the names of the metrics
+    :param buckets: upper bounds of the buckets of the latency histogram, in seconds
+    """
+
+    def __init__(self, namespace='asyncio_oss', buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.requests = CounterMetric(namespace + '_requests_total',
+                                      'Requests done, by operation and class of status.', ('operation', 'status'))
+        self.request_duration = HistogramMetric(namespace + '_request_duration_seconds',
+                                                'Time from the first attempt of a request to its final response.',
+                                                ('operation',), buckets)
+        self.retries = CounterMetric(namespace + '_retries_total', 'Attempts sent again after a failure.',
+                                     ('operation',))
+        self.sent_bytes = CounterMetric(namespace + '_sent_bytes_total', 'Bytes of the request bodies.',
+                                        ('operation',))
+        self.received_bytes = CounterMetric(namespace + '_received_bytes_total', 'Bytes of the response bodies.',
+                                            ('operation',))
+        self.in_flight = GaugeMetric(namespace + '_requests_in_flight', 'Requests being sent.', ('operation',))
+        self.pool_connections = GaugeMetric(namespace + '_pool_connections',
+                                            'Connections of the pools, in use or idle.', ('state',))
+        self.pool_limit = GaugeMetric(namespace + '_pool_limit',
+                                      'Max number of connections of the pools, 0 for no limit.')
+        self.pool_utilization = GaugeMetric(namespace + '_pool_utilization',
+                                            'Connections in use over the max number of connections of the pools.')
+        self._sessions = weakref.WeakSet()
+
+    @property
+    def metrics(self):
+        return [self.requests, self.request_duration, self.retries, self.sent_bytes, self.received_bytes,
+                self.in_flight, self.pool_connections, self.pool_limit, self.pool_utilization]
+
+    def add_session(self, session):
+        """Include the pool of `session` in the pool gauges, it is dropped once the session is garbage collected."""
+        self._sessions.add(session)
+
+    def start_request(self, operation):
+        self.in_flight.inc((operation,))
+
+    def end_request(self, operation):
+        self.in_flight.dec((operation,))
+
+    def observe_request(self, operation, status, elapsed, attempts, bytes_sent, bytes_received):
+        """Count a request done after `attempts` attempts, `status` is the one of its final response."""
+        status_class = '{0}xx'.format(status // 100) if status >= 100 else 'error'
+        self.requests.inc((operation, status_class))
+        self.request_duration.observe((operation,), elapsed)
+        if attempts > 1:
+            self.retries.inc((operation,), attempts - 1)
+        if bytes_sent:
+            self.sent_bytes.inc((operation,), bytes_sent)
+        if bytes_received:
+            self.received_bytes.inc((operation,), bytes_received)
+
+    def collect(self):
+        """Update the pool gauges from the connectors of the sessions and return the metrics."""
+        in_use = idle = limit = 0
+        unlimited = False
+        for session in list(self._sessions):
+            aio_session = getattr(session, '_aio_session', None)
+            if aio_session is None or aio_session.closed:
+                continue
+            connector = aio_session.connector
+            in_use += len(getattr(connector, '_acquired', ()))
+            idle += sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+            if connector.limit:
+                limit += connector.limit
+            else:
+                unlimited = True
+
+        limit = 0 if unlimited else limit
+        self.pool_connections.set(('in_use',), in_use)
+        self.pool_connections.set(('idle',), idle)
+        self.pool_limit.set((), limit)
+        self.pool_utilization.set((), in_use / limit if limit else 0.0)
+        return self.metrics
+
+    def export_text(self):
+        """Return the metrics in the text exposition format of Prometheus (version 0.0.4), e.g. for the body of a
+        `/metrics` endpoint served with the content type `text/plain; version=0.0.4`."""
+        return ''.join(metric.export_text() for metric in self.collect())
+
+    def clear(self):
+        """Reset all the metrics, except the requests in flight."""
+        for metric in self.metrics:
+            if metric is not self.in_flight:
+                metric.clear()
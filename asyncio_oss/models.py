@@ -7,14 +7,17 @@ oss2.models
 该模块包含Python SDK API接口所需要的输入参数以及返回值类型。
 """
 import logging
+import collections
 import copy
 
 from .exceptions import ClientError
 from .utils import make_crc_adapter
+from .list_parser import StreamingListParser
+from .select_response import SelectResponseAdapter
 
 from oss2.utils import make_progress_adapter
 from oss2.headers import *
-from oss2.models import HeadObjectResult, ContentCryptoMaterial, _hget, KMS_ALI_WRAP_ALGORITHM
+from oss2.models import RequestResult, HeadObjectResult, ContentCryptoMaterial, _hget, KMS_ALI_WRAP_ALGORITHM
 
 logger = logging.getLogger(__name__)
 
@@ -110,3 +113,130 @@ class GetObjectResult(HeadObjectResult):
             return self.stream.crc
         else:
             return None
+
+
+class SelectObjectResult(HeadObjectResult):
+    """Result of :func:`Bucket.select_object <asyncio_oss.Bucket.select_object>`, whose frames are decoded as the
+    body is received, see :class:`SelectResponseAdapter <asyncio_oss.select_response.SelectResponseAdapter>`.
+
+    Iterating it with `async for` returns the selected data by chunks, :func:`records` returns it by records.
+    """
+
+    def __init__(self, resp, progress_callback=None, crc_enabled=False):
+        super(SelectObjectResult, self).__init__(resp)
+        self.select_resp = SelectResponseAdapter(resp, progress_callback, self.content_length, crc_enabled)
+
+    async def read(self):
+        return await self.select_resp.read()
+
+    def records(self, delimiter=b'\n'):
+        """Iterate the selected records, split by `delimiter` and returned without it."""
+        return self.select_resp.records(delimiter)
+
+    def close(self):
+        self.resp.response.close()
+
+    def __aiter__(self):
+        return self.select_resp
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class GetSelectObjectMetaResult(HeadObjectResult):
+    """Result of :func:`Bucket.create_select_object_meta <asyncio_oss.Bucket.create_select_object_meta>`, built from
+    its response once the meta end frame is decoded by :func:`read_meta`."""
+
+    def __init__(self, resp):
+        super(GetSelectObjectMetaResult, self).__init__(resp)
+        self.select_resp = SelectResponseAdapter(resp)
+        self.csv_rows = self.csv_splits = self.rows = self.splits = 0
+
+    async def read_meta(self):
+        async for _ in self.select_resp:  # waiting the response body to finish
+            pass
+
+        self.csv_rows = self.select_resp.rows  # to be compatible with previous version.
+        self.csv_splits = self.select_resp.splits  # to be compatible with previous version.
+        self.rows = self.csv_rows
+        self.splits = self.csv_splits
+        return self
+
+
+class ListObjectsV2StreamResult(RequestResult):
+    """Page of `list_objects_v2` whose entries are parsed as the body is received, see
+    :func:`Bucket.list_objects_v2_stream <asyncio_oss.Bucket.list_objects_v2_stream>`.
+
+    Iterating it returns the objects, as :class:`ObjectInfo <asyncio_oss.list_parser.ObjectInfo>`, and the common
+    prefixes, as `SimplifiedObjectInfo` whose `is_prefix()` is True, in the order of the response. `is_truncated` and
+    `next_continuation_token` are set as soon as they are received, which is before the entries with OSS, and are
+    final once the iteration is over, as `prefix_list`.
+
+    The body is read while iterating: a page left before its end should be closed with :func:`close`, or used as an
+    asynchronous context manager, to release its connection.
+    """
+
+    # bytes read from the body at a time, the data already received is returned without waiting for more
+    read_size = 64 * 1024
+
+    def __init__(self, resp, url_encoded=True):
+        super(ListObjectsV2StreamResult, self).__init__(resp)
+
+        #: True表示还有更多的文件可以罗列；False表示已经列举完毕。
+        self.is_truncated = False
+
+        #: 下次罗列操作携带的token
+        self.next_continuation_token = ''
+
+        #: 已经罗列得到的公共前缀列表，类型为str列表。
+        self.prefix_list = []
+
+        self.__parser = StreamingListParser(url_encoded)
+        self.__entries = collections.deque()
+        self.__done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.__entries:
+            if self.__done:
+                raise StopAsyncIteration
+
+            chunk = await self.resp.read(self.read_size)
+            if chunk:
+                entries = self.__parser.feed(chunk)
+            else:
+                entries = self.__parser.close()
+                self.__done = True
+            self.__update(entries)
+            self.__entries.extend(entries)
+
+        return self.__entries.popleft()
+
+    def __update(self, entries):
+        fields = self.__parser.fields
+        if 'IsTruncated' in fields:
+            self.is_truncated = fields['IsTruncated'] == 'true'
+        if 'NextContinuationToken' in fields:
+            self.next_continuation_token = self.__parser.decode(fields['NextContinuationToken'])
+        self.prefix_list.extend(entry.key for entry in entries if entry.is_prefix())
+
+        if self.__done and self.is_truncated and not self.next_continuation_token:
+            raise RuntimeError("parse xml: NextContinuationToken could not be found under ListBucketResult")
+
+    def close(self):
+        """Release the connection if the body was not read to its end."""
+        if not self.__done:
+            self.__done = True
+            self.__entries.clear()
+            self.resp.response.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.parallel_select
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Parallel SelectObject over large CSV and JSON lines objects. The splits of the object, given by
+`create_select_object_meta`, are divided into ranges, which are selected concurrently with `select_object` and merged
+back into a single asynchronous stream.
+
+Usage ::
+
+    >>> async for chunk in asyncio_oss.ParallelSelectIterator(bucket, 'access.log', 'select * from ossobject',
+    >>>                                                       num_tasks=16):
+    >>>     print(chunk)
+"""
+import asyncio
+import collections
+import copy
+import logging
+
+from oss2 import defaults
+from oss2.select_params import SelectParameters, SelectJsonTypes
+
+from .exceptions import ClientError
+from .log import LazyFormat
+
+logger = logging.getLogger(__name__)
+
+#: default number of ranges selected concurrently
+select_num_tasks = 8
+
+#: default number of ranges per task, more ranges balance the tasks better when some splits are slower to scan
+select_ranges_per_task = 4
+
+# keys of the select parameters passed on to create_select_object_meta
+_META_PARAMS = (SelectParameters.RecordDelimiter, SelectParameters.FieldDelimiter, SelectParameters.QuoteCharacter,
+                SelectParameters.CompressionType, SelectParameters.Json_Type)
+
+
+class ParallelSelectIterator(object):
+    """Select the content of the object `key` with several concurrent `select_object` calls over split ranges.
+
+    The object is first described by :func:`create_select_object_meta <asyncio_oss.Bucket.create_select_object_meta>`
+    (which OSS keeps once created), then its splits are divided into `num_tasks * ranges_per_task` ranges of
+    consecutive splits, at most `num_tasks` of which are selected at the same time. Each iteration returns a chunk of
+    the selected data, as bytes ending at the end of a record.
+
+    With `ordered`, the chunks are returned in the order of the object, as a single `select_object` would return
+    them. Otherwise they are returned as soon as any range gets them, which suits the aggregations: each range then
+    returns its own partial result, e.g. one count per range for `select count(*)`, to be combined by the caller.
+
+    Each range buffers at most `queue_size` chunks ahead of the consumer in order, or each task otherwise, so the
+    memory used is bounded whatever the size of the object and of the result.
+
+    Only CSV and JSON lines objects have splits: a JSON document is selected by a single `select_object`.
+
+    :param bucket: :class:`Bucket <asyncio_oss.Bucket>` 对象
+    :param str key: 文件名
+    :param str sql: sql statement
+    :param select_params: select参数集合，参见 :ref:`select_params`。`SplitRange` and `LineRange` are set by the
+        iterator, `OutputHeader` only applies to the first range.
+    :param select_meta_params: create_select_object_meta参数集合，参见 :ref:`select_meta_params`, None to take
+        the ones of `select_params`
+    :param bool ordered: return the data in the order of the object
+    :param int num_tasks: max number of ranges selected concurrently, defaults to `select_num_tasks`
+    :param int ranges_per_task: number of ranges per task, defaults to `select_ranges_per_task`
+    :param int queue_size: max number of chunks buffered per range in order, or per task otherwise
+
+    :param headers: HTTP头部
+    :type headers: 可以是dict，建议是oss2.CaseInsensitiveDict
+    """
+
+    def __init__(self, bucket, key, sql, select_params=None, select_meta_params=None, ordered=True, num_tasks=None,
+                 ranges_per_task=None, queue_size=4, headers=None):
+        self.bucket = bucket
+        self.key = key
+        self.sql = sql
+        self.select_params = dict(select_params or {})
+        self.select_meta_params = select_meta_params
+        self.ordered = ordered
+        self.num_tasks = defaults.get(num_tasks, select_num_tasks)
+        self.ranges_per_task = defaults.get(ranges_per_task, select_ranges_per_task)
+        self.queue_size = queue_size
+        self.headers = headers
+
+        for name in (SelectParameters.SplitRange, SelectParameters.LineRange):
+            if name in self.select_params:
+                raise ClientError('"{0}" is set by ParallelSelectIterator, it must not be in select_params'.format(
+                    name))
+
+        #: number of rows of the object, once its meta is created
+        self.rows = None
+
+        #: number of splits of the object, once its meta is created
+        self.splits = None
+
+        #: split ranges selected, as (first split, last split)
+        self.ranges = None
+
+        self.__gen = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.__gen is None:
+            self.__gen = self.__iterate()
+        return await self.__gen.__anext__()
+
+    async def next(self):
+        return await self.__anext__()
+
+    async def read(self):
+        """Return all the selected data."""
+        return b''.join([chunk async for chunk in self])
+
+    async def records(self):
+        """Iterate the selected records, without their delimiter."""
+        delimiter = self.__record_delimiter()
+        async for chunk in self:
+            records = chunk.split(delimiter)
+            if not records[-1]:
+                records.pop()
+            for record in records:
+                yield record
+
+    async def close(self):
+        """Stop the select and cancel the ranges being selected."""
+        if self.__gen is not None:
+            await self.__gen.aclose()
+
+    def __record_delimiter(self):
+        delimiter = self.select_params.get(SelectParameters.OutputRecordDelimiter, '\n')
+        return delimiter.encode('utf-8') if isinstance(delimiter, str) else delimiter
+
+    def __is_json_document(self):
+        return self.select_params.get(SelectParameters.Json_Type) == SelectJsonTypes.DOCUMENT
+
+    async def __iterate(self):
+        if self.__is_json_document():
+            self.ranges = [None]
+        else:
+            self.ranges = await self.__make_ranges()
+        logger.debug(LazyFormat("Start to select object in parallel, bucket: {0}, key: {1}, splits: {2}, ranges: {3}",
+                                self.bucket.bucket_name, self.key, self.splits, len(self.ranges)))
+
+        todo = list(range(len(self.ranges)))
+        if self.ordered:
+            queues = dict((i, asyncio.Queue(self.queue_size)) for i in todo)
+        else:
+            queue = asyncio.Queue(self.queue_size * self.num_tasks)
+            queues = dict((i, queue) for i in todo)
+
+        pending = collections.deque(todo)
+
+        async def worker():
+            while pending:
+                i = pending.popleft()
+                try:
+                    await self.__select_range(i, queues[i])
+                except Exception as e:
+                    # reported when the consumer gets to this range, the other ranges keep going meanwhile
+                    await queues[i].put((e, True))
+
+        tasks = [asyncio.ensure_future(worker()) for _ in range(min(self.num_tasks, len(todo)))]
+        try:
+            if self.ordered:
+                for i in todo:
+                    done = False
+                    while not done:
+                        chunk, done = await queues[i].get()
+                        if isinstance(chunk, Exception):
+                            raise chunk
+                        if chunk:
+                            yield chunk
+            else:
+                left = len(todo)
+                while left:
+                    chunk, done = await queue.get()
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    if chunk:
+                        yield chunk
+                    if done:
+                        left -= 1
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.debug(LazyFormat("Select object in parallel done, bucket: {0}, key: {1}", self.bucket.bucket_name,
+                                self.key))
+
+    async def __make_ranges(self):
+        meta_params = self.select_meta_params
+        if meta_params is None:
+            meta_params = dict((name, self.select_params[name]) for name in _META_PARAMS if name in self.select_params)
+
+        result = await self.bucket.create_select_object_meta(self.key, meta_params or None, headers=self.headers)
+        self.rows = result.rows
+        self.splits = result.splits
+
+        count = min(self.splits, self.num_tasks * self.ranges_per_task)
+        if count == 0:
+            return []
+        # consecutive splits, the first ranges taking one more when they don't divide evenly
+        size, extra = divmod(self.splits, count)
+        ranges = []
+        first = 0
+        for i in range(count):
+            last = first + size + (1 if i < extra else 0) - 1
+            ranges.append((first, last))
+            first = last + 1
+        return ranges
+
+    async def __select_range(self, i, queue):
+        select_params = copy.copy(self.select_params)
+        split_range = self.ranges[i]
+        if split_range is not None:
+            select_params[SelectParameters.SplitRange] = split_range
+        if i > 0:
+            select_params.pop(SelectParameters.OutputHeader, None)
+
+        result = await self.bucket.select_object(self.key, self.sql, select_params=select_params or None,
+                                                 headers=self.headers)
+        delimiter = self.__record_delimiter()
+        rest = b''
+        try:
+            async for chunk in result:
+                # cut at the end of the last record, so that the chunks of different ranges can be interleaved
+                if rest:
+                    chunk = rest + chunk
+                end = chunk.rfind(delimiter) + len(delimiter)
+                if end < len(delimiter):
+                    rest = chunk
+                    continue
+                rest = chunk[end:]
+                await queue.put((chunk if end == len(chunk) else chunk[:end], False))
+        except BaseException:
+            # the connection of a body left before its end can't be reused
+            result.close()
+            raise
+        await queue.put((rest, True))
@@ -0,0 +1,587 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.resumable
+~~~~~~~~~~~~~~~~~~~~~
+
+Asynchronous resumable transfers, the counterpart of `oss2.resumable`. Parts are transferred concurrently as
+coroutines on the event loop instead of threads, and the checkpoint records are kept by the stores of oss2.
+"""
+import logging
+import os
+import random
+import string
+
+from .crc import calc_obj_crc_from_parts
+from .iterators import PartIterator
+from .task_queue import TaskQueue
+from .utils import copyfileobj_and_verify
+from . import exceptions, file_io, http
+
+from oss2 import defaults, utils
+from oss2.api import Bucket as _OssBucket
+from oss2.compat import to_string
+from oss2.headers import *
+from oss2.models import PartInfo
+from oss2.resumable import (ResumableStore, ResumableDownloadStore, make_upload_store, make_download_store,
+                            determine_part_size, _determine_part_size_internal, _split_to_parts, _ObjectInfo,
+                            _PartToProcess, _populate_valid_headers, _filter_invalid_headers, _populate_valid_params,
+                            _MAX_MULTIGET_PART_COUNT)
+
+logger = logging.getLogger(__name__)
+
+#: default number of parts uploaded concurrently by :func:`resumable_upload`
+multipart_num_tasks = 4
+
+#: default number of ranges downloaded concurrently by :func:`resumable_download`
+multiget_num_tasks = 4
+
+
+async def resumable_upload(bucket, key, filename,
+                           store=None,
+                           headers=None,
+                           multipart_threshold=None,
+                           part_size=None,
+                           progress_callback=None,
+                           num_threads=None,
+                           params=None):
+    """Resumable upload of a local file.
+
+    Files smaller than `multipart_threshold` are uploaded by a single `put_object`. Larger files are uploaded by
+    multipart upload, with up to `num_threads` parts in flight at the same time. Every confirmed part is saved into
+    the checkpoint record, so an interrupted upload of the same file to the same key only uploads the missing parts
+    next time. When crc is enabled on the bucket, the crc of the whole object is checked against the combination of
+    the crc of each part.
+
+    :param bucket: :class:`Bucket <asyncio_oss.Bucket>` object
+    :param key: object name
+    :param filename: local file name
+    :param store: persistent store of the checkpoint record, :class:`ResumableStore` is used by default.
+
+    :param headers: HTTP headers, passed in full to `put_object` and `init_multipart_upload`; only
+        OSS_REQUEST_PAYER and OSS_TRAFFIC_LIMIT are passed to `upload_part`, and only OSS_REQUEST_PAYER and
+        OSS_OBJECT_ACL to `complete_multipart_upload`
+    :type headers: dict or oss2.CaseInsensitiveDict
+
+    :param multipart_threshold: files whose size is larger or equal than it are uploaded by multipart upload
+    :param part_size: preferred part size, it is calculated when not specified
+    :param progress_callback: progress callback, see :ref:`progress_callback`
+    :param num_threads: number of parts uploaded concurrently, defaults to `multipart_num_tasks`
+
+    :param params: HTTP params, only 'sequential' is passed to `init_multipart_upload`
+    :type params: dict
+
+    :return: :class:`PutObjectResult <oss2.models.PutObjectResult>`
+    """
+    logger.debug("Start to resumable upload, bucket: {0}, key: {1}, filename: {2}, headers: {3}, "
+                 "multipart_threshold: {4}, part_size: {5}, num_threads: {6}".format(bucket.bucket_name,
+                                                                                     to_string(key), filename,
+                                                                                     headers, multipart_threshold,
+                                                                                     part_size, num_threads))
+    size = os.path.getsize(filename)
+    multipart_threshold = defaults.get(multipart_threshold, defaults.multipart_threshold)
+
+    logger.debug("The size of file to upload is: {0}, multipart_threshold: {1}".format(size, multipart_threshold))
+    if size >= multipart_threshold:
+        uploader = _ResumableUploader(bucket, key, filename, size, store,
+                                      part_size=part_size,
+                                      headers=headers,
+                                      progress_callback=progress_callback,
+                                      num_threads=num_threads,
+                                      params=params)
+        result = await uploader.upload()
+    else:
+        result = await bucket.put_object_from_file(key, filename, headers=headers,
+                                                   progress_callback=progress_callback)
+
+    return result
+
+
+async def resumable_download(bucket, key, filename,
+                             multiget_threshold=None,
+                             part_size=None,
+                             progress_callback=None,
+                             num_threads=None,
+                             store=None,
+                             params=None,
+                             headers=None):
+    """Resumable download of an object into a local file.
+
+    The object is looked up by a HEAD request first. Objects smaller than `multiget_threshold` are downloaded by a
+    single `get_object_to_file`. Larger objects are split into byte ranges which are fetched concurrently, up to
+    `num_threads` at a time, and each range is written at its offset of a preallocated temporary file, which is
+    renamed to `filename` when all the ranges are done.
+
+    The finished ranges, the ETag and the last modified time of the object are saved into the checkpoint record, so
+    an interrupted download of the same object into the same file only fetches the missing ranges next time, and is
+    started over if the object has been overwritten in the meantime. When crc is enabled on the bucket, the crc of
+    each range is combined and checked against the crc of the whole object.
+
+    :param bucket: :class:`Bucket <asyncio_oss.Bucket>` object
+    :param str key: object name
+    :param str filename: local file name, it is overwritten if it exists
+    :param int multiget_threshold: objects whose size is larger or equal than it are downloaded by ranges
+    :param int part_size: preferred size of each range
+    :param progress_callback: progress callback, see :ref:`progress_callback`
+    :param num_threads: number of ranges downloaded concurrently, defaults to `multiget_num_tasks`
+
+    :param store: persistent store of the checkpoint record, :class:`ResumableDownloadStore` is used by default.
+    :type store: `ResumableDownloadStore`
+
+    :param dict params: HTTP params, e.g. versionId to download a specific version
+
+    :param headers: HTTP headers, only OSS_REQUEST_PAYER is passed to `head_object`, and only OSS_REQUEST_PAYER and
+        OSS_TRAFFIC_LIMIT are passed to `get_object`
+    :type headers: dict or oss2.CaseInsensitiveDict
+
+    :raises: :class:`NotFound <oss2.exceptions.NotFound>` if the object does not exist, and other exceptions of
+        the download itself
+    """
+    logger.debug("Start to resumable download, bucket: {0}, key: {1}, filename: {2}, multiget_threshold: {3}, "
+                 "part_size: {4}, num_threads: {5}".format(bucket.bucket_name, to_string(key), filename,
+                                                           multiget_threshold, part_size, num_threads))
+    multiget_threshold = defaults.get(multiget_threshold, defaults.multiget_threshold)
+
+    valid_headers = _populate_valid_headers(headers, [OSS_REQUEST_PAYER, OSS_TRAFFIC_LIMIT])
+    result = await bucket.head_object(key, params=params, headers=valid_headers)
+    logger.debug("The size of object to download is: {0}, multiget_threshold: {1}".format(result.content_length,
+                                                                                          multiget_threshold))
+    if result.content_length >= multiget_threshold:
+        downloader = _ResumableDownloader(bucket, key, filename, _ObjectInfo.make(result), part_size=part_size,
+                                          progress_callback=progress_callback, num_threads=num_threads, store=store,
+                                          params=params, headers=valid_headers)
+        await downloader.download(result.server_crc)
+    else:
+        await bucket.get_object_to_file(key, filename, progress_callback=progress_callback, params=params,
+                                        headers=valid_headers)
+
+
+class _ResumableOperation(object):
+    def __init__(self, bucket, key, filename, size, store,
+                 progress_callback=None, versionid=None):
+        self.bucket = bucket
+        self.key = to_string(key)
+        self.filename = filename
+        self.size = size
+
+        self._abspath = os.path.abspath(filename)
+
+        self.__store = store
+
+        if versionid is None:
+            self.__record_key = self.__store.make_store_key(bucket.bucket_name, self.key, self._abspath)
+        else:
+            self.__record_key = self.__store.make_store_key(bucket.bucket_name, self.key, self._abspath, versionid)
+
+        logger.debug("Init _ResumableOperation, record_key: {0}".format(self.__record_key))
+
+        self.__progress_callback = progress_callback
+
+    def _del_record(self):
+        self.__store.delete(self.__record_key)
+
+    def _put_record(self, record):
+        self.__store.put(self.__record_key, record)
+
+    def _get_record(self):
+        return self.__store.get(self.__record_key)
+
+    def _report_progress(self, consumed_size):
+        if self.__progress_callback:
+            self.__progress_callback(consumed_size, self.size)
+
+
+class _ResumableDownloader(_ResumableOperation):
+    def __init__(self, bucket, key, filename, objectInfo,
+                 part_size=None,
+                 store=None,
+                 progress_callback=None,
+                 num_threads=None,
+                 params=None,
+                 headers=None):
+        versionid = None
+        if params is not None and params.get('versionId') is not None:
+            versionid = params.get('versionId')
+        super(_ResumableDownloader, self).__init__(bucket, key, filename, objectInfo.size,
+                                                   store or ResumableDownloadStore(),
+                                                   progress_callback=progress_callback,
+                                                   versionid=versionid)
+        self.objectInfo = objectInfo
+        self.__op = 'ResumableDownload'
+        self.__part_size = defaults.get(part_size, defaults.multiget_part_size)
+        self.__part_size = _determine_part_size_internal(self.size, self.__part_size, _MAX_MULTIGET_PART_COUNT)
+
+        self.__tmp_file = None
+        self.__num_threads = defaults.get(num_threads, multiget_num_tasks)
+        self.__finished_parts = None
+        self.__finished_size = None
+        self.__params = params
+        self.__headers = headers
+
+        self.__record = None
+        logger.debug("Init _ResumableDownloader, bucket: {0}, key: {1}, part_size: {2}, num_threads: {3}".format(
+            bucket.bucket_name, to_string(key), self.__part_size, self.__num_threads))
+
+    async def download(self, server_crc=None):
+        self.__load_record()
+
+        parts_to_download = self.__get_parts_to_download()
+        logger.debug("Parts need to download: {0}".format([p.part_number for p in parts_to_download]))
+
+        # create the tmp file and preallocate it, so that every range can be written at its own offset
+        async with file_io.open(self.__tmp_file, 'ab') as f:
+            if await f.tell() != self.size:
+                await f.truncate(self.size)
+
+        q = TaskQueue(lambda q: self.__producer(q, parts_to_download),
+                      [self.__consumer] * self.__num_threads)
+        await q.run()
+
+        if self.bucket.enable_crc:
+            parts = sorted(self.__finished_parts, key=lambda p: p.part_number)
+            object_crc = calc_obj_crc_from_parts(parts)
+            utils.check_crc('resume download', object_crc, server_crc, None)
+
+        utils.force_rename(self.__tmp_file, self.filename)
+
+        self._report_progress(self.size)
+        self._del_record()
+
+    async def __producer(self, q, parts_to_download):
+        for part in parts_to_download:
+            await q.put(part)
+
+    async def __consumer(self, q):
+        while q.ok():
+            part = await q.get()
+            if part is None:
+                break
+
+            await self.__download_part(part)
+
+    async def __download_part(self, part):
+        self._report_progress(self.__finished_size)
+
+        async with file_io.open(self.__tmp_file, 'rb+') as f:
+            await f.seek(part.start, os.SEEK_SET)
+
+            headers = _populate_valid_headers(self.__headers, [OSS_REQUEST_PAYER, OSS_TRAFFIC_LIMIT])
+            if headers is None:
+                headers = http.CaseInsensitiveDict()
+            headers[IF_MATCH] = self.objectInfo.etag
+            headers[IF_UNMODIFIED_SINCE] = utils.http_date(self.objectInfo.mtime)
+
+            result = await self.bucket.get_object(self.key, byte_range=(part.start, part.end - 1), headers=headers,
+                                                  params=self.__params)
+            await copyfileobj_and_verify(result, f, part.end - part.start, request_id=result.request_id)
+
+        part.part_crc = result.client_crc
+        logger.debug("down part success, add part info to record, part_number: {0}, start: {1}, end: {2}".format(
+            part.part_number, part.start, part.end))
+
+        self.__finish_part(part)
+
+    def __load_record(self):
+        record = self._get_record()
+        logger.debug("Load record return {0}".format(record))
+
+        if record and not self.__is_record_sane(record):
+            logger.warning("The content of record is invalid, delete the record")
+            self._del_record()
+            record = None
+
+        if record and not os.path.exists(self.filename + record['tmp_suffix']):
+            logger.warning("Temp file: {0} does not exist, delete the record".format(
+                self.filename + record['tmp_suffix']))
+            self._del_record()
+            record = None
+
+        if record and self.__is_remote_changed(record):
+            logger.warning("Object: {0} has been overwritten, delete the record and tmp file".format(self.key))
+            utils.silently_remove(self.filename + record['tmp_suffix'])
+            self._del_record()
+            record = None
+
+        if not record:
+            record = {'op_type': self.__op, 'bucket': self.bucket.bucket_name, 'key': self.key,
+                      'size': self.objectInfo.size, 'mtime': self.objectInfo.mtime, 'etag': self.objectInfo.etag,
+                      'part_size': self.__part_size, 'file_path': self._abspath, 'tmp_suffix': self.__gen_tmp_suffix(),
+                      'parts': []}
+            logger.debug('Add new record, bucket: {0}, key: {1}, part_size: {2}'.format(
+                self.bucket.bucket_name, self.key, self.__part_size))
+            self._put_record(record)
+
+        self.__tmp_file = self.filename + record['tmp_suffix']
+        self.__part_size = record['part_size']
+        self.__finished_parts = list(
+            _PartToProcess(p['part_number'], p['start'], p['end'], p['part_crc']) for p in record['parts'])
+        self.__finished_size = sum(p.size for p in self.__finished_parts)
+        self.__record = record
+
+    def __get_parts_to_download(self):
+        assert self.__record
+
+        all_set = set(_split_to_parts(self.size, self.__part_size))
+        finished_set = set(self.__finished_parts)
+
+        return sorted(list(all_set - finished_set), key=lambda p: p.part_number)
+
+    def __is_record_sane(self, record):
+        try:
+            if record['op_type'] != self.__op:
+                logger.error('op_type invalid, op_type in record:{0} is invalid'.format(record['op_type']))
+                return False
+
+            for key in ('etag', 'tmp_suffix', 'file_path', 'bucket', 'key'):
+                if not isinstance(record[key], str):
+                    logger.error('{0} is not a string: {1}'.format(key, record[key]))
+                    return False
+
+            for key in ('part_size', 'size', 'mtime'):
+                if not isinstance(record[key], int):
+                    logger.error('{0} is not an integer: {1}'.format(key, record[key]))
+                    return False
+
+            if not isinstance(record['parts'], list):
+                logger.error('parts is not a list: {0}'.format(record['parts']))
+                return False
+        except KeyError as e:
+            logger.error('Key not found: {0}'.format(e.args))
+            return False
+
+        return True
+
+    def __is_remote_changed(self, record):
+        return (record['mtime'] != self.objectInfo.mtime or
+                record['size'] != self.objectInfo.size or
+                record['etag'] != self.objectInfo.etag)
+
+    def __finish_part(self, part):
+        self.__finished_parts.append(part)
+        self.__finished_size += part.size
+
+        self.__record['parts'].append({'part_number': part.part_number,
+                                       'start': part.start,
+                                       'end': part.end,
+                                       'part_crc': part.part_crc})
+        self._put_record(self.__record)
+
+    def __gen_tmp_suffix(self):
+        return '.tmp-' + ''.join(random.choice(string.ascii_lowercase) for i in range(12))
+
+
+class _ResumableUploader(_ResumableOperation):
+    """Upload a file by concurrent multipart upload, resuming from the checkpoint record if there is one.
+
+    :param bucket: :class:`Bucket <asyncio_oss.Bucket>` object
+    :param key: object name
+    :param filename: local file name
+    :param size: total size of the file
+    :param store: persistent store of the checkpoint record
+    :param headers: HTTP headers passed to `init_multipart_upload`
+    :param part_size: preferred part size. A resumed upload keeps the part size of its record.
+    :param progress_callback: progress callback, see :ref:`progress_callback`
+    :param num_threads: number of parts uploaded concurrently
+    """
+
+    def __init__(self, bucket, key, filename, size,
+                 store=None,
+                 headers=None,
+                 part_size=None,
+                 progress_callback=None,
+                 num_threads=None,
+                 params=None):
+        super(_ResumableUploader, self).__init__(bucket, key, filename, size,
+                                                 store or ResumableStore(),
+                                                 progress_callback=progress_callback)
+
+        self.__op = 'ResumableUpload'
+        self.__headers = headers
+
+        self.__part_size = defaults.get(part_size, defaults.part_size)
+
+        self.__mtime = os.path.getmtime(filename)
+
+        self.__num_threads = defaults.get(num_threads, multipart_num_tasks)
+
+        self.__upload_id = None
+
+        self.__params = params
+
+        self.__record = None
+        self.__finished_size = 0
+        self.__finished_parts = None
+
+        logger.debug("Init _ResumableUploader, bucket: {0}, key: {1}, part_size: {2}, num_threads: {3}".format(
+            bucket.bucket_name, to_string(key), self.__part_size, self.__num_threads))
+
+    async def upload(self):
+        await self.__load_record()
+
+        parts_to_upload = self.__get_parts_to_upload(self.__finished_parts)
+        parts_to_upload = sorted(parts_to_upload, key=lambda p: p.part_number)
+        logger.debug("Parts need to upload: {0}".format([p.part_number for p in parts_to_upload]))
+
+        q = TaskQueue(lambda q: self.__producer(q, parts_to_upload),
+                      [self.__consumer] * self.__num_threads)
+        await q.run()
+
+        self._report_progress(self.size)
+
+        # parts carry the crc confirmed by upload_part, so complete_multipart_upload checks the crc of the whole
+        # object against their combination
+        headers = _populate_valid_headers(self.__headers, [OSS_REQUEST_PAYER, OSS_OBJECT_ACL])
+        result = await self.bucket.complete_multipart_upload(self.key, self.__upload_id, self.__finished_parts,
+                                                             headers=headers)
+        self._del_record()
+
+        return result
+
+    async def __producer(self, q, parts_to_upload):
+        for part in parts_to_upload:
+            await q.put(part)
+
+    async def __consumer(self, q):
+        while True:
+            part = await q.get()
+            if part is None:
+                break
+
+            await self.__upload_part(part)
+
+    async def __upload_part(self, part):
+        async with file_io.open(self.filename, 'rb') as f:
+            self._report_progress(self.__finished_size)
+
+            await f.seek(part.start, os.SEEK_SET)
+            headers = _populate_valid_headers(self.__headers, [OSS_REQUEST_PAYER, OSS_TRAFFIC_LIMIT])
+            result = await self.bucket.upload_part(self.key, self.__upload_id, part.part_number,
+                                                   utils.SizedFileAdapter(f.raw, part.size), headers=headers)
+
+        logger.debug("Upload part success, add part info to record, part_number: {0}, etag: {1}, size: {2}".format(
+            part.part_number, result.etag, part.size))
+        self.__finish_part(PartInfo(part.part_number, result.etag, size=part.size, part_crc=result.crc))
+
+    def __finish_part(self, part_info):
+        self.__finished_parts.append(part_info)
+        self.__finished_size += part_info.size
+
+        self.__record['parts'].append({'part_number': part_info.part_number,
+                                       'etag': part_info.etag,
+                                       'size': part_info.size,
+                                       'part_crc': part_info.part_crc})
+        self._put_record(self.__record)
+
+    async def __load_record(self):
+        record = self._get_record()
+        logger.debug("Load record return {0}".format(record))
+
+        if record and not self.__is_record_sane(record):
+            logger.warning("The content of record is invalid, delete the record")
+            self._del_record()
+            record = None
+
+        if record and self.__file_changed(record):
+            logger.warning("File: {0} has been changed, delete the record".format(self.filename))
+            self._del_record()
+            record = None
+
+        uploaded_parts = None
+        if record:
+            uploaded_parts = await self.__list_uploaded_parts(record['upload_id'])
+            if uploaded_parts is None:
+                logger.warning('Multipart upload: {0} does not exist, delete the record'.format(record['upload_id']))
+                self._del_record()
+                record = None
+
+        if not record:
+            params = _populate_valid_params(self.__params, [_OssBucket.SEQUENTIAL])
+            part_size = determine_part_size(self.size, self.__part_size)
+            logger.debug("Upload File size: {0}, User-specify part_size: {1}, Calculated part_size: {2}".format(
+                self.size, self.__part_size, part_size))
+            upload_id = (await self.bucket.init_multipart_upload(self.key, self.__headers, params)).upload_id
+
+            record = {'op_type': self.__op, 'upload_id': upload_id, 'file_path': self._abspath, 'size': self.size,
+                      'mtime': self.__mtime, 'bucket': self.bucket.bucket_name, 'key': self.key,
+                      'part_size': part_size, 'parts': []}
+
+            logger.debug('Add new record, bucket: {0}, key: {1}, upload_id: {2}, part_size: {3}'.format(
+                self.bucket.bucket_name, self.key, upload_id, part_size))
+
+            self._put_record(record)
+
+        self.__record = record
+        self.__part_size = self.__record['part_size']
+        self.__upload_id = self.__record['upload_id']
+
+        self.__finished_parts = self.__get_finished_parts(uploaded_parts or [])
+        self.__finished_size = sum(p.size for p in self.__finished_parts)
+
+    def __get_finished_parts(self, uploaded_parts):
+        # a part is finished only when the server has it with the etag confirmed in the record, parts uploaded but
+        # not yet recorded have no known crc and are uploaded again
+        uploaded = dict((p.part_number, p.etag) for p in uploaded_parts)
+
+        parts = []
+        for p in self.__record['parts']:
+            if uploaded.get(p['part_number']) == p['etag']:
+                parts.append(PartInfo(p['part_number'], p['etag'], size=p['size'], part_crc=p['part_crc']))
+
+        self.__record['parts'] = [{'part_number': p.part_number, 'etag': p.etag, 'size': p.size,
+                                   'part_crc': p.part_crc} for p in parts]
+        return parts
+
+    async def __list_uploaded_parts(self, upload_id):
+        valid_headers = _filter_invalid_headers(self.__headers,
+                                                [OSS_SERVER_SIDE_ENCRYPTION, OSS_SERVER_SIDE_DATA_ENCRYPTION])
+        try:
+            return [part async for part in PartIterator(self.bucket, self.key, upload_id, headers=valid_headers)]
+        except exceptions.NoSuchUpload:
+            return None
+
+    def __file_changed(self, record):
+        return record['mtime'] != self.__mtime or record['size'] != self.size
+
+    def __get_parts_to_upload(self, parts_uploaded):
+        all_parts = _split_to_parts(self.size, self.__part_size)
+        if not parts_uploaded:
+            return all_parts
+
+        all_parts_map = dict((p.part_number, p) for p in all_parts)
+
+        for uploaded in parts_uploaded:
+            if uploaded.part_number in all_parts_map:
+                del all_parts_map[uploaded.part_number]
+
+        return all_parts_map.values()
+
+    def __is_record_sane(self, record):
+        try:
+            if record['op_type'] != self.__op:
+                logger.error('op_type invalid, op_type in record:{0} is invalid'.format(record['op_type']))
+                return False
+
+            for key in ('upload_id', 'file_path', 'bucket', 'key'):
+                if not isinstance(record[key], str):
+                    logger.error('Type Error, {0} in record is not a string type: {1}'.format(key, record[key]))
+                    return False
+
+            for key in ('size', 'part_size'):
+                if not isinstance(record[key], int):
+                    logger.error('Type Error, {0} in record is not an integer type: {1}'.format(key, record[key]))
+                    return False
+
+            if not isinstance(record['mtime'], int) and not isinstance(record['mtime'], float):
+                logger.error(
+                    'Type Error, mtime in record is not a float or an integer type: {0}'.format(record['mtime']))
+                return False
+
+            if not isinstance(record['parts'], list):
+                logger.error('Type Error, parts in record is not a list type: {0}'.format(record['parts']))
+                return False
+
+        except KeyError as e:
+            logger.error('Key not found: {0}'.format(e.args))
+            return False
+
+        return True
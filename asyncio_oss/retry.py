@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.retry
+~~~~~~~~~~~~~~~~~
+
+Retry policies of the requests sent by :class:`Service <asyncio_oss.Service>` and :class:`Bucket <asyncio_oss.Bucket>`.
+
+A request failing on a transient error (connection reset, timeout, 5xx, throttling) is sent again after an
+exponentially growing delay with full jitter, so that many clients throttled at the same time do not come back in
+lockstep. A request is only sent again when its body can be replayed from the start.
+
+A POST failing on a network error, e.g. a read timeout, may have been applied by OSS anyway: sending an
+`append_object` or a `complete_multipart_upload` again would then fail on another error, such as
+`PositionNotEqualToLength` or `NoSuchUpload`, hiding the original one. So these are only retried with
+`retry_non_idempotent`.
+
+Usage ::
+
+    >>> bucket = asyncio_oss.Bucket(auth, endpoint, 'bucket-name',
+    >>>                             retry_policy=asyncio_oss.RetryPolicy(max_attempts=5, total_timeout=30))
+"""
+import random
+
+from oss2 import defaults
+
+from . import exceptions
+
+#: HTTP status codes considered transient
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+#: OSS error codes considered transient, whatever the HTTP status
+RETRYABLE_CODES = ('InternalError', 'ServiceUnavailable', 'RequestTimeout', 'SlowDown', 'TooManyRequests')
+
+#: HTTP methods whose requests may not be sent twice, e.g. appends, multipart completions and batch deletes
+NON_IDEMPOTENT_METHODS = ('POST',)
+
+
+class RetryPolicy(object):
+    """Decide whether, and when, a failed request is sent again.
+
+    :param int max_attempts: max number of times a request is sent, 1 disables retries. Defaults to
+        `oss2.defaults.request_retries`.
+    :param float base_delay: delay in seconds before the first retry, it is doubled at each attempt
+    :param float max_delay: upper bound in seconds of a single delay
+    :param float total_timeout: time budget in seconds of all the attempts of a request, counted from the first one;
+        None means no budget. No retry is scheduled if its delay would exceed the budget.
+    :param bool jitter: pick each delay uniformly between 0 and its exponential bound ("full jitter")
+    :param retryable_status: HTTP status codes of the server errors to retry
+    :param retryable_codes: OSS error codes of the server errors to retry
+    :param retryable_exceptions: exception classes to retry, by default the network errors
+        (:class:`RequestError <asyncio_oss.exceptions.RequestError>`)
+    :param bool retry_non_idempotent: also retry the requests of `NON_IDEMPOTENT_METHODS` failing on one of
+        `retryable_exceptions`, which OSS may have applied before the failure
+
+    Subclasses can override :func:`is_retryable` and :func:`backoff` for a finer classification or another schedule.
+    """
+
+    def __init__(self, max_attempts=None, base_delay=0.2, max_delay=10.0, total_timeout=None, jitter=True,
+                 retryable_status=RETRYABLE_STATUS,
+                 retryable_codes=RETRYABLE_CODES,
+                 retryable_exceptions=(exceptions.RequestError,),
+                 retry_non_idempotent=False):
+        self.max_attempts = defaults.get(max_attempts, defaults.request_retries)
+        if self.max_attempts < 1:
+            raise exceptions.ClientError('max_attempts should be at least 1, got {0}'.format(max_attempts))
+
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_timeout = total_timeout
+        self.jitter = jitter
+        self.retryable_status = frozenset(retryable_status)
+        self.retryable_codes = frozenset(retryable_codes)
+        self.retryable_exceptions = tuple(retryable_exceptions)
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def is_retryable(self, error, method=None):
+        """Whether `error` is transient, i.e. the same request, of HTTP `method`, may succeed if sent again."""
+        if isinstance(error, self.retryable_exceptions):
+            return self.retry_non_idempotent or method not in NON_IDEMPOTENT_METHODS
+        if isinstance(error, exceptions.ServerError):
+            return error.status in self.retryable_status or error.code in self.retryable_codes
+        return False
+
+    def backoff(self, attempt):
+        """Delay in seconds before sending the request again after its `attempt`-th failure (starting from 1)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def next_delay(self, attempt, error, elapsed, method=None):
+        """Return the delay before the next attempt, or None if the request should not be sent again.
+
+        :param int attempt: number of attempts done so far
+        :param error: exception raised by the last attempt
+        :param float elapsed: seconds elapsed since the first attempt
+        :param str method: HTTP method of the request
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(error, method):
+            return None
+
+        delay = self.backoff(attempt)
+        if self.total_timeout is not None and elapsed + delay >= self.total_timeout:
+            return None
+        return delay
+
+
+class NoRetryPolicy(RetryPolicy):
+    """Send every request exactly once."""
+
+    def __init__(self):
+        super(NoRetryPolicy, self).__init__(max_attempts=1)
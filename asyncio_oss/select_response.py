@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.select_response
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Asynchronous decoder of the SelectObject responses, replacing `oss2.select_response.SelectResponseAdapter`, which
+iterates the response synchronously.
+
+Unless the output is raw, the body is a sequence of frames:
+
+    Type | Payload Length | Header Checksum | Payload | Payload Checksum
+    <-4->  <----4------->   <-----4------->   <-n-->    <------4------->
+
+all integers being big endian and the first byte of the type its version. The payload starts with the offset, in the
+object, the scan is at:
+
+* data frame: the offset, then the selected data;
+* continuous frame: only the offset, sent while the scan finds nothing to return;
+* end frame: the offset, the scanned size (8 bytes), the HTTP status (4 bytes), then an optional `Code.Message` error;
+* meta end frames, of `create_select_object_meta`: the offset, the scanned size, the status, the splits (4 bytes),
+  the rows (8 bytes), the columns (4 bytes, CSV only), then the error.
+
+The body is read by chunks as large as what was received, and all the complete frames of the buffer are decoded at
+once, their data being copied only once, out of the buffer. The payload checksums are CRC32, computed by `zlib`.
+"""
+import logging
+import struct
+import zlib
+
+from oss2.compat import to_string
+
+from .exceptions import SelectOperationFailed, SelectOperationClientError, InconsistentError
+
+logger = logging.getLogger(__name__)
+
+DATA_FRAME_TYPE = 8388609
+CONTINUOUS_FRAME_TYPE = 8388612
+END_FRAME_TYPE = 8388613
+META_END_FRAME_TYPE = 8388614
+JSON_META_END_FRAME_TYPE = 8388615
+
+_FRAME_TYPES = (DATA_FRAME_TYPE, CONTINUOUS_FRAME_TYPE, END_FRAME_TYPE, META_END_FRAME_TYPE, JSON_META_END_FRAME_TYPE)
+
+_HEADER = struct.Struct('>III')
+_HEADER_SIZE = _HEADER.size
+_CHECKSUM = struct.Struct('>I')
+_OFFSET = struct.Struct('>Q')
+_END = struct.Struct('>QQI')
+_META_END = struct.Struct('>QQIIQ')
+_COLUMNS = struct.Struct('>I')
+
+
+def _parse_error(message):
+    """Split a `Code.Message` error of an end frame."""
+    code = b''
+    index = message.find(b'.')
+    if 0 <= index < len(message) - 1:
+        code, message = message[:index], message[index + 1:]
+    return to_string(code), to_string(message)
+
+
+class SelectResponseAdapter(object):
+    """Decode the frames of a SelectObject response, an :class:`asyncio_oss.http.Response`, as it is received.
+
+    Iterating it with `async for` returns the selected data, chunk by chunk. The progress callback is invoked with the
+    offset the scan is at and `content_length` on each continuous frame, the frames OSS sends while it scans without
+    finding anything, every :attr:`frames_per_progress` data frames and on the end frame.
+
+    :param response: response of the request
+    :param progress_callback: 用户指定的进度回调函数。参考 :ref:`progress_callback`
+    :param content_length: size of the object, passed to the progress callback
+    :param bool enable_crc: whether to check the payload checksums, which OSS only sets when `EnablePayloadCrc` is
+        true in the select parameters
+    """
+
+    # bytes read from the body at a time, the data already received is returned without waiting for more
+    read_size = 64 * 1024
+
+    #: data frames between two calls to the progress callback
+    frames_per_progress = 10
+
+    def __init__(self, response, progress_callback=None, content_length=None, enable_crc=False):
+        self.response = response
+        self.callback = progress_callback
+        self.content_length = content_length
+        self.enable_crc = enable_crc
+        self.output_raw_data = response.headers.get('x-oss-select-output-raw', '') == 'true'
+        self.request_id = response.headers.get('x-oss-request-id', '')
+
+        #: offset, in the object, of the last frame
+        self.file_offset = 0
+        #: bytes of the object scanned, set by the end frame
+        self.scanned_size = 0
+        #: HTTP status of the end frame
+        self.final_status = None
+        self.splits = 0
+        self.rows = 0
+        self.columns = 0
+        self.finished = False
+
+        self.__buffer = bytearray()
+        self.__frames_since_progress = 0
+
+    async def read(self):
+        """Return all the data left."""
+        return b''.join([chunk async for chunk in self])
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.output_raw_data:
+            if not self.finished:
+                data = await self.response.read(self.read_size)
+                if data:
+                    return data
+                self.finished = True
+            raise StopAsyncIteration
+
+        while not self.finished:
+            data = await self.__read_frames()
+            if data:
+                return data
+        raise StopAsyncIteration
+
+    async def __read_frames(self):
+        # read a chunk of the body, then decode all the frames the buffer completes: their data is returned at once
+        chunk = await self.response.read(self.read_size)
+        if not chunk:
+            raise SelectOperationClientError('Unexpected end of the response, {0} bytes left in the buffer'.format(
+                len(self.__buffer)), self.request_id)
+
+        buffer = self.__buffer
+        buffer += chunk
+        data = []
+        pos = 0
+        while len(buffer) - pos >= _HEADER_SIZE:
+            frame_type, payload_length, _ = _HEADER.unpack_from(buffer, pos)
+            end = pos + _HEADER_SIZE + payload_length + 4
+            if len(buffer) < end:
+                break
+
+            self.__decode_frame(frame_type & 0x00FFFFFF, buffer, pos + _HEADER_SIZE, end - 4, data)
+            pos = end
+            if self.finished:
+                break
+        del buffer[:pos]
+
+        if self.finished and buffer:
+            logger.warning("Unexpected {0} bytes after the end frame. RequestId:{1}".format(len(buffer),
+                                                                                            self.request_id))
+        if len(data) == 1:
+            return data[0]
+        return b''.join(data)
+
+    def __decode_frame(self, frame_type, buffer, start, stop, data):
+        if frame_type not in _FRAME_TYPES:
+            logger.warning("Unexpected frame type: {0}. RequestId:{1}. This could be due to the old version of "
+                           "client.".format(frame_type, self.request_id))
+            raise SelectOperationClientError("Unexpected frame type:" + str(frame_type), self.request_id)
+
+        # the view is released before the buffer is trimmed
+        with memoryview(buffer)[start:stop] as payload:
+            self.file_offset = _OFFSET.unpack_from(payload)[0]
+
+            if frame_type == DATA_FRAME_TYPE:
+                if self.enable_crc:
+                    checksum = _CHECKSUM.unpack_from(buffer, stop)[0]
+                    checksum_calc = zlib.crc32(payload)
+                    if checksum != checksum_calc:
+                        logger.warning("Incorrect checksum: Actual {0} and calculated {1}. RequestId:{2}".format(
+                            checksum, checksum_calc, self.request_id))
+                        raise InconsistentError("Incorrect checksum: Actual" + str(checksum) + ". Calculated:" +
+                                                str(checksum_calc), self.request_id)
+                if len(payload) > 8:
+                    data.append(payload[8:].tobytes())
+                self.__frames_since_progress += 1
+                if self.__frames_since_progress >= self.frames_per_progress:
+                    self.__progress()
+            elif frame_type == CONTINUOUS_FRAME_TYPE:
+                self.__progress()
+            elif frame_type == END_FRAME_TYPE:
+                _, self.scanned_size, self.final_status = _END.unpack_from(payload)
+                self.finished = True
+                self.__check_status(payload[_END.size:].tobytes())
+                self.__progress()
+            else:
+                _, self.scanned_size, self.final_status, self.splits, self.rows = _META_END.unpack_from(payload)
+                error_index = _META_END.size
+                if frame_type == META_END_FRAME_TYPE:
+                    self.columns = _COLUMNS.unpack_from(payload, error_index)[0]
+                    error_index += _COLUMNS.size
+                self.finished = True
+                self.__check_status(payload[error_index:].tobytes())
+
+    def __check_status(self, error):
+        if self.final_status // 100 != 2:
+            code, message = _parse_error(error)
+            raise SelectOperationFailed(self.final_status, code, message)
+
+    def __progress(self):
+        self.__frames_since_progress = 0
+        if self.callback is not None:
+            self.callback(self.file_offset, self.content_length)
+
+    async def records(self, delimiter=b'\n'):
+        """Iterate the records of the data, split by `delimiter`, the `OutputRecordDelimiter` of the select
+        parameters, and returned without it.
+
+        The records are complete even when OSS splits them across frames.
+        """
+        rest = b''
+        async for chunk in self:
+            if rest:
+                chunk = rest + chunk
+            records = chunk.split(delimiter)
+            rest = records.pop()
+            for record in records:
+                yield record
+        if rest:
+            yield rest
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.signer
+~~~~~~~~~~~~~~~~~~
+
+Request signing for the `Auth` objects of oss2, with the work which does not change from one request to the next done
+once: the HMAC key of signature version 1, the signing key of signature version 4 derived once per (date, region,
+product), the canonical prefix of each bucket and the date strings, formatted once per second. Requests without query
+parameters, i.e. most GET, PUT and HEAD of objects, skip the canonical query altogether.
+
+The signatures are the same as the ones of oss2. Auth classes without a fast path, and subclasses overriding the
+signing methods, are signed by the auth object itself.
+
+Signing never waits, so the caches are shared by all the tasks of the event loop without locks.
+"""
+import copy
+import hashlib
+import hmac
+import logging
+import time
+from email.utils import formatdate
+from urllib.parse import quote
+
+from oss2.auth import ProviderAuth, ProviderAuthV4, StsAuth, DEFAULT_SIGNED_HEADERS, _param_to_quoted_query
+from oss2.compat import to_bytes
+from oss2.headers import OSS_SECURITY_TOKEN
+from oss2 import utils
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# max number of derived keys of signature version 4 kept by a signer; a key is used for a whole day, the cache is
+# emptied when it grows beyond this size, e.g. when the credentials rotate or a bucket signs for many regions
+_SIGNING_KEYS_MAX_SIZE = 64
+
+# urlquote of the characters of base64 which are not safe in a query
+_QUOTE_BASE64 = str.maketrans({'+': '%2B', '/': '%2F', '=': '%3D'})
+
+
+def make_signer(auth):
+    """Return the signer of the requests of `auth`.
+
+    :param auth: :class:`Auth <oss2.Auth>`, :class:`AuthV4 <oss2.AuthV4>` 或其他认证对象
+    """
+    if isinstance(auth, StsAuth):
+        inner = auth._StsAuth__auth
+        if type(auth)._sign_request is StsAuth._sign_request and type(auth)._sign_url is StsAuth._sign_url:
+            return _make_provider_signer(inner) or Signer(auth)
+        return Signer(auth)
+    return _make_provider_signer(auth) or Signer(auth)
+
+
+def _make_provider_signer(auth):
+    if _overrides_nothing(auth, ProviderAuth):
+        return _SignerV1(auth)
+    if _overrides_nothing(auth, ProviderAuthV4):
+        return _SignerV4(auth)
+    return None
+
+
+def _overrides_nothing(auth, klass):
+    return (isinstance(auth, klass) and type(auth)._sign_request is klass._sign_request
+            and type(auth)._sign_url is klass._sign_url)
+
+
+class Signer(object):
+    """Signs requests by calling the auth object, for the auth types without a fast path.
+
+    :param auth: 认证对象
+    """
+
+    def __init__(self, auth):
+        self.auth = auth
+
+    def sign_request(self, req, bucket_name, key):
+        """把authorization放入req的header里面"""
+        self.auth._sign_request(req, bucket_name, key)
+
+    def sign_url(self, req, bucket_name, key, expires):
+        """返回一个签过名的URL"""
+        return self.auth._sign_url(req, bucket_name, key, expires)
+
+    def sign_urls(self, req, bucket_name, urls_and_keys, expires):
+        """Return the signed URLs of several objects, `req` being the request of each of them but for its url.
+
+        :param req: request shared by the objects, it is not modified
+        :param bucket_name: bucket名称
+        :param urls_and_keys: list of (url, key) of the objects
+        :param int expires: 返回的url将在`expires`秒后过期.
+
+        :return: list of signed URLs, in the order of `urls_and_keys`
+        """
+        urls = []
+        for url, key in urls_and_keys:
+            r = copy.copy(req)
+            r.url = url
+            r.headers = CaseInsensitiveDict(req.headers)
+            r.params = dict(req.params)
+            urls.append(self.auth._sign_url(r, bucket_name, key, expires))
+        return urls
+
+    def sign_rtmp_url(self, url, bucket_name, channel_name, expires, params):
+        return self.auth._sign_rtmp_url(url, bucket_name, channel_name, expires, params)
+
+
+class _SignerV1(Signer):
+    def __init__(self, auth):
+        super(_SignerV1, self).__init__(auth)
+        self.__provider = auth.credentials_provider
+        self.__subresource_keys = auth._subresource_key_set
+        self.__hmac = (None, None)
+
+    def sign_request(self, req, bucket_name, key):
+        credentials = self.__provider.get_credentials()
+        security_token = credentials.get_security_token()
+        if security_token:
+            req.headers[OSS_SECURITY_TOKEN] = security_token
+
+        req.headers['date'] = _http_date()
+
+        string_to_sign = self.__get_headers_string(req.method, req.headers) + \
+            self.__get_resource_string(bucket_name, key, req.params)
+        signature = self.__sign(credentials, string_to_sign)
+        req.headers['authorization'] = 'OSS ' + credentials.get_access_key_id() + ':' + signature
+
+    def sign_url(self, req, bucket_name, key, expires):
+        credentials = self.__provider.get_credentials()
+        security_token = credentials.get_security_token()
+        if security_token:
+            req.params['security-token'] = security_token
+
+        expiration_time = str(int(time.time()) + expires)
+
+        req.headers['date'] = expiration_time
+        string_to_sign = self.__get_headers_string(req.method, req.headers) + \
+            self.__get_resource_string(bucket_name, key, req.params)
+        signature = self.__sign(credentials, string_to_sign)
+
+        req.params['OSSAccessKeyId'] = credentials.get_access_key_id()
+        req.params['Expires'] = expiration_time
+        req.params['Signature'] = signature
+
+        return req.url + '?' + '&'.join(_param_to_quoted_query(k, v) for k, v in req.params.items())
+
+    def sign_urls(self, req, bucket_name, urls_and_keys, expires):
+        credentials = self.__provider.get_credentials()
+        params = dict(req.params)
+        security_token = credentials.get_security_token()
+        if security_token:
+            params['security-token'] = security_token
+
+        expiration_time = str(int(time.time()) + expires)
+
+        headers = CaseInsensitiveDict(req.headers)
+        headers['date'] = expiration_time
+
+        # only the key differs from one URL to the next
+        string_to_sign_head = self.__get_headers_string(req.method, headers) + '/' + bucket_name + '/'
+        subresource_string = self.__get_subresource_string(params)
+        h = self.__get_hmac(credentials.get_access_key_secret())
+
+        params['OSSAccessKeyId'] = credentials.get_access_key_id()
+        params['Expires'] = expiration_time
+        query = '?' + ''.join(_param_to_quoted_query(k, v) + '&' for k, v in params.items())
+
+        urls = []
+        for url, key in urls_and_keys:
+            signed = h.copy()
+            signed.update((string_to_sign_head + key + subresource_string).encode('utf-8'))
+            signature = utils.b64encode_as_string(signed.digest())
+            urls.append(url + query + 'Signature=' + signature.translate(_QUOTE_BASE64))
+        return urls
+
+    def __sign(self, credentials, string_to_sign):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Make signature: string to be signed = {0}'.format(string_to_sign))
+
+        h = self.__get_hmac(credentials.get_access_key_secret()).copy()
+        h.update(string_to_sign.encode('utf-8'))
+        return utils.b64encode_as_string(h.digest())
+
+    @staticmethod
+    def __get_headers_string(method, headers):
+        canon_headers = sorted((k.lower(), v) for k, v in headers.items() if k.lower().startswith('x-oss-'))
+        return '\n'.join([method,
+                          headers.get('content-md5', ''),
+                          headers.get('content-type', ''),
+                          headers.get('x-oss-date', '') or headers.get('date', ''),
+                          ''.join(k + ':' + v + '\n' for k, v in canon_headers)])
+
+    def __get_resource_string(self, bucket_name, key, params):
+        if not bucket_name:
+            return '/' + self.__get_subresource_string(params)
+        return '/' + bucket_name + '/' + key + self.__get_subresource_string(params)
+
+    def __get_subresource_string(self, params):
+        # fast path: no sub-resources in most object requests
+        if not params:
+            return ''
+
+        subresource_params = sorted((k, v) for k, v in params.items() if k in self.__subresource_keys)
+        if not subresource_params:
+            return ''
+        return '?' + '&'.join(k + '=' + v if v else k for k, v in subresource_params)
+
+    def __get_hmac(self, secret):
+        # the key is hashed into the inner and outer pads once, each signature copies them
+        cached_secret, h = self.__hmac
+        if cached_secret != secret:
+            h = hmac.new(to_bytes(secret), digestmod=hashlib.sha1)
+            self.__hmac = (secret, h)
+        return h
+
+
+class _SignerV4(Signer):
+    def __init__(self, auth):
+        super(_SignerV4, self).__init__(auth)
+        self.__provider = auth.credentials_provider
+        self.__uri_prefixes = {}
+        # derived keys by (secret, date, region, product), the secrets live as long as the auth object of the signer
+        self.__signing_keys = {}
+
+    def sign_request(self, req, bucket_name, key):
+        if req.region is None:
+            raise ClientError('The region should not be None in signature version 4.')
+
+        credentials = self.__provider.get_credentials()
+        security_token = credentials.get_security_token()
+        if security_token:
+            req.headers[OSS_SECURITY_TOKEN] = security_token
+
+        date_time = _iso8601_date_time()
+        req.headers['x-oss-date'] = date_time
+        req.headers['x-oss-content-sha256'] = 'UNSIGNED-PAYLOAD'
+
+        scope = _get_scope(date_time, req)
+        canonical_request = req.method + '\n' + self.__get_canonical_uri(bucket_name, key) + \
+            _get_canonical_rest(req.params, req.headers, None)
+        signature = self.__sign(req, credentials, date_time, scope, canonical_request)
+        req.headers['authorization'] = 'OSS4-HMAC-SHA256 Credential={0}, Signature={1}'.format(
+            credentials.get_access_key_id() + '/' + scope, signature)
+
+    def sign_url(self, req, bucket_name, key, expires):
+        credentials = self.__provider.get_credentials()
+        self.__set_url_params(req.params, req, credentials, expires)
+
+        canonical_request = req.method + '\n' + self.__get_canonical_uri(bucket_name, key) + \
+            _get_canonical_rest(req.params, req.headers, [])
+        req.params['x-oss-signature'] = self.__sign(req, credentials, req.params['x-oss-date'],
+                                                    _get_scope(req.params['x-oss-date'], req), canonical_request)
+        return req.url + '?' + '&'.join(_param_to_quoted_query(k, v) for k, v in req.params.items())
+
+    def sign_urls(self, req, bucket_name, urls_and_keys, expires):
+        credentials = self.__provider.get_credentials()
+        params = dict(req.params)
+        date_time = self.__set_url_params(params, req, credentials, expires)
+
+        # only the canonical uri differs from one URL to the next
+        canonical_rest = _get_canonical_rest(params, req.headers, [])
+        string_to_sign_head = 'OSS4-HMAC-SHA256\n' + date_time + '\n' + _get_scope(date_time, req) + '\n'
+        h = hmac.new(self.__get_signing_key(credentials.get_access_key_secret(), date_time[:8], _get_region(req),
+                                            req.product), digestmod=hashlib.sha256)
+        query = '?' + ''.join(_param_to_quoted_query(k, v) + '&' for k, v in params.items())
+
+        urls = []
+        for url, key in urls_and_keys:
+            canonical_request = req.method + '\n' + self.__get_canonical_uri(bucket_name, key) + canonical_rest
+            signed = h.copy()
+            signed.update((string_to_sign_head +
+                           hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()).encode('utf-8'))
+            urls.append(url + query + 'x-oss-signature=' + signed.hexdigest())
+        return urls
+
+    @staticmethod
+    def __set_url_params(params, req, credentials, expires):
+        security_token = credentials.get_security_token()
+        if security_token:
+            params['x-oss-security-token'] = security_token
+
+        date_time = _iso8601_date_time()
+        params['x-oss-date'] = date_time
+        params['x-oss-expires'] = str(expires)
+        params['x-oss-signature-version'] = 'OSS4-HMAC-SHA256'
+        params['x-oss-credential'] = credentials.get_access_key_id() + '/' + _get_scope(date_time, req)
+        return date_time
+
+    def __sign(self, req, credentials, date_time, scope, canonical_request):
+        string_to_sign = '\n'.join(['OSS4-HMAC-SHA256',
+                                    date_time,
+                                    scope,
+                                    hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Make signature: canonical_request = {0}'.format(canonical_request))
+            logger.debug('Make signature: string to be signed = {0}'.format(string_to_sign))
+
+        signing_key = self.__get_signing_key(credentials.get_access_key_secret(), date_time[:8], _get_region(req),
+                                             req.product)
+        return hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def __get_signing_key(self, secret, date, region, product):
+        cache_key = (secret, date, region, product)
+        signing_key = self.__signing_keys.get(cache_key)
+        if signing_key is None:
+            signing_key = _derive_signing_key(secret, date, region, product)
+            if len(self.__signing_keys) >= _SIGNING_KEYS_MAX_SIZE:
+                self.__signing_keys.clear()
+            self.__signing_keys[cache_key] = signing_key
+        return signing_key
+
+    def __get_canonical_uri(self, bucket_name, key):
+        if not bucket_name:
+            return '/'
+
+        prefix = self.__uri_prefixes.get(bucket_name)
+        if prefix is None:
+            prefix = self.__uri_prefixes[bucket_name] = quote('/' + bucket_name + '/', safe='/')
+        return prefix + quote(key, safe='/')
+
+
+def _get_canonical_rest(params, headers, additional_signed_headers):
+    # the canonical request after the uri: query, headers, additional headers and payload hash
+    canon_headers = []
+    for k, v in headers.items():
+        lower_key = k.lower()
+        if (lower_key.startswith('x-oss-') or lower_key in DEFAULT_SIGNED_HEADERS or
+                (additional_signed_headers and lower_key in additional_signed_headers)):
+            canon_headers.append((lower_key, v))
+    canon_headers.sort()
+
+    return '\n' + '\n'.join([_get_canonical_query(params),
+                              ''.join(k + ':' + v + '\n' for k, v in canon_headers),
+                              ';'.join(sorted(additional_signed_headers or [])),
+                              headers.get('x-oss-content-sha256', 'UNSIGNED-PAYLOAD')])
+
+
+def _get_canonical_query(params):
+    # fast path: no query in most object requests
+    if not params:
+        return ''
+
+    encoded_params = sorted((quote(k, safe=''), quote(v, safe='') if v else '') for k, v in params.items())
+    return '&'.join(k + '=' + v if v else k for k, v in encoded_params)
+
+
+def _get_region(req):
+    return req.cloudbox_id or req.region or ''
+
+
+def _get_scope(date_time, req):
+    return date_time[:8] + '/' + _get_region(req) + '/' + req.product + '/aliyun_v4_request'
+
+
+def _derive_signing_key(secret, date, region, product):
+    signing_date = hmac.new(to_bytes('aliyun_v4' + secret), to_bytes(date), hashlib.sha256).digest()
+    signing_region = hmac.new(signing_date, to_bytes(region), hashlib.sha256).digest()
+    signing_product = hmac.new(signing_region, to_bytes(product), hashlib.sha256).digest()
+    return hmac.new(signing_product, b'aliyun_v4_request', hashlib.sha256).digest()
+
+
+_date_cache = [None, None, None]
+
+
+def _refresh_dates():
+    now = int(time.time())
+    if _date_cache[0] != now:
+        _date_cache[:] = [now, formatdate(now, usegmt=True), time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(now))]
+
+
+def _http_date():
+    _refresh_dates()
+    return _date_cache[1]
+
+
+def _iso8601_date_time():
+    _refresh_dates()
+    return _date_cache[2]
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.task_queue
+~~~~~~~~~~~~~~~~~~~~~~
+
+Asynchronous version of `oss2.task_queue.TaskQueue`: one producer and several consumers running as coroutines on the
+same event loop, which is what the concurrent transfer helpers are built on.
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue(object):
+    """Run one producer and several consumers concurrently.
+
+    The producer is called as `await producer(q)` and feeds items with `await q.put(item)`; every consumer is called
+    as `await consumer(q)` and fetches items with `await q.get()` until it gets None. The first exception raised by
+    the producer or by any consumer cancels all the others and is re-raised by :func:`run`.
+
+    :param producer: coroutine function producing the items
+    :param consumers: list of coroutine functions consuming the items, their count is the concurrency
+    :param int maxsize: max number of pending items, 0 means unbounded. Bound it when the producer is much faster
+        than the consumers, e.g. when it streams from an iterator of unknown size.
+    """
+
+    def __init__(self, producer, consumers, maxsize=0):
+        self.__producer = producer
+        self.__consumers = consumers
+        self.__queue = asyncio.Queue(maxsize)
+        self.__exception = None
+
+    async def run(self):
+        tasks = [asyncio.ensure_future(self.__producer_func())]
+        tasks.extend(asyncio.ensure_future(self.__consumer_func(c)) for c in self.__consumers)
+
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            for t in tasks:
+                t.cancel()
+            raise
+
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+        if self.__exception is not None:
+            logger.error('An exception was thrown by producer or consumer: {0!r}'.format(self.__exception))
+            raise self.__exception
+
+    async def put(self, data):
+        assert data is not None
+        await self.__queue.put(data)
+
+    async def get(self):
+        return await self.__queue.get()
+
+    def ok(self):
+        return self.__exception is None
+
+    async def __producer_func(self):
+        try:
+            await self.__producer(self)
+        except Exception as e:
+            self.__on_exception(e)
+            raise
+        for _ in self.__consumers:
+            await self.__queue.put(None)
+
+    async def __consumer_func(self, consumer):
+        try:
+            await consumer(self)
+        except Exception as e:
+            self.__on_exception(e)
+            raise
+
+    def __on_exception(self, e):
+        if self.__exception is None:
+            self.__exception = e
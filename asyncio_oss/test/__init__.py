@@ -11,7 +11,7 @@ BIG_OBJECT_KEY = os.environ.get('OSS_BIG_OBJECT_KEY')
 OBJECT_KEY_PREFIX = os.environ.get('OSS_OBJECT_KEY_PREFIX')
 LOCAL_TEST_FILE = 'test.txt'
 LOCAL_TEST_BIG_FILE = 'test_big.txt'
-OSS_AUTH = oss2.Auth(OSS_KEY, OSS_SECRET)
+OSS_AUTH = oss2.Auth(OSS_KEY or '', OSS_SECRET or '')
 
 if __name__ == '__main__':
     for var in [var for var in locals() if var.isupper()]:
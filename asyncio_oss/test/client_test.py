@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from asyncio_oss.client import Client
+from asyncio_oss.test import (OSS_ENDPOINT, OSS_AUTH, BUCKET_NAME, OBJECT_KEY_PREFIX)
+
+
+class TestAsyncOssClientAPI:
+    @pytest.fixture
+    def api(self):
+        client = Client(OSS_AUTH, OSS_ENDPOINT)
+        yield client
+        asyncio.run(client.close())
+
+    @pytest.mark.asyncio
+    async def test_buckets_share_session(self, api):
+        # Arrange
+        keys = ['{0}client-{1}'.format(OBJECT_KEY_PREFIX, i) for i in range(8)]
+
+        async def put_object(key):
+            async with api.bucket(BUCKET_NAME) as bucket:
+                return await bucket.put_object(key, key)
+
+        # Act
+        results = await asyncio.gather(*[put_object(key) for key in keys])
+
+        # Assert
+        assert all(result.status == 200 for result in results)
+        assert api.bucket(BUCKET_NAME).session is api.session
+        assert not api.session.closed
+
+    @pytest.mark.asyncio
+    async def test_close(self, api):
+        # Arrange
+        service = api.service()
+        await service.list_buckets()
+
+        # Act
+        await service.close()
+        closed_by_view = api.session.closed
+        await api.close()
+
+        # Assert
+        assert not closed_by_view
+        assert api.session.closed
@@ -0,0 +1,203 @@
+import asyncio
+
+import oss2
+import pytest
+
+from asyncio_oss import Bucket, ObjectIteratorV2, StreamingObjectIterator
+from asyncio_oss.crc import crc64
+from asyncio_oss.exceptions import NoSuchKey, RequestError, ServerError
+from asyncio_oss.fake_server import FakeOssServer
+from asyncio_oss.retry import NoRetryPolicy
+
+BUCKET_NAME = 'fake-bucket'
+AUTH = oss2.Auth('fake-key', 'fake-secret')
+
+
+class _FailingPage(object):
+    """Page of `list_objects_v2_stream` failing once `fail_after` of its entries were returned."""
+
+    def __init__(self, page, fail_after):
+        self.page = page
+        self.fail_after = fail_after
+
+    async def __anext__(self):
+        if self.fail_after == 0:
+            raise RequestError(ConnectionResetError())
+        self.fail_after -= 1
+        return await self.page.__anext__()
+
+    def __getattr__(self, name):
+        return getattr(self.page, name)
+
+
+class _FailingBucket(object):
+    """Bucket whose first page listed fails partway."""
+
+    def __init__(self, bucket, fail_after):
+        self.bucket = bucket
+        self.fail_after = fail_after
+        self.calls = []
+
+    async def list_objects_v2_stream(self, **kwargs):
+        self.calls.append((kwargs['continuation_token'], kwargs['start_after']))
+        page = await self.bucket.list_objects_v2_stream(**kwargs)
+        if self.fail_after is not None:
+            page, self.fail_after = _FailingPage(page, self.fail_after), None
+        return page
+
+
+class TestFakeOssServer:
+    @pytest.mark.asyncio
+    async def test_put_get_object(self):
+        async with FakeOssServer() as server:
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Act
+                put_result = await bucket.put_object('dir/a b.txt', b'0123456789', headers={'x-oss-meta-k': 'v'})
+                get_result = await bucket.get_object('dir/a b.txt', byte_range=(2, 5))
+                content = await get_result.read()
+                head_result = await bucket.head_object('dir/a b.txt')
+
+        # Assert
+        assert put_result.crc == crc64(b'0123456789')
+        assert get_result.status == 206
+        assert content == b'2345'
+        assert head_result.content_length == 10
+        assert head_result.etag == put_result.etag
+        assert head_result.headers['x-oss-meta-k'] == 'v'
+        assert server.get_object_data(BUCKET_NAME, 'dir/a b.txt') == b'0123456789'
+
+    @pytest.mark.asyncio
+    async def test_signed_urls(self):
+        async with FakeOssServer() as server:
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket, \
+                    Bucket(oss2.AuthV4('fake-key', 'fake-secret'), server.endpoint, BUCKET_NAME,
+                           region='cn-hangzhou') as bucket_v4:
+                # Arrange
+                put_url = await bucket.sign_url('PUT', 'key', 60)
+                get_url = await bucket_v4.sign_url('GET', 'key', 60)
+                get_urls = await bucket.sign_urls('GET', ['key'], 60)
+
+                # Act
+                put_result = await bucket.put_object_with_url(put_url, b'content')
+                content = await (await bucket_v4.get_object_with_url(get_url)).read()
+                content_v1 = await (await bucket.get_object_with_url(get_urls[0])).read()
+
+        # Assert
+        assert put_result.status == 200
+        assert content == content_v1 == b'content'
+        assert server.requests['put_object'] == 1
+        assert server.requests['get_object'] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_missing_object(self):
+        async with FakeOssServer() as server:
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Act
+                with pytest.raises(NoSuchKey) as e:
+                    await bucket.get_object('missing')
+
+        # Assert
+        assert e.value.status == 404
+        assert len(e.value.request_id) == 24
+
+    @pytest.mark.asyncio
+    async def test_list_objects(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            keys = ['dir{0}/{1}'.format(i % 3, i) for i in range(10)]
+            for key in keys:
+                server.add_object(BUCKET_NAME, key, key.encode())
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Act
+                listed = [obj.key async for obj in ObjectIteratorV2(bucket, max_keys=3)]
+                result = await bucket.list_objects(delimiter='/', max_keys=2)
+                delete_result = await bucket.batch_delete_objects(keys[:4])
+
+        # Assert
+        assert listed == sorted(keys)
+        assert result.prefix_list == ['dir0/', 'dir1/']
+        assert result.is_truncated
+        assert sorted(delete_result.deleted_keys) == sorted(keys[:4])
+        assert len(server.buckets[BUCKET_NAME].objects) == 6
+
+    @pytest.mark.asyncio
+    async def test_iterator_left_early(self):
+        async with FakeOssServer(latency=0.05) as server:
+            # Arrange
+            for i in range(10):
+                server.add_object(BUCKET_NAME, 'key{0}'.format(i), b'content')
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Act
+                async with ObjectIteratorV2(bucket, max_keys=2, prefetch=2) as it:
+                    async for obj in it:
+                        break
+                pending = [t for t in asyncio.all_tasks() if 'fetch_page' in t.get_coro().__qualname__]
+
+        # Assert
+        assert obj.key == 'key0'
+        assert not pending
+
+    @pytest.mark.asyncio
+    async def test_streaming_iterator_resumes_after_error(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            keys = ['key{0}'.format(i) for i in range(7)]
+            for key in keys:
+                server.add_object(BUCKET_NAME, key, b'content')
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                failing = _FailingBucket(bucket, fail_after=2)
+                listed = []
+
+                # Act
+                async with StreamingObjectIterator(failing, max_keys=3) as it:
+                    with pytest.raises(RequestError):
+                        async for obj in it:
+                            listed.append(obj.key)
+                    listed.extend([obj.key async for obj in it])
+
+        # Assert
+        assert listed == keys
+        assert failing.calls[:2] == [('', ''), ('', 'key1')]
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload(self):
+        async with FakeOssServer() as server:
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Arrange
+                upload_id = (await bucket.init_multipart_upload('multipart')).upload_id
+                parts = []
+                for part_number, data in enumerate([b'a' * 1024, b'b' * 512], 1):
+                    result = await bucket.upload_part('multipart', upload_id, part_number, data)
+                    parts.append(oss2.models.PartInfo(part_number, result.etag))
+
+                # Act
+                await bucket.complete_multipart_upload('multipart', upload_id, parts)
+                get_result = await bucket.get_object('multipart')
+                content = await get_result.read()
+
+        # Assert
+        assert content == b'a' * 1024 + b'b' * 512
+        assert get_result.server_crc == crc64(content)
+        assert get_result.etag.endswith('-2')
+
+    @pytest.mark.asyncio
+    async def test_inject_error(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            server.add_object(BUCKET_NAME, 'key', b'content')
+            server.inject_error(503, 'SlowDown', count=1, method='GET')
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, retry_policy=NoRetryPolicy()) as bucket:
+                # Act
+                with pytest.raises(ServerError) as e:
+                    await bucket.get_object('key')
+                content = await (await bucket.get_object('key')).read()
+
+        # Assert
+        assert e.value.status == 503
+        assert e.value.code == 'SlowDown'
+        assert content == b'content'
+        assert server.requests['get_object'] == 2
@@ -0,0 +1,89 @@
+from oss2 import xml_utils
+from oss2.compat import urlquote
+from oss2.models import ListObjectsV2Result, ListObjectVersionsResult
+
+from asyncio_oss import list_parser
+
+
+class _Response(object):
+    status = 200
+    request_id = '5C3D9175B6FC201293AD4890'
+    headers = {}
+
+
+KEYS = ['dir/a b.txt', u'dir/中文.txt', 'line\nfeed', 'percent%25']
+
+OBJECTS_BODY = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n<ListBucketResult><EncodingType>url</EncodingType>'
+    '<IsTruncated>true</IsTruncated><NextContinuationToken>next%2Ftoken</NextContinuationToken>' +
+    ''.join('<Contents><Key>{0}</Key><LastModified>2024-01-02T03:04:05.000Z</LastModified><ETag>"ETAG{1}"</ETag>'
+            '<Type>Normal</Type><Size>{1}</Size><StorageClass>Standard</StorageClass>'
+            '<Owner><ID>1234</ID><DisplayName>name</DisplayName></Owner></Contents>'.format(urlquote(key, ''), i)
+            for i, key in enumerate(KEYS)) +
+    '<CommonPrefixes><Prefix>dir%2Fsub%2F</Prefix></CommonPrefixes></ListBucketResult>').encode('utf-8')
+
+VERSIONS_BODY = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n<ListVersionsResult><Name>bucket</Name><Prefix></Prefix>'
+    '<KeyMarker></KeyMarker><VersionIdMarker></VersionIdMarker><MaxKeys>100</MaxKeys><Delimiter>%2F</Delimiter>'
+    '<EncodingType>url</EncodingType><IsTruncated>false</IsTruncated>'
+    '<DeleteMarker><Key>deleted%20key</Key><VersionId>v1</VersionId><IsLatest>true</IsLatest>'
+    '<LastModified>2019-04-09T07:27:28.000Z</LastModified><Owner><ID>1234</ID><DisplayName>name</DisplayName>'
+    '</Owner></DeleteMarker>'
+    '<Version><Key>a%20b</Key><VersionId>v2</VersionId><IsLatest>false</IsLatest>'
+    '<LastModified>2019-04-09T07:27:28.000Z</LastModified><ETag>"ETAG"</ETag><Type>Normal</Type><Size>5</Size>'
+    '<StorageClass>IA</StorageClass><Owner><ID>1234</ID><DisplayName>name</DisplayName></Owner></Version>'
+    '</ListVersionsResult>').encode('utf-8')
+
+
+def _fields(entry, names):
+    return [(entry.owner.id, entry.owner.display_name) if name == 'owner' else getattr(entry, name) for name in names]
+
+
+class TestListParser:
+    def test_parse_list_objects_v2(self):
+        # Arrange
+        expected = xml_utils.parse_list_objects_v2(ListObjectsV2Result(_Response()), OBJECTS_BODY)
+        names = ['key', 'last_modified', 'etag', 'type', 'size', 'storage_class', 'owner', 'restore_info']
+
+        # Act
+        result = list_parser.parse_list_objects_v2(ListObjectsV2Result(_Response()), OBJECTS_BODY)
+
+        # Assert
+        assert [obj.key for obj in result.object_list] == KEYS
+        assert [_fields(obj, names) for obj in result.object_list] == \
+            [_fields(obj, names) for obj in expected.object_list]
+        assert result.prefix_list == expected.prefix_list == ['dir/sub/']
+        assert result.is_truncated
+        assert result.next_continuation_token == 'next/token'
+
+    def test_parse_list_object_versions(self):
+        # Arrange
+        expected = xml_utils.parse_list_object_versions(ListObjectVersionsResult(_Response()), VERSIONS_BODY)
+        version_names = ['key', 'versionid', 'is_latest', 'last_modified', 'etag', 'type', 'size', 'storage_class',
+                         'owner']
+
+        # Act
+        result = list_parser.parse_list_object_versions(ListObjectVersionsResult(_Response()), VERSIONS_BODY)
+
+        # Assert
+        assert [_fields(v, version_names) for v in result.versions] == \
+            [_fields(v, version_names) for v in expected.versions]
+        assert [_fields(d, ['key', 'versionid', 'is_latest', 'last_modified', 'owner'])
+                for d in result.delete_marker] == \
+            [_fields(d, ['key', 'versionid', 'is_latest', 'last_modified', 'owner']) for d in expected.delete_marker]
+        assert result.delimiter == '/'
+        assert result.max_keys == 100
+
+    def test_assign_field(self):
+        # Arrange
+        result = list_parser.parse_list_objects_v2(ListObjectsV2Result(_Response()), OBJECTS_BODY)
+        obj = result.object_list[0]
+
+        # Act
+        obj.size = 10
+        obj.key = 'renamed'
+
+        # Assert
+        assert obj.size == 10
+        assert obj.key == 'renamed'
+        assert result.object_list[1].key == KEYS[1]
@@ -0,0 +1,127 @@
+import asyncio
+
+import oss2
+import pytest
+
+from asyncio_oss import Bucket, MetricsRegistry, ObjectMetaCache, bulk_delete_objects
+from asyncio_oss.fake_server import FakeOssServer
+from asyncio_oss.retry import NoRetryPolicy
+
+BUCKET_NAME = 'fake-bucket'
+AUTH = oss2.Auth('fake-key', 'fake-secret')
+
+
+class TestObjectMetaCache:
+    @pytest.mark.asyncio
+    async def test_single_flight_and_hits(self):
+        async with FakeOssServer(latency=0.05) as server:
+            # Arrange
+            server.add_object(BUCKET_NAME, 'key', b'content')
+            cache = ObjectMetaCache(ttl=60)
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, meta_cache=cache) as bucket:
+                # Act
+                results = await asyncio.gather(*[bucket.head_object('key') for _ in range(10)])
+                again = await bucket.head_object('key')
+                versioned = await bucket.head_object('key', headers={'If-Match': results[0].etag})
+
+        # Assert
+        assert server.requests['head_object'] == 2
+        assert all(result is results[0] for result in results)
+        assert again is results[0]
+        assert versioned is not results[0]
+        assert (cache.misses, cache.coalesced, cache.hits) == (1, 9, 1)
+        assert cache.hit_rate == pytest.approx(10 / 11)
+
+    @pytest.mark.asyncio
+    async def test_negative_cache_and_invalidation(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            cache = ObjectMetaCache(ttl=60, negative_ttl=60)
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, meta_cache=cache) as bucket:
+                # Act
+                missing = [await bucket.object_exists('key') for _ in range(3)]
+                await bucket.put_object('key', b'content')
+                created = await bucket.object_exists('key')
+                size = (await bucket.get_object_meta('key')).content_length
+                await bucket.update_object_meta('key', {'x-oss-meta-owner': 'me'})
+                meta = (await bucket.head_object('key')).headers['x-oss-meta-owner']
+                await bucket.delete_object('key')
+                deleted = await bucket.object_exists('key')
+
+        # Assert
+        assert missing == [False, False, False]
+        assert cache.negative_hits == 2
+        assert (created, size, meta, deleted) == (True, 7, 'me', False)
+        assert server.requests['get_object_meta'] == 3
+        assert cache.invalidations == 3
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_caps(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            for i in range(5):
+                server.add_object(BUCKET_NAME, 'key{0}'.format(i), b'content')
+            cache = ObjectMetaCache(ttl=0.05, max_entries=3)
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, meta_cache=cache) as bucket:
+                # Act
+                for i in range(5):
+                    await bucket.head_object('key{0}'.format(i))
+                await asyncio.sleep(0.1)
+                await bucket.head_object('key4')
+
+        # Assert
+        assert len(cache) == 3
+        assert cache.evictions == 2
+        assert cache.hits == 0
+        assert server.requests['head_object'] == 6
+
+    @pytest.mark.asyncio
+    async def test_shared_by_buckets_with_different_auth(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            server.add_object(BUCKET_NAME, 'key', b'content')
+            cache = ObjectMetaCache(ttl=60)
+            metrics = MetricsRegistry()
+            other_auth = oss2.Auth('other-key', 'other-secret')
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, meta_cache=cache, metrics=metrics) as bucket, \
+                    Bucket(other_auth, server.endpoint, BUCKET_NAME, meta_cache=cache, metrics=metrics) as other:
+                # Act
+                for b in (bucket, other, bucket, other):
+                    await b.head_object('key')
+                await other.put_object('key', b'new content')
+                size = (await bucket.head_object('key')).content_length
+
+        # Assert
+        assert (cache.misses, cache.hits, cache.invalidations) == (3, 2, 1)
+        assert size == 11
+        assert dict(metrics.requests.values) == {('head_object', '2xx'): 3, ('put_object', '2xx'): 1}
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_invalidates(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            for key in ('k1', 'k2', 'k3'):
+                server.add_object(BUCKET_NAME, key, b'content')
+            cache = ObjectMetaCache(ttl=60)
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, meta_cache=cache,
+                              retry_policy=NoRetryPolicy()) as bucket:
+                before = [await bucket.object_exists(key) for key in ('k1', 'k2', 'k3')]
+
+                # Act
+                server.inject_error(500, 'InternalError', method='POST')
+                failed = await bulk_delete_objects(bucket, ['k1'])
+                await bulk_delete_objects(bucket, ['k2'])
+                await bucket.batch_delete_objects(['k3'])
+                after = [await bucket.object_exists(key) for key in ('k1', 'k2', 'k3')]
+
+        # Assert
+        assert before == [True, True, True]
+        assert not failed.ok
+        assert after == [True, False, False]
+        assert cache.invalidations == 3
+        assert server.requests['get_object_meta'] == 6
@@ -1,14 +1,27 @@
 import asyncio
+import logging
 import os
 
 import pytest
 
-from oss2 import determine_part_size, SizedFileAdapter
+from oss2 import AuthV4, determine_part_size, SizedFileAdapter
 from oss2.models import PartInfo
 
 from asyncio_oss.api import Bucket
-from asyncio_oss.test import (OSS_ENDPOINT, OSS_AUTH, BUCKET_NAME, OBJECT_KEY, OBJECT_KEY_PREFIX, LOCAL_TEST_FILE,
-                              LOCAL_TEST_BIG_FILE, BIG_OBJECT_KEY)
+from asyncio_oss.bulk import bulk_delete_objects
+from asyncio_oss.crc import crc64, calc_obj_crc_from_parts
+from asyncio_oss.exceptions import ClientError
+from asyncio_oss.http import SessionConfig
+from asyncio_oss.iterators import ObjectIterator, ObjectIteratorV2, StreamingObjectIterator
+from asyncio_oss.listing import ParallelObjectIterator
+from asyncio_oss.log import request_logger
+from asyncio_oss.metrics import MetricsRegistry
+from asyncio_oss.resumable import resumable_upload, resumable_download
+from asyncio_oss.retry import RetryPolicy
+from asyncio_oss.tracing import RequestTracer, HistogramSink
+from asyncio_oss.url_cache import SignedUrlCache
+from asyncio_oss.test import (OSS_ENDPOINT, OSS_AUTH, OSS_KEY, OSS_SECRET, BUCKET_NAME, OBJECT_KEY, OBJECT_KEY_PREFIX,
+                              LOCAL_TEST_FILE, LOCAL_TEST_BIG_FILE, BIG_OBJECT_KEY)
 
 
 class TestAsyncOssAPI:
@@ -58,6 +71,106 @@ class TestAsyncOssAPI:
         # Assert
         assert result.status == 200
 
+    @pytest.mark.asyncio
+    async def test_put_object_with_retry_policy(self):
+        # Arrange
+        bucket = Bucket(OSS_AUTH, OSS_ENDPOINT, BUCKET_NAME, retry_policy=RetryPolicy(max_attempts=5, total_timeout=60))
+
+        # Act
+        with open(LOCAL_TEST_FILE, 'rb') as f:
+            result = await bucket.put_object(OBJECT_KEY, f)
+        await bucket.close()
+
+        # Assert
+        assert result.status == 200
+        assert bucket.retry_policy.max_attempts == 5
+
+    @pytest.mark.asyncio
+    async def test_put_object_with_session_config(self):
+        # Arrange
+        config = SessionConfig(pool_size=4, pool_size_per_host=2, keepalive_timeout=5,
+                               recv_buffer_size=256 * 1024, send_buffer_size=256 * 1024)
+        bucket = Bucket(OSS_AUTH, OSS_ENDPOINT, BUCKET_NAME, session_config=config)
+
+        # Act
+        result = await bucket.put_object(OBJECT_KEY, b'content of the object')
+        connector = bucket.session._aio_session.connector
+        await bucket.close()
+
+        # Assert
+        assert result.status == 200
+        assert connector.limit == 4
+        assert connector.limit_per_host == 2
+
+    def test_session_config_force_close_with_keepalive(self):
+        # Act
+        with pytest.raises(ClientError):
+            SessionConfig(force_close=True, keepalive_timeout=5)
+
+        # Assert
+        assert SessionConfig(force_close=True).keepalive_timeout is None
+
+    @pytest.mark.asyncio
+    async def test_put_object_with_tracer(self):
+        # Arrange
+        sink = HistogramSink()
+        config = SessionConfig(tracer=RequestTracer(sink))
+        bucket = Bucket(OSS_AUTH, OSS_ENDPOINT, BUCKET_NAME, session_config=config)
+
+        # Act
+        await bucket.put_object(OBJECT_KEY, b'content of the object')
+        content = await (await bucket.get_object(OBJECT_KEY)).read()
+        await bucket.head_object(OBJECT_KEY)
+        await bucket.close()
+
+        # Assert
+        assert sink.statuses['put_object', 200] == 1
+        assert sink.statuses['get_object', 200] == 1
+        assert sink.statuses['head_object', 200] == 1
+        assert sink.bytes_sent['put_object'] == len(b'content of the object')
+        assert sink.bytes_received['get_object'] == len(content)
+        assert sink.histogram('total').count == 3
+        assert 0 < sink.percentile(0.99, 'ttfb', 'get_object') <= sink.percentile(0.99, 'total', 'get_object')
+
+    @pytest.mark.asyncio
+    async def test_put_object_with_metrics(self):
+        # Arrange
+        metrics = MetricsRegistry()
+        bucket = Bucket(OSS_AUTH, OSS_ENDPOINT, BUCKET_NAME, metrics=metrics)
+
+        # Act
+        await bucket.put_object(OBJECT_KEY, b'content of the object')
+        await (await bucket.get_object(OBJECT_KEY)).read()
+        text = metrics.export_text()
+        await bucket.close()
+
+        # Assert
+        assert metrics.requests.get('put_object', '2xx') == 1
+        assert metrics.sent_bytes.get('put_object') == len(b'content of the object')
+        assert metrics.received_bytes.get('get_object') == len(b'content of the object')
+        assert metrics.request_duration.get('get_object') == 1
+        assert metrics.in_flight.get('get_object') == 0
+        assert 'asyncio_oss_requests_total{operation="put_object",status="2xx"} 1\n' in text
+
+    @pytest.mark.asyncio
+    async def test_put_object_with_auth_v4(self):
+        # Arrange
+        region = OSS_ENDPOINT.split('//')[-1].split('.')[0].replace('oss-', '', 1).replace('-internal', '')
+        bucket = Bucket(AuthV4(OSS_KEY, OSS_SECRET), OSS_ENDPOINT, BUCKET_NAME, region=region)
+
+        # Act
+        put_result = await bucket.put_object(OBJECT_KEY, b'content of the object')
+        head_result = await bucket.head_object(OBJECT_KEY)
+        signed_url = await bucket.sign_url('GET', OBJECT_KEY, 60)
+        get_result = await bucket.get_object_with_url(signed_url)
+        content = await get_result.read()
+        await bucket.close()
+
+        # Assert
+        assert put_result.status == 200
+        assert head_result.content_length == len(b'content of the object')
+        assert content == b'content of the object'
+
     @pytest.mark.asyncio
     async def test_get_object(self, api):
         # Act
@@ -86,6 +199,21 @@ class TestAsyncOssAPI:
         assert result.status == 200
         assert OBJECT_KEY in [obj.key for obj in result.object_list]
 
+    @pytest.mark.asyncio
+    async def test_list_objects_v2_stream(self, api):
+        # Arrange
+        expected = [obj.key async for obj in ObjectIteratorV2(api, prefix=OBJECT_KEY_PREFIX, max_keys=10)]
+
+        # Act
+        async with await api.list_objects_v2_stream(prefix=OBJECT_KEY_PREFIX, max_keys=10) as page:
+            first_page = [obj.key async for obj in page]
+        keys = [obj.key async for obj in StreamingObjectIterator(api, prefix=OBJECT_KEY_PREFIX, max_keys=10)]
+
+        # Assert
+        assert page.status == 200
+        assert first_page == expected[:len(first_page)]
+        assert keys == expected
+
     @pytest.mark.asyncio
     async def test_head_object(self, api):
         # Act
@@ -136,6 +264,62 @@ class TestAsyncOssAPI:
         assert get_obj_result.status == 200
         assert await get_obj_result.read() == signed_object_body
 
+    @pytest.mark.asyncio
+    async def test_sign_urls(self, api):
+        # Arrange
+        keys = ['{0}sign-urls-{1}'.format(OBJECT_KEY_PREFIX, i) for i in range(3)]
+        for key in keys:
+            await api.put_object(key, key)
+
+        # Act
+        urls = await api.sign_urls('GET', keys, 5 * 60)
+        contents = [await (await api.get_object_with_url(url)).read() for url in urls]
+
+        # Assert
+        assert len(urls) == len(keys)
+        assert contents == [key.encode('utf-8') for key in keys]
+
+    @pytest.mark.asyncio
+    async def test_sign_url_with_url_cache(self):
+        # Arrange
+        cache = SignedUrlCache(max_entries=100)
+        bucket = Bucket(OSS_AUTH, OSS_ENDPOINT, BUCKET_NAME, url_cache=cache)
+
+        # Act
+        urls = [await bucket.sign_url('GET', OBJECT_KEY, 5 * 60) for _ in range(3)]
+        other_url = await bucket.sign_url('GET', OBJECT_KEY, 5 * 60, params={'response-content-type': 'text/plain'})
+        get_result = await bucket.get_object_with_url(urls[-1])
+        await bucket.close()
+
+        # Assert
+        assert urls[0] == urls[1] == urls[2] != other_url
+        assert (cache.hits, cache.misses) == (2, 2)
+        assert get_result.status == 200
+
+    @pytest.mark.asyncio
+    async def test_request_log(self, api):
+        # Arrange
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        request_logger.addHandler(handler)
+        request_logger.setLevel(logging.DEBUG)
+
+        # Act
+        try:
+            put_result = await api.put_object(OBJECT_KEY, b'content of the object')
+        finally:
+            request_logger.removeHandler(handler)
+            request_logger.setLevel(logging.NOTSET)
+
+        # Assert
+        fields = records[-1].oss_request
+        assert (fields['method'], fields['bucket'], fields['key']) == ('PUT', BUCKET_NAME, OBJECT_KEY)
+        assert fields['status'] == put_result.status == 200
+        assert fields['request_id'] == put_result.request_id
+        assert fields['error_code'] == ''
+        assert OBJECT_KEY in records[-1].getMessage()
+
     @pytest.mark.asyncio
     async def test_upload_big_file(self, api):
         # get big file total size
@@ -168,6 +352,54 @@ class TestAsyncOssAPI:
         with open(LOCAL_TEST_BIG_FILE, 'rb') as f:
             assert await (await api.get_object(BIG_OBJECT_KEY)).read() == f.read()
 
+    @pytest.mark.asyncio
+    async def test_resumable_upload(self, api):
+        # Act
+        total_size = os.path.getsize(LOCAL_TEST_BIG_FILE)
+        part_size = max(total_size // 4, 100 * 1024)
+        result = await resumable_upload(api, BIG_OBJECT_KEY, LOCAL_TEST_BIG_FILE,
+                                        multipart_threshold=part_size, part_size=part_size, num_threads=4)
+
+        # Assert
+        assert result.status == 200
+        with open(LOCAL_TEST_BIG_FILE, 'rb') as f:
+            assert await (await api.get_object(BIG_OBJECT_KEY)).read() == f.read()
+
+    @pytest.mark.asyncio
+    async def test_resumable_download(self, api):
+        # Arrange
+        filename = LOCAL_TEST_BIG_FILE + '.download'
+        total_size = (await api.head_object(BIG_OBJECT_KEY)).content_length
+        part_size = max(total_size // 4, 100 * 1024)
+
+        # Act
+        await resumable_download(api, BIG_OBJECT_KEY, filename,
+                                 multiget_threshold=part_size, part_size=part_size, num_threads=4)
+
+        # Assert
+        with open(LOCAL_TEST_BIG_FILE, 'rb') as src, open(filename, 'rb') as dst:
+            assert src.read() == dst.read()
+        os.remove(filename)
+
+    @pytest.mark.asyncio
+    async def test_multipart_upload_crc_combine(self, api):
+        # Arrange
+        with open(LOCAL_TEST_BIG_FILE, 'rb') as f:
+            content = f.read()
+        part_size = max(len(content) // 4, 100 * 1024)
+        upload_id = (await api.init_multipart_upload(BIG_OBJECT_KEY)).upload_id
+
+        # Act
+        parts = []
+        for part_number, offset in enumerate(range(0, len(content), part_size), 1):
+            body = content[offset:offset + part_size]
+            result = await api.upload_part(BIG_OBJECT_KEY, upload_id, part_number, body)
+            parts.append(PartInfo(part_number, result.etag, size=len(body), part_crc=result.crc))
+        result = await api.complete_multipart_upload(BIG_OBJECT_KEY, upload_id, parts)
+
+        # Assert
+        assert result.crc == calc_obj_crc_from_parts(parts) == crc64(content)
+
     @pytest.mark.asyncio
     async def test_get_object_to_file(self, api):
         result = await api.get_object_to_file(OBJECT_KEY, LOCAL_TEST_FILE)
@@ -203,3 +435,53 @@ class TestAsyncOssAPI:
         result = await api.list_objects(prefix=OBJECT_KEY_PREFIX)
         assert result.status == 200
         assert OBJECT_KEY not in [obj.key for obj in result.object_list]
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_objects(self, api):
+        # Arrange
+        prefix = OBJECT_KEY_PREFIX + 'bulk-delete/'
+        keys = ['{0}{1}'.format(prefix, i) for i in range(25)]
+        await asyncio.gather(*[api.put_object(key, key) for key in keys])
+
+        # Act
+        result = await bulk_delete_objects(api, ObjectIterator(api, prefix=prefix), num_tasks=2, batch_size=10)
+
+        # Assert
+        assert result.ok
+        assert result.deleted_count == 25
+        assert result.request_count == 3
+        result = await api.list_objects(prefix=prefix)
+        assert result.object_list == []
+
+    @pytest.mark.asyncio
+    async def test_object_iterator_prefetch(self, api):
+        # Arrange
+        prefix = OBJECT_KEY_PREFIX + 'iterator-prefetch/'
+        keys = ['{0}{1:02d}'.format(prefix, i) for i in range(25)]
+        await asyncio.gather(*[api.put_object(key, key) for key in keys])
+
+        # Act
+        prefetched = [obj.key async for obj in ObjectIterator(api, prefix=prefix, max_keys=5, prefetch=3)]
+        fetched = [obj.key async for obj in ObjectIteratorV2(api, prefix=prefix, max_keys=5, prefetch=0)]
+        await bulk_delete_objects(api, keys)
+
+        # Assert
+        assert prefetched == keys
+        assert fetched == keys
+
+    @pytest.mark.asyncio
+    async def test_parallel_object_iterator(self, api):
+        # Arrange
+        prefix = OBJECT_KEY_PREFIX + 'parallel-list/'
+        keys = sorted(['{0}{1}/{2:02d}'.format(prefix, d, i) for d in 'abc' for i in range(10)] + [prefix + 'a.txt'])
+        await asyncio.gather(*[api.put_object(key, key) for key in keys])
+
+        # Act
+        ordered = [obj.key async for obj in ParallelObjectIterator(api, prefix=prefix, max_keys=4, num_tasks=2)]
+        unordered = [obj.key async for obj in ParallelObjectIterator(api, prefix=prefix, ordered=False,
+                                                                     split_points=keys[::7])]
+        await bulk_delete_objects(api, keys)
+
+        # Assert
+        assert ordered == keys
+        assert sorted(unordered) == keys
@@ -0,0 +1,58 @@
+import oss2
+import pytest
+
+from asyncio_oss import Bucket, ParallelSelectIterator
+from asyncio_oss.fake_server import FakeOssServer
+
+BUCKET_NAME = 'fake-bucket'
+AUTH = oss2.Auth('fake-key', 'fake-secret')
+
+ROWS = ['{0},host-{1},{2}'.format(i, i % 7, i * 10) for i in range(2000)]
+CSV_DATA = ('id,host,size\n' + '\n'.join(ROWS) + '\n').encode()
+
+
+class TestParallelSelect:
+    @pytest.mark.asyncio
+    async def test_select_object(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            server.select_split_size = 1024
+            server.add_object(BUCKET_NAME, 'data.csv', CSV_DATA)
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Act
+                meta = await bucket.create_select_object_meta('data.csv')
+                result = await bucket.select_object('data.csv', 'select * from ossobject',
+                                                    select_params={'CsvHeaderInfo': 'Use', 'EnablePayloadCrc': True})
+                records = [record async for record in result.records()]
+
+        # Assert
+        assert meta.rows == len(ROWS) + 1
+        assert meta.splits > 16
+        assert records == [row.encode() for row in ROWS]
+
+    @pytest.mark.asyncio
+    async def test_parallel_select(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            server.select_split_size = 1024
+            server.add_object(BUCKET_NAME, 'data.csv', CSV_DATA)
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Act
+                ordered = ParallelSelectIterator(bucket, 'data.csv', 'select * from ossobject',
+                                                 select_params={'CsvHeaderInfo': 'Use', 'OutputHeader': True},
+                                                 num_tasks=4, queue_size=1)
+                records = [record async for record in ordered.records()]
+                counts = [int(record) async for record in ParallelSelectIterator(
+                    bucket, 'data.csv', 'select count(*) from ossobject', select_params={'CsvHeaderInfo': 'Use'},
+                    ordered=False, num_tasks=3).records()]
+
+        # Assert
+        assert records == [b'id,host,size'] + [row.encode() for row in ROWS]
+        assert len(ordered.ranges) == 16
+        assert ordered.ranges[0][0] == 0 and ordered.ranges[-1][1] == ordered.splits - 1
+        assert sum(counts) == len(ROWS)
+        assert len(counts) == 12
+        assert server.requests['select_object'] == 16 + 12
+        assert server.requests['create_select_object_meta'] == 2
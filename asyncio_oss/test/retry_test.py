@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+
+from asyncio_oss import RetryPolicy
+from asyncio_oss.exceptions import RequestError, ServerError
+
+
+class TestRetryPolicy:
+    @pytest.mark.asyncio
+    async def test_non_idempotent_requests(self):
+        # Arrange
+        timeout = RequestError(asyncio.TimeoutError())
+        throttled = ServerError(503, {}, b'', {'Code': 'SlowDown'})
+        policy = RetryPolicy(max_attempts=3, jitter=False)
+        opted_in = RetryPolicy(max_attempts=3, jitter=False, retry_non_idempotent=True)
+
+        # Act
+        delays = [policy.next_delay(1, timeout, 0, 'PUT'), policy.next_delay(1, timeout, 0, 'POST'),
+                  policy.next_delay(1, throttled, 0, 'POST'), opted_in.next_delay(1, timeout, 0, 'POST')]
+
+        # Assert
+        assert delays == [0.2, None, 0.2, 0.2]
@@ -0,0 +1,95 @@
+import struct
+import zlib
+
+import pytest
+
+from asyncio_oss.exceptions import InconsistentError, SelectOperationFailed
+from asyncio_oss.select_response import (SelectResponseAdapter, DATA_FRAME_TYPE, CONTINUOUS_FRAME_TYPE,
+                                         END_FRAME_TYPE, META_END_FRAME_TYPE)
+
+
+def _frame(frame_type, payload):
+    return struct.pack('>III', frame_type | 0x01000000, len(payload), 0) + payload + \
+        struct.pack('>I', zlib.crc32(payload))
+
+
+def _data_frame(offset, data):
+    return _frame(DATA_FRAME_TYPE, struct.pack('>Q', offset) + data)
+
+
+def _end_frame(offset, status=206, error=b''):
+    return _frame(END_FRAME_TYPE, struct.pack('>QQI', offset, offset, status) + error)
+
+
+class _Response(object):
+    """Body returned by chunks of at most `chunk_size` bytes."""
+
+    def __init__(self, body, chunk_size, headers=None):
+        self.headers = headers or {'x-oss-request-id': '5C3D9175B6FC201293AD4890'}
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def read(self, amt=None):
+        chunk, self.body = self.body[:self.chunk_size], self.body[self.chunk_size:]
+        return chunk
+
+
+class TestSelectResponseAdapter:
+    @pytest.mark.asyncio
+    async def test_records_across_frames(self):
+        # Arrange
+        body = _data_frame(10, b'a,1\nb,') + _frame(CONTINUOUS_FRAME_TYPE, struct.pack('>Q', 20)) + \
+            _data_frame(30, b'2\nc,3\n') + _end_frame(40)
+        progress = []
+
+        # Act
+        adapter = SelectResponseAdapter(_Response(body, 7), lambda offset, total: progress.append(offset), 40, True)
+        records = [record async for record in adapter.records()]
+
+        # Assert
+        assert records == [b'a,1', b'b,2', b'c,3']
+        assert progress == [20, 40]
+        assert adapter.finished
+        assert adapter.final_status == 206
+
+    @pytest.mark.asyncio
+    async def test_meta_end_frame(self):
+        # Arrange
+        body = _frame(META_END_FRAME_TYPE, struct.pack('>QQIIQI', 100, 100, 200, 3, 1000, 5))
+
+        # Act
+        adapter = SelectResponseAdapter(_Response(body, 1024))
+        content = await adapter.read()
+
+        # Assert
+        assert content == b''
+        assert (adapter.splits, adapter.rows, adapter.columns) == (3, 1000, 5)
+
+    @pytest.mark.asyncio
+    async def test_errors(self):
+        # Arrange
+        corrupted = bytearray(_data_frame(0, b'data'))
+        corrupted[-1] ^= 0xff
+        failed = _end_frame(0, 400, b'InvalidCsvLine.Invalid csv line')
+
+        # Act
+        with pytest.raises(InconsistentError):
+            await SelectResponseAdapter(_Response(bytes(corrupted), 1024), enable_crc=True).read()
+        with pytest.raises(SelectOperationFailed) as e:
+            await SelectResponseAdapter(_Response(failed, 1024)).read()
+
+        # Assert
+        assert e.value.status == 400
+        assert e.value.code == 'InvalidCsvLine'
+        assert e.value.message == 'Invalid csv line'
+
+    @pytest.mark.asyncio
+    async def test_raw_output(self):
+        # Arrange
+        response = _Response(b'a,1\nb,2\n', 3, {'x-oss-select-output-raw': 'true'})
+
+        # Act
+        records = [record async for record in SelectResponseAdapter(response).records()]
+
+        # Assert
+        assert records == [b'a,1', b'b,2']
@@ -0,0 +1,72 @@
+import time
+
+import oss2
+import pytest
+
+from asyncio_oss import Bucket, RetryPolicy, timeout_scope, remaining_time
+from asyncio_oss.exceptions import RequestError, ServerError
+from asyncio_oss.fake_server import FakeOssServer
+
+BUCKET_NAME = 'fake-bucket'
+AUTH = oss2.Auth('fake-key', 'fake-secret')
+
+
+class TestTimeouts:
+    @pytest.mark.asyncio
+    async def test_sock_read_scope(self):
+        async with FakeOssServer(latency=0.3) as server:
+            # Arrange
+            server.add_object(BUCKET_NAME, 'key', b'content')
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, connect_timeout=5,
+                              retry_policy=RetryPolicy(max_attempts=1)) as bucket:
+                # Act
+                with pytest.raises(RequestError):
+                    with timeout_scope(sock_read=0.05):
+                        await bucket.get_object('key')
+                await bucket.select_object('key', 'select * from ossobject')
+                content = await (await bucket.get_object('key')).read()
+
+        # Assert
+        assert content == b'content'
+        assert bucket.timeout == 5
+
+    @pytest.mark.asyncio
+    async def test_deadline_stops_retries(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            server.inject_error(503, 'SlowDown', count=100)
+            policy = RetryPolicy(max_attempts=100, base_delay=0.1, max_delay=0.1, jitter=False)
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, retry_policy=policy) as bucket:
+                # Act
+                start = time.monotonic()
+                with pytest.raises(ServerError):
+                    with timeout_scope(total=0.35):
+                        await bucket.put_object('key', b'content')
+                elapsed = time.monotonic() - start
+
+        # Assert
+        assert elapsed < 0.35
+        assert server.requests['put_object'] == 4
+
+    @pytest.mark.asyncio
+    async def test_nested_scopes(self):
+        async with FakeOssServer() as server:
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME) as bucket:
+                # Act
+                with timeout_scope(total=10):
+                    outer = remaining_time()
+                    with timeout_scope(deadline=time.monotonic() - 1):
+                        with timeout_scope(total=60):
+                            inner = remaining_time()
+                            with pytest.raises(RequestError):
+                                await bucket.put_object('key', b'content')
+                    after = remaining_time()
+
+        # Assert
+        assert 9 < outer <= 10
+        assert inner < 0
+        assert 9 < after <= 10
+        assert remaining_time() is None
+        assert server.requests['put_object'] == 0
@@ -0,0 +1,46 @@
+import asyncio
+
+import oss2
+import pytest
+
+from asyncio_oss import Bucket, MetricsRegistry, bulk_delete_objects
+from asyncio_oss.fake_server import FakeOssServer
+
+BUCKET_NAME = 'fake-bucket'
+AUTH = oss2.Auth('fake-key', 'fake-secret')
+
+
+class TestOperationName:
+    @pytest.mark.asyncio
+    async def test_requests_sent_from_tasks(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            server.add_object(BUCKET_NAME, 'key', b'content')
+            metrics = MetricsRegistry()
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, metrics=metrics) as bucket:
+                # Act
+                await asyncio.ensure_future(bucket.head_object('key'))
+                await asyncio.ensure_future(bucket._do('HEAD', BUCKET_NAME, 'key'))
+                await asyncio.ensure_future(bucket._do('HEAD', BUCKET_NAME, 'key', operation='probe'))
+
+        # Assert
+        assert dict(metrics.requests.values) == {('head_object', '2xx'): 1, ('HEAD', '2xx'): 1, ('probe', '2xx'): 1}
+
+    @pytest.mark.asyncio
+    async def test_batch_deletes(self):
+        async with FakeOssServer() as server:
+            # Arrange
+            for key in ('k1', 'k2', 'k3'):
+                server.add_object(BUCKET_NAME, key, b'content')
+            metrics = MetricsRegistry()
+
+            async with Bucket(AUTH, server.endpoint, BUCKET_NAME, metrics=metrics) as bucket:
+                # Act
+                await bucket.batch_delete_objects(['k1'])
+                result = await bulk_delete_objects(bucket, ['k2', 'k3'], batch_size=1)
+
+        # Assert
+        assert result.deleted_count == 2
+        assert dict(metrics.requests.values) == {('batch_delete_objects', '2xx'): 1,
+                                                 ('bulk_delete_objects', '2xx'): 2}
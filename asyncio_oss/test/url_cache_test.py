@@ -0,0 +1,30 @@
+import oss2
+import pytest
+
+from asyncio_oss import Client, SignedUrlCache
+
+ENDPOINT = 'http://oss-cn-hangzhou.aliyuncs.com'
+BUCKET_NAME = 'fake-bucket'
+
+
+class TestSignedUrlCache:
+    @pytest.mark.asyncio
+    async def test_shared_by_buckets(self):
+        # Arrange
+        cache = SignedUrlCache()
+        client = Client(oss2.Auth('fake-key', 'fake-secret'), ENDPOINT)
+        other_auth = oss2.Auth('other-key', 'other-secret')
+
+        # Act
+        async with client:
+            urls = [await client.bucket(BUCKET_NAME, url_cache=cache).sign_url('GET', 'key', 3600) for _ in range(4)]
+            other_url = await client.bucket(BUCKET_NAME, url_cache=cache, is_cname=True).sign_url('GET', 'key', 3600)
+            bucket = client.bucket(BUCKET_NAME, url_cache=cache)
+            bucket.auth = other_auth
+            other_auth_url = await bucket.sign_url('GET', 'key', 3600)
+
+        # Assert
+        assert len(set(urls)) == 1
+        assert other_url != urls[0]
+        assert 'other-key' in other_auth_url
+        assert (cache.hits, cache.misses, len(cache)) == (3, 3, 3)
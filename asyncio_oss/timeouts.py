@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.timeouts
+~~~~~~~~~~~~~~~~~~~~
+
+Timeouts of the requests sent by :class:`Service <asyncio_oss.Service>` and :class:`Bucket <asyncio_oss.Bucket>`.
+
+By default each request of a bucket is bounded by its `connect_timeout`, as with oss2: it is the max time to connect
+and the max time between two reads of the response, however long the transfer of the body. :func:`timeout_scope`
+overrides them for the calls made inside it, in the current task and the tasks it starts, without touching the
+bucket shared by the other callers, and bounds all of these calls by a deadline ::
+
+    >>> with asyncio_oss.timeout_scope(total=2.0, sock_read=0.5):
+    >>>     result = await bucket.get_object('small.txt')
+    >>>     content = await result.read()
+
+    >>> with asyncio_oss.timeout_scope(total=600):
+    >>>     await asyncio_oss.resumable_upload(bucket, 'big.bin', 'big.bin', num_threads=8)
+
+The deadline covers the retries and the waits between them, which stop once it is reached, and the requests of the
+multipart and resumable operations: each attempt gets what is left of the budget as its total timeout, body
+included, and an attempt due after the deadline fails with a
+:class:`RequestError <asyncio_oss.exceptions.RequestError>` without being sent.
+"""
+import asyncio
+import contextvars
+import time
+
+import aiohttp
+
+from . import exceptions
+
+_current = contextvars.ContextVar('asyncio_oss_timeout_scope', default=None)
+
+
+class _Scope(object):
+    __slots__ = ('connect', 'sock_read', 'deadline')
+
+    def __init__(self, connect, sock_read, deadline):
+        self.connect = connect
+        self.sock_read = sock_read
+        self.deadline = deadline
+
+
+class timeout_scope(object):
+    """Context manager bounding the requests sent inside it, see :mod:`asyncio_oss.timeouts`.
+
+    The scopes nest: an inner scope replaces the `connect` and `sock_read` timeouts it sets, and its deadline can
+    only come before the one of the outer scope.
+
+    :param float total: time budget in seconds of all the requests of the scope, counted from its start
+    :param float connect: max seconds to establish a connection, instead of the `connect_timeout` of the bucket
+    :param float sock_read: max seconds between two reads of a response, instead of the `connect_timeout` of the
+        bucket
+    :param float deadline: time, as given by `time.monotonic()`, at which the requests of the scope must be done,
+        e.g. the deadline of the request being served
+    """
+
+    def __init__(self, total=None, connect=None, sock_read=None, deadline=None):
+        self.total = total
+        self.connect = connect
+        self.sock_read = sock_read
+        self.deadline = deadline
+        self.__tokens = []
+
+    def __enter__(self):
+        outer = _current.get()
+        deadline = self.deadline
+        if self.total is not None:
+            end = time.monotonic() + self.total
+            deadline = end if deadline is None else min(deadline, end)
+        if outer is not None:
+            if outer.deadline is not None:
+                deadline = outer.deadline if deadline is None else min(deadline, outer.deadline)
+            scope = _Scope(_first(self.connect, outer.connect), _first(self.sock_read, outer.sock_read), deadline)
+        else:
+            scope = _Scope(self.connect, self.sock_read, deadline)
+        self.__tokens.append(_current.set(scope))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current.reset(self.__tokens.pop())
+
+
+def _first(value, default):
+    return default if value is None else value
+
+
+def remaining_time():
+    """Seconds left before the deadline of the current scope, None if there is none."""
+    scope = _current.get()
+    if scope is None or scope.deadline is None:
+        return None
+    return scope.deadline - time.monotonic()
+
+
+def make_client_timeout(timeout):
+    """Return the `aiohttp.ClientTimeout` of a request sent now by a bucket whose `connect_timeout` is `timeout`.
+
+    :raises: :class:`RequestError <asyncio_oss.exceptions.RequestError>` if the deadline of the scope is reached
+    """
+    scope = _current.get()
+    if scope is None:
+        return _default_client_timeout(timeout)
+
+    total = None
+    if scope.deadline is not None:
+        total = scope.deadline - time.monotonic()
+        if total <= 0:
+            raise exceptions.RequestError(asyncio.TimeoutError('Deadline of the timeout scope exceeded'))
+    return aiohttp.ClientTimeout(total=total, sock_connect=_first(scope.connect, timeout),
+                                 sock_read=_first(scope.sock_read, timeout))
+
+
+_defaults = {}
+
+
+def _default_client_timeout(timeout):
+    client_timeout = _defaults.get(timeout)
+    if client_timeout is None:
+        client_timeout = _defaults[timeout] = aiohttp.ClientTimeout(total=None, sock_connect=timeout,
+                                                                    sock_read=timeout)
+    return client_timeout
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.tracing
+~~~~~~~~~~~~~~~~~~~
+
+Timing of each request sent by :class:`Service <asyncio_oss.Service>` and :class:`Bucket <asyncio_oss.Bucket>`,
+phase by phase, collected with the `TraceConfig` hooks of aiohttp: wait for a connection of the pool, DNS
+resolution, connection (TCP and TLS handshakes), upload of the body, wait for the response headers and download of
+the body.
+
+A :class:`RequestTracer`, given to the session as `SessionConfig(tracer=...)`, hands a :class:`RequestEvent` to its
+sinks for every attempt of every request, e.g. to a :class:`HistogramSink` ::
+
+    >>> sink = asyncio_oss.HistogramSink()
+    >>> config = asyncio_oss.SessionConfig(tracer=asyncio_oss.RequestTracer(sink))
+    >>> bucket = asyncio_oss.Bucket(auth, endpoint, 'bucket-name', session_config=config)
+    >>> ...
+    >>> sink.percentile(0.99, 'queue'), sink.percentile(0.99, 'ttfb')
+
+A p99 growing with the `queue` phase means the pool is too small for the concurrency, one growing with `ttfb` means
+the server (or the network) is slow to answer.
+
+The sessions created without a tracer don't install any hook.
+"""
+import bisect
+import collections
+import logging
+import math
+import sys
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_PACKAGE = __name__.partition('.')[0]
+
+#: phases of :attr:`RequestEvent.durations`, in the order they happen
+PHASES = ('queue', 'dns', 'connect', 'send', 'ttfb', 'body', 'total')
+
+
+class RequestEvent(object):
+    """Timing of one attempt of a request.
+
+    :param str operation: name of the method of `Service` or `Bucket` that sent the request, e.g. `'put_object'`
+    :param str method: HTTP method
+    :param str bucket: bucket name, empty for the requests of `Service` and the ones sent to signed URLs
+    :param str key: object key, empty for the requests of buckets
+    :param int attempt: number of the attempt, from 1
+
+    Once the request is done, `status` and `request_id` are the ones of the response, `error` is the OSS error code or
+    the class of the exception raised (empty if the request succeeded), `bytes_sent` and `bytes_received` count the
+    bytes of the bodies, `connection_reused` tells whether a connection of the pool was reused, and `durations` maps
+    the phases that happened to their length in seconds:
+
+    - `queue`: wait for a free connection of the pool
+    - `dns`: DNS resolution, when not cached
+    - `connect`: connection to the server, DNS, TCP and TLS handshakes included
+    - `send`: upload of the request body
+    - `ttfb`: from the request fully sent to the response headers received
+    - `body`: download of the response body, up to the end of the read of the last byte
+    - `total`: the whole attempt
+
+    An attempt is done when its response body is read to the end; the events of responses which are not read to the
+    end are not emitted.
+    """
+
+    __slots__ = ('operation', 'method', 'bucket', 'key', 'attempt', 'status', 'request_id', 'error', 'bytes_sent',
+                 'bytes_received', 'connection_reused', 'durations', '_tracer', '_start', '_queue_start', '_queue_end',
+                 '_dns_start', '_dns_end', '_connect_start', '_connect_end', '_headers_sent', '_last_chunk_sent',
+                 '_headers_received', '_body_end')
+
+    def __init__(self, operation, method, bucket, key, attempt, tracer=None):
+        self.operation = operation
+        self.method = method
+        self.bucket = bucket or ''
+        self.key = key or ''
+        self.attempt = attempt
+        self.status = None
+        self.request_id = ''
+        self.error = ''
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connection_reused = None
+        self.durations = {}
+
+        self._tracer = tracer
+        self._start = time.perf_counter()
+        self._queue_start = self._queue_end = None
+        self._dns_start = self._dns_end = None
+        self._connect_start = self._connect_end = None
+        self._headers_sent = self._last_chunk_sent = None
+        self._headers_received = self._body_end = None
+
+    @property
+    def done(self):
+        return 'total' in self.durations
+
+    def set_response(self, status, request_id):
+        """Record the status and request id of the response, the headers of which were just received."""
+        self.status = status
+        self.request_id = request_id
+        if self._headers_received is None:
+            self._headers_received = time.perf_counter()
+
+    def body_read(self, nbytes, eof):
+        """Count `nbytes` bytes of the response body, and finish the event of a successful request with the last
+        ones. The failed requests are finished by :func:`finish`, with their error code."""
+        self.bytes_received += nbytes
+        if eof and self._body_end is None:
+            self._body_end = time.perf_counter()
+            if self.status is not None and self.status // 100 == 2:
+                self.finish()
+
+    def finish(self, error=''):
+        """Compute `durations` and hand the event to the sinks of the tracer, only the first call does anything."""
+        if self.done:
+            return
+
+        end = time.perf_counter()
+        self.error = error
+        durations = self.durations
+        if self._queue_end is not None:
+            durations['queue'] = self._queue_end - self._queue_start
+        if self._dns_end is not None:
+            durations['dns'] = self._dns_end - self._dns_start
+        if self._connect_end is not None:
+            durations['connect'] = self._connect_end - self._connect_start
+
+        sent = self._headers_sent
+        if self._last_chunk_sent is not None and sent is not None:
+            durations['send'] = self._last_chunk_sent - sent
+            sent = self._last_chunk_sent
+        if self._headers_received is not None:
+            if sent is not None:
+                durations['ttfb'] = max(self._headers_received - sent, 0.0)
+            if self._body_end is not None:
+                durations['body'] = self._body_end - self._headers_received
+        durations['total'] = end - self._start
+
+        if self._tracer is not None:
+            self._tracer.emit(self)
+
+    def __repr__(self):
+        return '<RequestEvent {0} {1} /{2}/{3} attempt: {4}, status: {5}, req_id: {6}, durations: {7}>'.format(
+            self.operation, self.method, self.bucket, self.key, self.attempt, self.status, self.request_id,
+            ', '.join('{0}={1:.6f}'.format(phase, self.durations[phase]) for phase in PHASES
+                      if phase in self.durations))
+
+
+class TraceSink(object):
+    """Receiver of the :class:`RequestEvent` of a :class:`RequestTracer`, subclasses override :func:`emit`.
+
+    `emit` is called within the event loop, once per attempt, and must not block; an exception it raises is logged and
+    doesn't fail the request.
+    """
+
+    def emit(self, event):
+        raise NotImplementedError
+
+
+class RequestTracer(object):
+    """Collect the :class:`RequestEvent` of the requests sent through a session and hand them to `sinks`.
+
+    :param sinks: :class:`TraceSink` objects, more can be added with :func:`add_sink`
+    """
+
+    def __init__(self, *sinks):
+        self.sinks = list(sinks)
+        self.trace_config = self._make_trace_config()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+
+    def start_request(self, operation, req, bucket_name, key, attempt):
+        """Return the event of an attempt of `req`, to be given to aiohttp as `trace_request_ctx`."""
+        return RequestEvent(operation, req.method, bucket_name, key, attempt, self)
+
+    def emit(self, event):
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                logger.warning("Trace sink {0!r} failed on {1!r}: {2!r}".format(sink, event, e))
+
+    def _make_trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_queued_start.append(_on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(_on_connection_queued_end)
+        trace_config.on_connection_create_start.append(_on_connection_create_start)
+        trace_config.on_connection_create_end.append(_on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+        trace_config.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+        trace_config.on_request_headers_sent.append(_on_request_headers_sent)
+        trace_config.on_request_chunk_sent.append(_on_request_chunk_sent)
+        trace_config.on_request_end.append(_on_request_end)
+        trace_config.freeze()
+        return trace_config
+
+
+# The hooks of aiohttp get the event as `trace_request_ctx`, it is None for the requests sent without one.
+
+async def _on_connection_queued_start(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx._queue_start = time.perf_counter()
+
+
+async def _on_connection_queued_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx._queue_end = time.perf_counter()
+
+
+async def _on_connection_create_start(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx._connect_start = time.perf_counter()
+        ctx.trace_request_ctx.connection_reused = False
+
+
+async def _on_connection_create_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx._connect_end = time.perf_counter()
+
+
+async def _on_connection_reuseconn(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.connection_reused = True
+
+
+async def _on_dns_resolvehost_start(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx._dns_start = time.perf_counter()
+
+
+async def _on_dns_resolvehost_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx._dns_end = time.perf_counter()
+
+
+async def _on_request_headers_sent(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx._headers_sent = time.perf_counter()
+
+
+async def _on_request_chunk_sent(session, ctx, params):
+    event = ctx.trace_request_ctx
+    if event is not None and params.chunk:
+        event.bytes_sent += len(params.chunk)
+        event._last_chunk_sent = time.perf_counter()
+
+
+async def _on_request_end(session, ctx, params):
+    event = ctx.trace_request_ctx
+    if event is not None and event._headers_received is None:
+        event._headers_received = time.perf_counter()
+
+
+def get_operation_name(depth=1, default=''):
+    """Return the name of the closest public function among the callers, e.g. `'put_object'` for the `_send` of a
+    request made by `Bucket.put_object`. The private helpers in between (`__do_object`, `_do`...) are skipped, and
+    the walk stops at the first caller outside of `asyncio_oss`, e.g. the event loop running a task, returning
+    `default`."""
+    frame = sys._getframe(depth + 1)
+    for _ in range(8):
+        if frame is None:
+            break
+        module = frame.f_globals.get('__name__', '')
+        if module != _PACKAGE and not module.startswith(_PACKAGE + '.'):
+            break
+        name = frame.f_code.co_name
+        if not name.startswith(('_', '<')):
+            return name
+        frame = frame.f_back
+    return default
+
+
+class Histogram(object):
+    """Histogram of durations in buckets growing geometrically, `precision` buckets per doubling, between
+    `min_value` and `max_value` seconds. The percentiles are the upper bounds of the buckets, i.e. they are within
+    `2 ** (1 / precision)` of the exact ones (9% with the default precision)."""
+
+    def __init__(self, min_value=1e-5, max_value=600.0, precision=8):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.precision = precision
+        nbuckets = int(math.ceil(math.log(max_value / min_value, 2) * precision)) + 1
+        self.bounds = [min_value * 2 ** (i / precision) for i in range(nbuckets)]
+        self.counts = [0] * (nbuckets + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.bounds != self.bounds:
+            raise ValueError('can only merge histograms with the same buckets')
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Return the `q` percentile (0 < q <= 1) of the values added, 0.0 if none was."""
+        if not self.count:
+            return 0.0
+
+        rank = max(int(math.ceil(q * self.count)), 1)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if i < len(self.bounds):
+                    return min(self.bounds[i], self.max)
+                return self.max
+        return self.max
+
+
+class HistogramSink(TraceSink):
+    """In memory :class:`TraceSink`, keeping a :class:`Histogram` of each phase of each operation, and counters of the
+    statuses, errors, bytes and reused connections.
+
+    :param float min_value: lowest bucket of the histograms, in seconds
+    :param float max_value: highest bucket of the histograms, in seconds
+    :param int precision: number of buckets per doubling
+    """
+
+    def __init__(self, min_value=1e-5, max_value=600.0, precision=8):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.precision = precision
+
+        #: {(operation, phase): Histogram}
+        self.histograms = {}
+
+        #: {(operation, status): number of attempts}
+        self.statuses = collections.Counter()
+
+        #: {(operation, error code): number of attempts}
+        self.errors = collections.Counter()
+
+        #: {operation: bytes}
+        self.bytes_sent = collections.Counter()
+        self.bytes_received = collections.Counter()
+
+        #: {operation: number of attempts sent on a connection reused from the pool, or on a new one}
+        self.reused_connections = collections.Counter()
+        self.new_connections = collections.Counter()
+
+    def emit(self, event):
+        operation = event.operation
+        for phase, duration in event.durations.items():
+            histogram = self.histograms.get((operation, phase))
+            if histogram is None:
+                histogram = self.histograms[operation, phase] = Histogram(self.min_value, self.max_value,
+                                                                          self.precision)
+            histogram.add(duration)
+
+        self.statuses[operation, event.status] += 1
+        if event.error:
+            self.errors[operation, event.error] += 1
+        self.bytes_sent[operation] += event.bytes_sent
+        self.bytes_received[operation] += event.bytes_received
+        if event.connection_reused:
+            self.reused_connections[operation] += 1
+        elif event.connection_reused is False:
+            self.new_connections[operation] += 1
+
+    @property
+    def operations(self):
+        return sorted(set(operation for operation, _ in self.histograms))
+
+    def histogram(self, phase='total', operation=None):
+        """Return the histogram of `phase` of `operation`, or of all the operations if it is None."""
+        merged = Histogram(self.min_value, self.max_value, self.precision)
+        for (op, ph), histogram in self.histograms.items():
+            if ph == phase and (operation is None or op == operation):
+                merged.merge(histogram)
+        return merged
+
+    def percentile(self, q, phase='total', operation=None):
+        """Return the `q` percentile (0 < q <= 1) of the durations of `phase`, in seconds, for `operation` or for all
+        the operations if it is None."""
+        return self.histogram(phase, operation).percentile(q)
+
+    def summary(self, percentiles=(0.5, 0.9, 0.99)):
+        """Return {operation: {phase: {'count', 'mean', 'max', 'p50', ...}}}, durations in seconds."""
+        summary = collections.defaultdict(dict)
+        for (operation, phase), histogram in sorted(self.histograms.items()):
+            stats = {'count': histogram.count, 'mean': histogram.mean, 'max': histogram.max}
+            for q in percentiles:
+                stats['p{0:g}'.format(q * 100)] = histogram.percentile(q)
+            summary[operation][phase] = stats
+        return dict(summary)
+
+    def clear(self):
+        self.histograms.clear()
+        self.statuses.clear()
+        self.errors.clear()
+        self.bytes_sent.clear()
+        self.bytes_received.clear()
+        self.reused_connections.clear()
+        self.new_connections.clear()
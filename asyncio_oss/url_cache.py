@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio_oss.url_cache
+~~~~~~~~~~~~~~~~~~~~~
+
+A bounded LRU cache of signed URLs, used by `Bucket.sign_url` when given as `url_cache`: the URL signed for the same
+method, key, headers, params and expiration is handed out again while enough of its lifetime remains, instead of
+being signed again.
+
+Usage ::
+
+    >>> bucket = asyncio_oss.Bucket(auth, endpoint, 'bucket', url_cache=asyncio_oss.SignedUrlCache())
+    >>> url = await bucket.sign_url('GET', 'logo.jpg', 3600)
+"""
+import collections
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# rough size of an entry besides its strings: the key tuple, the entry tuple and the slot of the OrderedDict
+_ENTRY_OVERHEAD = 256
+
+
+class SignedUrlCache(object):
+    """LRU cache of signed URLs with a cap on the number of entries and on the memory they use.
+
+    A URL signed to expire in `expires` seconds is reused as long as more than `min_remaining` of that lifetime is
+    left, e.g. with the default of 0.5 a URL signed for an hour is reused during 30 minutes. The URLs returned are thus
+    valid for at least `min_remaining * expires` seconds, and at most `expires` seconds, when they are returned.
+
+    The cache can be shared by several buckets, e.g. the views of a :class:`Client <asyncio_oss.Client>`: a URL is
+    reused by the buckets with the same auth object, endpoint and name. The URLs signed with an auth object that has
+    since been replaced are not reused.
+
+    :param int max_entries: max number of URLs kept
+    :param int max_bytes: max approximate memory used by the URLs kept, in bytes, None for no limit
+    :param float min_remaining: fraction of the lifetime of a URL which must remain for it to be reused, between 0
+        and 1
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, min_remaining=0.5):
+        if not 0 <= min_remaining < 1:
+            raise ValueError('min_remaining should be in [0, 1), got {0}'.format(min_remaining))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_remaining = min_remaining
+
+        #: number of URLs reused
+        self.hits = 0
+
+        #: number of URLs signed because none could be reused
+        self.misses = 0
+
+        #: number of URLs dropped to stay within `max_entries` and `max_bytes`
+        self.evictions = 0
+
+        self.nbytes = 0
+        self.__entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, cache_key):
+        """Return the URL cached for `cache_key` if it can still be reused, None otherwise."""
+        entry = self.__entries.get(cache_key)
+        if entry is not None:
+            url, reuse_until, size = entry
+            if time.time() < reuse_until:
+                self.__entries.move_to_end(cache_key)
+                self.hits += 1
+                return url
+            self.__remove(cache_key)
+
+        self.misses += 1
+        return None
+
+    def put(self, cache_key, url, expires, signed_at):
+        """Cache `url`, signed at `signed_at` to expire `expires` seconds later."""
+        if cache_key in self.__entries:
+            self.__remove(cache_key)
+
+        reuse_until = int(signed_at) + expires - self.min_remaining * expires
+        size = _ENTRY_OVERHEAD + len(url) + sum(len(str(part)) for part in cache_key)
+        self.__entries[cache_key] = (url, reuse_until, size)
+        self.nbytes += size
+
+        while self.__entries and (len(self.__entries) > self.max_entries or
+                                  (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            oldest = next(iter(self.__entries))
+            self.__remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all the URLs, the counters are kept."""
+        self.__entries.clear()
+        self.nbytes = 0
+
+    def __remove(self, cache_key):
+        entry = self.__entries.pop(cache_key)
+        self.nbytes -= entry[2]
+
+
+def make_cache_key(bucket, method, key, expires, headers, params, slash_safe):
+    """Return the key of a URL in a :class:`SignedUrlCache`, None if it can't be cached, e.g. unhashable params.
+
+    The auth object is part of the key, compared by identity: the URLs are only shared by the buckets signing with
+    the same credentials.
+    """
+    try:
+        cache_key = (bucket.auth, bucket.endpoint, bucket.is_cname, bucket.region, bucket.cloudbox_id,
+                     bucket.bucket_name, method, key, expires,
+                     tuple(sorted((k.lower(), v) for k, v in headers.items())) if headers else (),
+                     tuple(sorted(params.items())) if params else (),
+                     slash_safe is True)
+        hash(cache_key)
+    except TypeError:
+        return None
+    return cache_key
@@ -6,14 +6,18 @@ oss2.utils
 
 工具函数模块。
 """
+import asyncio
 import logging
 import os
 
+from . import file_io
+from .crc import Crc64
 from .exceptions import ClientError, InconsistentError
 
+import oss2.utils
 from oss2.compat import to_bytes
-from oss2.utils import (Crc64, _IterableAdapter, _get_data_size, _has_data_size_attr, _CHUNK_SIZE,
-                        _invoke_cipher_callback, _invoke_crc_callback, _invoke_progress_callback)
+from oss2.utils import (_IterableAdapter, _get_data_size, _has_data_size_attr, _CHUNK_SIZE,
+                        _invoke_cipher_callback, _invoke_progress_callback)
 
 COPY_BUFSIZE = 1024 * 1024 if os.name == 'nt' else 64 * 1024
 
@@ -49,30 +53,108 @@ def make_crc_adapter(data, init_crc=0, discard=0):
         raise ClientError('{0} is not a file object, nor an iterator'.format(data.__class__.__name__))
 
 
-async def copyfileobj(fsrc, fdst, length=0):
-        if not length:
-            length = COPY_BUFSIZE
-        fsrc_read = fsrc.read
-        fdst_write = fdst.write
-        while True:
-            buf = await fsrc_read(length)
-            if not buf:
-                break
-            fdst_write(buf)
+def make_upload_crc_adapter(data, init_crc=0):
+    """Same as `oss2.utils.make_crc_adapter` for the body of an upload, with the crc computed by :mod:`asyncio_oss.crc`.
+
+    :param data: 可以是bytes、file object或iterable
+    :param init_crc: 初始CRC值，可选
+
+    :return: 能够调用计算CRC函数的适配器
+    """
+    data = to_bytes(data)
+
+    # bytes or file object
+    if _has_data_size_attr(data):
+        return oss2.utils._BytesAndFileAdapter(data, size=_get_data_size(data), crc_callback=Crc64(init_crc))
+    # file-like object
+    elif hasattr(data, 'read'):
+        return oss2.utils._FileLikeAdapter(data, crc_callback=Crc64(init_crc))
+    # iterator
+    elif hasattr(data, '__iter__'):
+        return _IterableAdapter(data, crc_callback=Crc64(init_crc))
+    else:
+        raise ClientError('{0} is not a file object, nor an iterator'.format(data.__class__.__name__))
+
+
+async def _invoke_crc_callback(crc_callback, content, discard=0):
+    if crc_callback is None:
+        return
+    if isinstance(crc_callback, Crc64):
+        # large chunks are checked in a worker thread instead of blocking the event loop
+        await crc_callback.update_async(content[discard:])
+    else:
+        crc_callback(content[discard:])
+
+
+async def copyfileobj(fsrc, fdst, length=0, pipelined=True):
+    """Copy the asynchronous `fsrc` into `fdst` until the end of `fsrc`.
+
+    :param fsrc: object with an asynchronous `read`, e.g. :class:`GetObjectResult <asyncio_oss.models.GetObjectResult>`
+    :param fdst: :class:`AsyncFile <asyncio_oss.file_io.AsyncFile>`, or a file object whose blocking `write` is then
+        run in the disk I/O thread pool
+    :param int length: size of each read from `fsrc`
+    :param bool pipelined: whether to read the next buffer from `fsrc` while the previous one is being written
+    """
+    await _copy(fsrc, fdst, length or COPY_BUFSIZE, pipelined)
 
 
 async def copyfileobj_and_verify(
-        fsrc, fdst, expected_len, chunk_size=16*1024, request_id=''
+        fsrc, fdst, expected_len, chunk_size=16*1024, request_id='', pipelined=True
     ):
-        num_read = 0
-        while 1:
-            buf = await fsrc.read(chunk_size)
+    """Same as :func:`copyfileobj`, and raise :class:`InconsistentError` when fewer than `expected_len` bytes are read."""
+    num_read = await _copy(fsrc, fdst, chunk_size, pipelined)
+    if num_read != expected_len:
+        raise InconsistentError("IncompleteRead from source", request_id)
+
+
+async def _copy(fsrc, fdst, chunk_size, pipelined):
+    # reads are accumulated into buffers of file_io.buffer_size, so the disk sees few large aligned writes; when
+    # pipelined, the write of a buffer overlaps with the reads of the next one, which bounds the memory to two buffers
+    write = _make_async_write(fdst)
+    num_read = 0
+    pending = None
+    try:
+        while True:
+            buf = await _read_buffer(fsrc, file_io.buffer_size, chunk_size)
+            if pending is not None:
+                await pending
+                pending = None
             if not buf:
                 break
             num_read += len(buf)
-            fdst.write(buf)
-        if num_read != expected_len:
-            raise InconsistentError("IncompleteRead from source", request_id)
+            if pipelined:
+                pending = asyncio.ensure_future(write(buf))
+            else:
+                await write(buf)
+    finally:
+        if pending is not None:
+            if not pending.done():
+                pending.cancel()
+            elif not pending.cancelled():
+                pending.exception()
+    return num_read
+
+
+async def _read_buffer(fsrc, size, chunk_size):
+    chunks = []
+    num_read = 0
+    while num_read < size:
+        chunk = await fsrc.read(min(chunk_size, size - num_read))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        num_read += len(chunk)
+    return b''.join(chunks)
+
+
+def _make_async_write(fdst):
+    if asyncio.iscoroutinefunction(fdst.write):
+        return fdst.write
+
+    async def write(buf):
+        return await file_io.run(fdst.write, buf)
+    return write
+
 
 class _FileLikeAdapter(object):
     """通过这个适配器，可以给无法确定内容长度的 `fileobj` 加上进度监控。
@@ -129,7 +211,7 @@ class _FileLikeAdapter(object):
                 else:
                     real_discard = self.discard
 
-            _invoke_crc_callback(self.crc_callback, content, real_discard)
+            await _invoke_crc_callback(self.crc_callback, content, real_discard)
             content = _invoke_cipher_callback(self.cipher_callback, content, real_discard)
 
             self.discard -= real_discard
@@ -206,7 +288,7 @@ class _BytesAndFileAdapter(object):
 
         _invoke_progress_callback(self.progress_callback, min(self.offset, self.size), self.size)
 
-        _invoke_crc_callback(self.crc_callback, content)
+        await _invoke_crc_callback(self.crc_callback, content)
 
         content = _invoke_cipher_callback(self.cipher_callback, content)
 
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per page parse time of the listing responses: the parsers of `oss2.xml_utils`, which the listing calls used to go
+through, and the ones of `asyncio_oss.list_parser`, when only the keys of the entries are read and when all their
+fields are. No request is sent, the pages are generated.
+
+    $ python benchmarks/list_parsing.py --max-keys 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oss2 import xml_utils  # noqa: E402
+from oss2.compat import urlquote  # noqa: E402
+from oss2.models import ListObjectsResult, ListObjectsV2Result, ListObjectVersionsResult  # noqa: E402
+
+from asyncio_oss import list_parser  # noqa: E402
+
+
+class _Response(object):
+    status = 200
+    request_id = '5C3D9175B6FC201293AD4890'
+    headers = {}
+
+
+def make_objects_page(max_keys, v2):
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<ListBucketResult><Name>example-bucket</Name>',
+             '<Prefix>logs%2F</Prefix><MaxKeys>{0}</MaxKeys><Delimiter></Delimiter>'.format(max_keys),
+             '<EncodingType>url</EncodingType><IsTruncated>true</IsTruncated>']
+    parts.append('<NextContinuationToken>token</NextContinuationToken>' if v2 else '<NextMarker>marker</NextMarker>')
+    for i in range(max_keys):
+        parts.append('<Contents><Key>{0}</Key><LastModified>2024-01-02T03:04:05.000Z</LastModified>'
+                     '<ETag>"5EB63BBBE01EEED093CB22BB8F5ACDC3"</ETag><Type>Normal</Type><Size>{1}</Size>'
+                     '<StorageClass>Standard</StorageClass><Owner><ID>1234567890</ID>'
+                     '<DisplayName>1234567890</DisplayName></Owner></Contents>'.format(
+                         urlquote('logs/2024/01/02/host-{0:06d}.log.gz'.format(i), ''), i * 1024))
+    parts.append('</ListBucketResult>')
+    return ''.join(parts).encode('utf-8')
+
+
+def make_versions_page(max_keys):
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<ListVersionsResult><Name>example-bucket</Name>',
+             '<Prefix>logs%2F</Prefix><KeyMarker></KeyMarker><VersionIdMarker></VersionIdMarker>',
+             '<MaxKeys>{0}</MaxKeys><Delimiter></Delimiter><EncodingType>url</EncodingType>'.format(max_keys),
+             '<IsTruncated>true</IsTruncated><NextKeyMarker>marker</NextKeyMarker>',
+             '<NextVersionIdMarker>version</NextVersionIdMarker>']
+    for i in range(max_keys):
+        parts.append('<Version><Key>{0}</Key><VersionId>CAEQMxiBgMC0vs6D0BYiIGJiZWRjOTRjNTg0NzQ1MTRiN2Y1OTYxMTdkYjQ0'
+                     '</VersionId><IsLatest>true</IsLatest><LastModified>2024-01-02T03:04:05.000Z</LastModified>'
+                     '<ETag>"5EB63BBBE01EEED093CB22BB8F5ACDC3"</ETag><Type>Normal</Type><Size>{1}</Size>'
+                     '<StorageClass>Standard</StorageClass><Owner><ID>1234567890</ID>'
+                     '<DisplayName>1234567890</DisplayName></Owner></Version>'.format(
+                         urlquote('logs/2024/01/02/host-{0:06d}.log.gz'.format(i), ''), i * 1024))
+    parts.append('</ListVersionsResult>')
+    return ''.join(parts).encode('utf-8')
+
+
+def read_keys(entries):
+    for entry in entries:
+        entry.key
+
+
+def read_all(entries):
+    for entry in entries:
+        entry.key, entry.last_modified, entry.etag, entry.type, entry.size, entry.storage_class, entry.owner
+
+
+def measure(parse_func, klass, body, entries_of, read, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(count):
+            result = klass(_Response())
+            parse_func(result, body)
+            read(entries_of(result))
+        elapsed = (time.perf_counter() - start) / count
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(args):
+    cases = [
+        ('list_objects', ListObjectsResult, make_objects_page(args.max_keys, False), lambda r: r.object_list,
+         xml_utils.parse_list_objects, list_parser.parse_list_objects),
+        ('list_objects_v2', ListObjectsV2Result, make_objects_page(args.max_keys, True), lambda r: r.object_list,
+         xml_utils.parse_list_objects_v2, list_parser.parse_list_objects_v2),
+        ('list_object_versions', ListObjectVersionsResult, make_versions_page(args.max_keys), lambda r: r.versions,
+         xml_utils.parse_list_object_versions, list_parser.parse_list_object_versions),
+    ]
+
+    print('{0} entries per page, ms per page'.format(args.max_keys))
+    print('{0:<22} {1:<10} {2:>10} {3:>12} {4:>10}'.format('operation', 'fields', 'oss2', 'list_parser', 'speedup'))
+    for name, klass, body, entries_of, old_parse, new_parse in cases:
+        for fields, read in [('keys', read_keys), ('all', read_all)]:
+            old = measure(old_parse, klass, body, entries_of, read, args.count, args.repeat)
+            new = measure(new_parse, klass, body, entries_of, read, args.count, args.repeat)
+            print('{0:<22} {1:<10} {2:>10.3f} {3:>12.3f} {4:>9.1f}x'.format(
+                name, fields, old * 1000, new * 1000, old / new))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Per page parse time of the listing responses.')
+    parser.add_argument('--max-keys', type=int, default=1000, help='entries per page')
+    parser.add_argument('--count', type=int, default=20, help='pages parsed per measure')
+    parser.add_argument('--repeat', type=int, default=5, help='measures, the best one is reported')
+    main(parser.parse_args())
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+Client side cost of `put_object`, `get_object` and `head_object`, with DEBUG off (the default), and with DEBUG on and
+the records written to os.devnull. The difference between the two is what building the debug messages costs per
+call, which the request paths used to pay even with DEBUG off.
+
+The session answers from memory, without any socket, so that only the work of the client is measured.
+
+    $ python benchmarks/logging_overhead.py --count 5000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import oss2  # noqa: E402
+from multidict import CIMultiDict  # noqa: E402
+
+from asyncio_oss import Bucket, Session, crc64  # noqa: E402
+from asyncio_oss import http  # noqa: E402
+
+_BODY = b'x' * 1024
+_HEADERS = {'x-oss-request-id': '5C3D9175B6FC201293AD4890', 'ETag': '"0CC175B9C0F1B6A831C399E269772661"',
+            'Last-Modified': 'Sat, 05 Dec 2015 11:04:39 GMT', 'Server': 'AliyunOSS'}
+
+
+class _Content(object):
+    def __init__(self, body):
+        self.body = body
+
+    async def read(self, amt=-1):
+        body, self.body = self.body, b''
+        return body
+
+    async def iter_chunked(self, size):
+        if self.body:
+            yield await self.read()
+
+
+class _Response(object):
+    def __init__(self, status, headers, body=b''):
+        self.status = status
+        self.headers = CIMultiDict(headers, **{'Content-Length': str(len(body))})
+        self.content = _Content(body)
+
+    def release(self):
+        pass
+
+
+class _MemorySession(Session):
+    async def do_request(self, req, timeout):
+        if req.method == 'GET':
+            response = _Response(200, dict(_HEADERS, **{'x-oss-hash-crc64ecma': str(crc64(_BODY))}), _BODY)
+        elif req.method == 'HEAD':
+            response = _Response(200, _HEADERS)
+        else:
+            async for _ in http._stream_request_body(req.data):
+                pass
+            response = _Response(200, dict(_HEADERS, **{'x-oss-hash-crc64ecma': '0'}))
+        return http.Response(response)
+
+
+async def put_object(bucket):
+    await bucket.put_object('bench/object', b'')
+
+
+async def get_object(bucket):
+    result = await bucket.get_object('bench/object')
+    await result.read()
+
+
+async def head_object(bucket):
+    await bucket.head_object('bench/object')
+
+
+async def run(bucket, func, count):
+    start = time.process_time()
+    for _ in range(count):
+        await func(bucket)
+    return (time.process_time() - start) / count * 1e6
+
+
+async def main(args):
+    package_logger = logging.getLogger('asyncio_oss')
+    devnull = open(os.devnull, 'w')
+    handler = logging.StreamHandler(devnull)
+
+    bucket = Bucket(oss2.Auth('access-key-id', 'access-key-secret'), 'http://oss-cn-hangzhou.aliyuncs.com',
+                    'example-bucket', session=_MemorySession())
+    print('{0:<12} {1:>14} {2:>14} {3:>14}'.format('operation', 'debug off us', 'debug on us', 'logging us'))
+    for func in [put_object, get_object, head_object]:
+        await run(bucket, func, args.count // 10)
+
+        package_logger.setLevel(logging.WARNING)
+        off = min([await run(bucket, func, args.count) for _ in range(args.repeat)])
+
+        package_logger.setLevel(logging.DEBUG)
+        package_logger.addHandler(handler)
+        on = min([await run(bucket, func, args.count) for _ in range(args.repeat)])
+        package_logger.removeHandler(handler)
+        package_logger.setLevel(logging.WARNING)
+
+        print('{0:<12} {1:>14.1f} {2:>14.1f} {3:>14.1f}'.format(func.__name__, off, on, on - off))
+
+    await bucket.close()
+    devnull.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=5000, help='number of calls per run')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs, the best one is reported')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+Decoding throughput of the SelectObject responses: `oss2.select_response.SelectResponseAdapter`, which the select
+calls used to go through, and `asyncio_oss.select_response.SelectResponseAdapter`, with and without the payload
+checksums. No request is sent, the response is generated and returned by chunks.
+
+    $ python benchmarks/select_decoding.py --size 64 --frame-size 256
+"""
+import argparse
+import asyncio
+import os
+import struct
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oss2 import select_response  # noqa: E402
+
+from asyncio_oss.select_response import SelectResponseAdapter, DATA_FRAME_TYPE, END_FRAME_TYPE  # noqa: E402
+
+_HEADERS = {'x-oss-request-id': '5C3D9175B6FC201293AD4890'}
+
+
+def _frame(frame_type, payload):
+    return struct.pack('>III', frame_type | 0x01000000, len(payload), 0) + payload + \
+        struct.pack('>I', zlib.crc32(payload))
+
+
+def make_body(size, frame_size):
+    record = b'2024-01-02T03:04:05Z,host-000001,GET,/index.html,200,1234\n'
+    data = record * (frame_size // len(record) + 1)
+    frames = []
+    offset = 0
+    while offset < size:
+        frames.append(_frame(DATA_FRAME_TYPE, struct.pack('>Q', offset) + data[:frame_size]))
+        offset += frame_size
+    frames.append(_frame(END_FRAME_TYPE, struct.pack('>QQI', offset, offset, 206)))
+    return b''.join(frames)
+
+
+def chunks_of(body, chunk_size):
+    return [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+
+class _SyncResponse(object):
+    headers = _HEADERS
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+class _AsyncResponse(object):
+    headers = _HEADERS
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+
+    async def read(self, amt=None):
+        return next(self.chunks, b'')
+
+
+def decode_oss2(chunks, crc):
+    adapter = select_response.SelectResponseAdapter(_SyncResponse(chunks), enable_crc=crc)
+    return sum(len(data) for data in adapter)
+
+
+def decode_async(chunks, crc):
+    async def decode():
+        adapter = SelectResponseAdapter(_AsyncResponse(chunks), enable_crc=crc)
+        return sum([len(data) async for data in adapter])
+    return asyncio.run(decode())
+
+
+def measure(decode, chunks, crc, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(chunks, crc)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(args):
+    size = args.size * 1024 * 1024
+    chunks = chunks_of(make_body(size, args.frame_size * 1024), args.chunk_size * 1024)
+
+    print('{0} MB in frames of {1} KB, MB/s'.format(args.size, args.frame_size))
+    print('{0:<6} {1:>10} {2:>14} {3:>10}'.format('crc', 'oss2', 'asyncio_oss', 'speedup'))
+    for crc in (False, True):
+        old = measure(decode_oss2, chunks, crc, args.repeat)
+        new = measure(decode_async, chunks, crc, args.repeat)
+        print('{0:<6} {1:>10.1f} {2:>14.1f} {3:>9.1f}x'.format(
+            str(crc), args.size / old, args.size / new, old / new))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Decoding throughput of the SelectObject responses.')
+    parser.add_argument('--size', type=int, default=64, help='MB of selected data')
+    parser.add_argument('--frame-size', type=int, default=256, help='KB of data per frame')
+    parser.add_argument('--chunk-size', type=int, default=64, help='KB of body per chunk received')
+    parser.add_argument('--repeat', type=int, default=3, help='measures, the best one is reported')
+    main(parser.parse_args())
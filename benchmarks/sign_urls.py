@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per URL cost of presigning many objects: a loop of `Bucket.sign_url`, the same loop signed by the auth object as
+before `asyncio_oss.signer`, and one `Bucket.sign_urls` call. No request is sent.
+
+    $ python benchmarks/sign_urls.py --count 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import oss2  # noqa: E402
+
+from asyncio_oss import Bucket, http  # noqa: E402
+
+
+async def sign_with_auth(bucket, keys, expires):
+    # what `sign_url` did before: a request, a debug log and the signature of oss2 for each key
+    for key in keys:
+        req = http.Request('GET', bucket._make_url(bucket.bucket_name, key),
+                           region=bucket.region, product=bucket.product, cloudbox_id=bucket.cloudbox_id)
+        bucket.auth._sign_url(req, bucket.bucket_name, key, expires)
+
+
+async def sign_url_loop(bucket, keys, expires):
+    for key in keys:
+        await bucket.sign_url('GET', key, expires)
+
+
+async def sign_urls(bucket, keys, expires):
+    await bucket.sign_urls('GET', keys, expires)
+
+
+async def main(args):
+    keys = ['images/{0:08d}/thumbnail.jpg'.format(i) for i in range(args.count)]
+    auths = [('v1', oss2.Auth('access-key-id', 'access-key-secret')),
+             ('v4', oss2.AuthV4('access-key-id', 'access-key-secret'))]
+
+    print('{0:<4} {1:<16} {2:>12} {3:>10}'.format('auth', 'method', 'us per url', 'speedup'))
+    for auth_name, auth in auths:
+        bucket = Bucket(auth, 'https://oss-cn-hangzhou.aliyuncs.com', 'example-bucket', region='cn-hangzhou')
+        baseline = None
+        for name, func in [('auth._sign_url', sign_with_auth), ('sign_url', sign_url_loop), ('sign_urls', sign_urls)]:
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                await func(bucket, keys, 3600)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            per_url = best / len(keys) * 1e6
+            baseline = baseline or per_url
+            print('{0:<4} {1:<16} {2:>12.2f} {3:>9.1f}x'.format(auth_name, name, per_url, baseline / per_url))
+        await bucket.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=20000, help='number of keys signed per run')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs, the best one is reported')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+
+"""
+Throughput and latency of the core operations, against a local `FakeOssServer` (started in a child process, so that
+the CPU time and memory measured are the ones of the client) or against a real endpoint:
+
+- `put_small`, `get_small`, `head_small`: `--count` objects of `--object-size` bytes, `--concurrency` at a time
+- `put_large`, `get_large`: `--large-count` objects of `--large-size` bytes, the downloads read by chunks
+- `list`: `ObjectIterator` over `--list-count` objects, one page of `--max-keys` per request
+- `list_stream`: `StreamingObjectIterator` over the same objects, the latency is the time to the first key of each
+  page
+- `batch_delete`: `batch_delete_objects` of the same objects, 1000 keys per request
+- `select`, `select_parallel`: `select * from ossobject` over a CSV object of `--select-size` bytes, by a single
+  `select_object` and by `ParallelSelectIterator` with `--select-tasks` concurrent split ranges
+- `sign_url`: `--count` calls to `sign_url`, without any request
+
+For each of them the ops per second, the latencies (mean, p50, p90, p99, max) and the CPU time per operation are
+reported, with the peak RSS of the process once it is done. The results can be saved as JSON with `--output`, and
+compared to a previous run with `--compare`, which exits with status 1 if an operation got slower than
+`--threshold` ::
+
+    $ python benchmarks/suite.py --output before.json
+    $ python benchmarks/suite.py --compare before.json --output after.json
+    $ python benchmarks/suite.py --endpoint http://oss-cn-hangzhou.aliyuncs.com --bucket my-bucket \\
+          --access-key-id ... --access-key-secret ... --only put_small,get_small
+
+The objects are written under `--prefix` followed by a random run id, and deleted at the end.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp  # noqa: E402
+import oss2  # noqa: E402
+
+from asyncio_oss import (Bucket, ObjectIterator, StreamingObjectIterator, ParallelSelectIterator,  # noqa: E402
+                         SessionConfig)
+from asyncio_oss.fake_server import FakeOssServer  # noqa: E402
+
+BENCHMARKS = ('put_small', 'get_small', 'head_small', 'put_large', 'get_large', 'list', 'list_stream', 'batch_delete',
+              'select', 'select_parallel', 'sign_url')
+
+# metrics compared by --compare, and whether a higher value is better
+_COMPARED = (('ops_per_sec', True), ('p50_ms', False), ('p99_ms', False), ('cpu_us_per_op', False))
+
+_READ_SIZE = 64 * 1024
+
+
+def _percentile(latencies, q):
+    if not latencies:
+        return 0.0
+    return latencies[min(int(len(latencies) * q / 100.0), len(latencies) - 1)]
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+class _Recorder(object):
+    """Latencies and totals of one benchmark."""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.ops = 0
+        self.nbytes = 0
+        self.errors = 0
+
+    async def time(self, coro, ops=1, nbytes=0):
+        start = time.perf_counter()
+        try:
+            await coro
+        except oss2.exceptions.OssError:
+            self.errors += 1
+            raise
+        self.latencies.append(time.perf_counter() - start)
+        self.ops += ops
+        self.nbytes += nbytes
+
+    def result(self, elapsed, cpu):
+        latencies = sorted(self.latencies)
+        result = {
+            'ops': self.ops,
+            'requests': len(latencies),
+            'errors': self.errors,
+            'elapsed_s': round(elapsed, 6),
+            'ops_per_sec': round(self.ops / elapsed, 2) if elapsed else 0.0,
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 4) if latencies else 0.0,
+            'p50_ms': round(_percentile(latencies, 50) * 1000, 4),
+            'p90_ms': round(_percentile(latencies, 90) * 1000, 4),
+            'p99_ms': round(_percentile(latencies, 99) * 1000, 4),
+            'max_ms': round(latencies[-1] * 1000, 4) if latencies else 0.0,
+            'cpu_us_per_op': round(cpu / self.ops * 1e6, 2) if self.ops else 0.0,
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+        }
+        if self.nbytes:
+            result['mb_per_sec'] = round(self.nbytes / elapsed / (1024 * 1024), 2)
+        return result
+
+
+async def _run_concurrently(jobs, concurrency):
+    # run the coroutine functions of `jobs`, `concurrency` at a time
+    jobs = iter(jobs)
+
+    async def worker():
+        for job in jobs:
+            await job()
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+
+async def _measure(name, func, *args):
+    recorder = _Recorder(name)
+    cpu = time.process_time()
+    start = time.perf_counter()
+    await func(recorder, *args)
+    return recorder.result(time.perf_counter() - start, time.process_time() - cpu)
+
+
+async def _read_all(result):
+    while True:
+        chunk = await result.read(_READ_SIZE)
+        if not chunk:
+            break
+
+
+class Suite(object):
+    def __init__(self, bucket, args):
+        self.bucket = bucket
+        self.args = args
+        self.prefix = '{0}{1}/'.format(args.prefix, uuid.uuid4().hex[:8])
+        self.small_keys = [self.prefix + 'small/{0:08d}'.format(i) for i in range(args.count)]
+        self.large_keys = [self.prefix + 'large/{0:04d}'.format(i) for i in range(args.large_count)]
+        self.list_keys = [self.prefix + 'list/{0:08d}'.format(i) for i in range(args.list_count)]
+        self.select_key = self.prefix + 'select/data.csv'
+        self.small_data = os.urandom(args.object_size)
+        self.large_data = os.urandom(args.large_size)
+        record = b'2024-01-02T03:04:05Z,host-000001,GET,/index.html,200,1234\n'
+        self.select_data = record * (args.select_size // len(record))
+
+        # objects each benchmark reads or deletes, written before it is measured
+        self.needed = {
+            'get_small': (self.small_keys, self.small_data),
+            'head_small': (self.small_keys, self.small_data),
+            'get_large': (self.large_keys, self.large_data),
+            'list': (self.list_keys, b''),
+            'list_stream': (self.list_keys, b''),
+            'batch_delete': (self.list_keys, b''),
+            'select': ([self.select_key], self.select_data),
+            'select_parallel': ([self.select_key], self.select_data),
+        }
+        self.written = set()
+
+    async def put_small(self, recorder):
+        await _run_concurrently([lambda key=key: recorder.time(self.bucket.put_object(key, self.small_data))
+                                 for key in self.small_keys], self.args.concurrency)
+
+    async def get_small(self, recorder):
+        async def get(key):
+            await _read_all(await self.bucket.get_object(key))
+
+        await _run_concurrently([lambda key=key: recorder.time(get(key), nbytes=self.args.object_size)
+                                 for key in self.small_keys], self.args.concurrency)
+
+    async def head_small(self, recorder):
+        await _run_concurrently([lambda key=key: recorder.time(self.bucket.head_object(key))
+                                 for key in self.small_keys], self.args.concurrency)
+
+    async def put_large(self, recorder):
+        await _run_concurrently([lambda key=key: recorder.time(self.bucket.put_object(key, self.large_data),
+                                                               nbytes=self.args.large_size)
+                                 for key in self.large_keys], self.args.large_concurrency)
+
+    async def get_large(self, recorder):
+        async def get(key):
+            await _read_all(await self.bucket.get_object(key))
+
+        await _run_concurrently([lambda key=key: recorder.time(get(key), nbytes=self.args.large_size)
+                                 for key in self.large_keys], self.args.large_concurrency)
+
+    async def list(self, recorder):
+        iterator = ObjectIterator(self.bucket, prefix=self.prefix + 'list/', max_keys=self.args.max_keys)
+        fetch = iterator._fetch
+
+        async def timed_fetch():
+            # the latency is the one of each page, the ops the objects iterated
+            start = time.perf_counter()
+            page = await fetch()
+            recorder.latencies.append(time.perf_counter() - start)
+            return page
+
+        iterator._fetch = timed_fetch
+        async for _ in iterator:
+            recorder.ops += 1
+
+    async def list_stream(self, recorder):
+        iterator = StreamingObjectIterator(self.bucket, prefix=self.prefix + 'list/', max_keys=self.args.max_keys)
+        while True:
+            marker = iterator.next_marker
+            start = time.perf_counter()
+            try:
+                await iterator.next()
+            except StopAsyncIteration:
+                break
+            # the first entry of a page is returned by the call which requests the page
+            if recorder.ops == 0 or iterator.next_marker != marker:
+                recorder.latencies.append(time.perf_counter() - start)
+            recorder.ops += 1
+
+    async def batch_delete(self, recorder):
+        batches = [self.list_keys[i:i + 1000] for i in range(0, len(self.list_keys), 1000)]
+        await _run_concurrently([lambda batch=batch: recorder.time(self.bucket.batch_delete_objects(batch),
+                                                                   ops=len(batch))
+                                 for batch in batches], self.args.concurrency)
+        self.written.difference_update(self.list_keys)
+
+    async def select(self, recorder):
+        async def select():
+            result = await self.bucket.select_object(self.select_key, 'select * from ossobject')
+            async for _ in result:
+                pass
+
+        await recorder.time(select(), nbytes=len(self.select_data))
+
+    async def select_parallel(self, recorder):
+        async def select():
+            async for _ in ParallelSelectIterator(self.bucket, self.select_key, 'select * from ossobject',
+                                                  num_tasks=self.args.select_tasks):
+                pass
+
+        await recorder.time(select(), nbytes=len(self.select_data))
+
+    async def sign_url(self, recorder):
+        for key in self.small_keys:
+            await recorder.time(self.bucket.sign_url('GET', key, 3600))
+
+    async def prepare(self, name):
+        """Upload the objects needed by the benchmark `name` which were not written by a previous one."""
+        keys, data = self.needed.get(name, ((), b''))
+        missing = [key for key in keys if key not in self.written]
+        if missing:
+            await _run_concurrently([lambda key=key: self.bucket.put_object(key, data) for key in missing],
+                                    self.args.concurrency)
+            self.written.update(missing)
+
+    async def run(self, names):
+        results = {}
+        try:
+            for name in names:
+                await self.prepare(name)
+                results[name] = await _measure(name, getattr(self, name))
+                if name == 'put_small':
+                    self.written.update(self.small_keys)
+                elif name == 'put_large':
+                    self.written.update(self.large_keys)
+                _print_result(name, results[name])
+        finally:
+            await self.cleanup()
+        return results
+
+    async def cleanup(self):
+        keys = sorted(self.written)
+        for i in range(0, len(keys), 1000):
+            await self.bucket.batch_delete_objects(keys[i:i + 1000])
+
+
+def _print_header():
+    print('{0:<14} {1:>8} {2:>11} {3:>9} {4:>9} {5:>9} {6:>9} {7:>10} {8:>9}'.format(
+        'benchmark', 'ops', 'ops/s', 'p50 ms', 'p99 ms', 'max ms', 'MB/s', 'cpu us/op', 'rss MB'))
+
+
+def _print_result(name, result):
+    print('{0:<14} {1:>8} {2:>11.1f} {3:>9.3f} {4:>9.3f} {5:>9.3f} {6:>9} {7:>10.1f} {8:>9.1f}'.format(
+        name, result['ops'], result['ops_per_sec'], result['p50_ms'], result['p99_ms'], result['max_ms'],
+        '{0:.1f}'.format(result['mb_per_sec']) if 'mb_per_sec' in result else '-', result['cpu_us_per_op'],
+        result['peak_rss_mb']))
+
+
+def compare(baseline, results, threshold):
+    """Print the change of each compared metric from `baseline`, return the list of the regressions."""
+    regressions = []
+    print('\n{0:<14} {1:<14} {2:>12} {3:>12} {4:>9}'.format('benchmark', 'metric', 'baseline', 'current', 'change'))
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if old is None:
+            continue
+        for metric, higher_is_better in _COMPARED:
+            if not old.get(metric):
+                continue
+            change = (result[metric] - old[metric]) / old[metric]
+            regressed = (-change if higher_is_better else change) > threshold
+            if regressed:
+                regressions.append((name, metric, change))
+            print('{0:<14} {1:<14} {2:>12.3f} {3:>12.3f} {4:>+8.1%}{5}'.format(
+                name, metric, old[metric], result[metric], change, '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def _start_server_process(args):
+    # the fake server in a child process, so that its CPU time and memory are not counted as the client's
+    command = [sys.executable, os.path.abspath(__file__), '--serve', '--latency', str(args.latency)]
+    if args.bandwidth:
+        command += ['--bandwidth', str(args.bandwidth)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+    endpoint = process.stdout.readline().strip()
+    if not endpoint:
+        process.kill()
+        raise RuntimeError('the fake OSS server failed to start')
+    return process, endpoint
+
+
+async def serve(args):
+    async with FakeOssServer(latency=args.latency, bandwidth=args.bandwidth or None) as server:
+        print(server.endpoint, flush=True)
+        await asyncio.Event().wait()
+
+
+async def main(args):
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit('unknown benchmarks: {0}'.format(', '.join(sorted(unknown))))
+
+    process = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        if args.in_process:
+            server = await FakeOssServer(latency=args.latency, bandwidth=args.bandwidth or None).start()
+            endpoint = server.endpoint
+        else:
+            process, endpoint = _start_server_process(args)
+
+    try:
+        auth = oss2.Auth(args.access_key_id, args.access_key_secret)
+        config = SessionConfig(pool_size=max(args.concurrency, args.large_concurrency))
+        async with Bucket(auth, endpoint, args.bucket, enable_crc=not args.no_crc, session_config=config) as bucket:
+            _print_header()
+            results = await Suite(bucket, args).run(names)
+    finally:
+        if args.endpoint is None and args.in_process:
+            await server.close()
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'aiohttp': aiohttp.__version__,
+            'oss2': oss2.__version__,
+            'endpoint': args.endpoint or 'fake-server' + ('-in-process' if args.in_process else ''),
+            'args': dict((name, value) for name, value in vars(args).items()
+                         if name not in ('access_key_secret', 'compare', 'output')),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions:
+            print('\n{0} regression(s) over {1:.0%}'.format(len(regressions), args.threshold))
+            return 1
+    return 0
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', help='OSS endpoint, by default a FakeOssServer started for the run')
+    parser.add_argument('--bucket', default='benchmark-bucket')
+    parser.add_argument('--access-key-id', default=os.environ.get('OSS_KEY', 'fake-key'))
+    parser.add_argument('--access-key-secret', default=os.environ.get('OSS_SECRET', 'fake-secret'))
+    parser.add_argument('--prefix', default='asyncio-oss-benchmark/')
+    parser.add_argument('--only', help='comma separated benchmarks to run, among ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--count', type=int, default=2000, help='small objects')
+    parser.add_argument('--object-size', type=int, default=4096)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--large-count', type=int, default=8)
+    parser.add_argument('--large-size', type=int, default=32 * 1024 * 1024)
+    parser.add_argument('--large-concurrency', type=int, default=4)
+    parser.add_argument('--list-count', type=int, default=5000)
+    parser.add_argument('--max-keys', type=int, default=1000)
+    parser.add_argument('--select-size', type=int, default=16 * 1024 * 1024, help='bytes of the CSV object selected')
+    parser.add_argument('--select-tasks', type=int, default=8, help='concurrent split ranges of select_parallel')
+    parser.add_argument('--no-crc', action='store_true', help='disable the CRC64 checks of the transfers')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the fake server waits before answering')
+    parser.add_argument('--bandwidth', type=int, default=0, help='bytes per second per request of the fake server')
+    parser.add_argument('--in-process', action='store_true', help='run the fake server in the process of the client')
+    parser.add_argument('--output', help='file the results are written to, as JSON')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare to')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative change reported as a regression')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = _parse_args()
+    if arguments.serve:
+        try:
+            asyncio.run(serve(arguments))
+        except KeyboardInterrupt:
+            pass
+    else:
+        sys.exit(asyncio.run(main(arguments)))